@@ -20,5 +20,15 @@ class NautobotPluginChatopsGrafanaConfig(PluginConfig):
     default_settings = {}
     caching_config = {}
 
+    def ready(self):
+        """Connect the signals invalidating the grafana subcommands and index the query models once every plugin is loaded."""
+        super().ready()
+        # pylint: disable=import-outside-toplevel
+        from nautobot_plugin_chatops_grafana.helpers import build_model_registry
+        from nautobot_plugin_chatops_grafana.signals import connect_signals
+
+        connect_signals()
+        build_model_registry()
+
 
 config = NautobotPluginChatopsGrafanaConfig  # pylint:disable=invalid-name
@@ -0,0 +1,224 @@
+"""Micro benchmarks of the hot paths of the Grafana ChatOps plugin, run with `nautobot-server benchmark_grafana`."""
+import hashlib
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+
+from django.db import connections
+from rq import Queue, Worker
+
+from nautobot_plugin_chatops_grafana.delivery import send_image_bytes
+
+
+def timed(func: Callable, iterations: int) -> float:
+    """Return the mean duration of `func` in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) * 1e3 / iterations
+
+
+class _PathDispatcher:  # pylint: disable=too-few-public-methods
+    """Dispatcher reading the uploaded file back like the Mattermost, Teams and WebEx clients do."""
+
+    platform_slug = "mattermost"
+
+    @staticmethod
+    def send_image(image_path):
+        with open(image_path, "rb") as image_file:
+            image_file.read()
+
+
+class _SlackDispatcher:  # pylint: disable=too-few-public-methods
+    """Dispatcher whose client uploads straight from memory."""
+
+    platform_slug = "slack"
+    context = {"channel_id": "C0000000"}
+    slack_client = SimpleNamespace(files_upload=lambda channels, file, filename: len(file))
+
+
+def _tempfile_delivery(dispatcher, raw_image: bytes, filename: str):
+    """The original delivery: write the image to a temporary directory on disk and pass its path."""
+    with tempfile.TemporaryDirectory() as tempdir:
+        img_path = os.path.join(tempdir, filename)
+        with open(img_path, "wb") as img_file:
+            img_file.write(raw_image)
+        dispatcher.send_image(img_path)
+
+
+def benchmark_delivery(sizes: List[int], iterations: int, spool_dir: str = "/dev/shm") -> List[Dict]:  # nosec
+    """Compare the temporary file delivery of images with the in-memory and memory backed spool delivery.
+
+    Args:
+        sizes (List[int]): Image sizes in bytes.
+        iterations (int): Number of deliveries per size and path.
+        spool_dir (str): Memory backed directory used by the spool path.
+
+    Returns:
+        List[Dict]: Mean milliseconds per delivery for each size and path.
+    """
+    results = []
+    for size in sizes:
+        raw_image = os.urandom(size)
+        path_dispatcher = _PathDispatcher()
+        results.append(
+            {
+                "size": size,
+                "tempfile": timed(lambda: _tempfile_delivery(path_dispatcher, raw_image, "bench.png"), iterations),
+                "spool": timed(
+                    lambda: send_image_bytes(path_dispatcher, raw_image, "bench.png", size, spool_dir), iterations
+                ),
+                "in_memory": timed(
+                    lambda: send_image_bytes(_SlackDispatcher(), raw_image, "bench.png", size, spool_dir), iterations
+                ),
+            }
+        )
+    return results
+
+
+def peak_rss_bytes(who: int = resource.RUSAGE_SELF) -> int:
+    """Peak resident memory in bytes of the current process, or of its largest waited for child process."""
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _render_job(latency: float, size: int):
+    """A chat job: wait on the renderer, then a little CPU work on an image of `size` bytes."""
+    time.sleep(latency)
+    hashlib.sha256(os.urandom(size)).digest()
+
+
+def _drain_queue(worker_class, queue: Queue, worker_kwargs: dict, report):
+    """Run a worker in burst mode until the queue is empty, then send the peak RSS of its process to `report`.
+
+    The RSS of a forking worker adds the one of its largest work horse, every job runs in such a process.
+    """
+    worker = worker_class([queue], connection=queue.connection, **worker_kwargs)
+    worker.work(burst=True, logging_level="WARNING")
+    report.send(peak_rss_bytes() + peak_rss_bytes(resource.RUSAGE_CHILDREN))
+    report.close()
+
+
+def benchmark_worker(
+    jobs: int, process_counts: List[int], thread_counts: List[int], latency: float, size: int = 256 * 1024
+) -> List[Dict]:
+    """Compare the throughput per GB of RAM of the forking RQ worker with the threaded worker.
+
+    The jobs are enqueued on a scratch queue of the `worker_queue` Redis connection and drained by worker
+    processes started in burst mode: `process_counts` forking `rq.Worker` processes, forking a work horse per
+    job, or a single `ThreadPoolWorker` process with a pool of `thread_counts` threads. Throughput counts the
+    start of the worker processes, memory is the sum of the peak RSS of every worker process.
+
+    Args:
+        jobs (int): Jobs run per measurement.
+        process_counts (List[int]): Numbers of forking worker processes.
+        thread_counts (List[int]): Pool sizes of the threaded worker.
+        latency (float): Seconds each job waits on the renderer.
+        size (int): Bytes of the image hashed by each job.
+
+    Returns:
+        List[Dict]: Jobs per second, resident MB and jobs per second per GB for each worker mode.
+    """
+    # pylint: disable=import-outside-toplevel
+    import django_rq
+    from nautobot_plugin_chatops_grafana.grafana import handler
+    from nautobot_plugin_chatops_grafana.threaded_worker import ThreadPoolWorker
+
+    queue = Queue(
+        f"{handler.config.worker_queue}-benchmark", connection=django_rq.get_connection(handler.config.worker_queue)
+    )
+    context = multiprocessing.get_context("fork")
+    # The forked worker processes must not share the database connections of this process.
+    connections.close_all()
+
+    def measure(mode: str, worker_class, processes: int, threads: int, worker_kwargs: dict) -> Dict:
+        queue.empty()
+        for _ in range(jobs):
+            queue.enqueue(_render_job, latency, size, result_ttl=0)
+        pipes = [context.Pipe(duplex=False) for _ in range(processes)]
+        workers = [
+            context.Process(target=_drain_queue, args=(worker_class, queue, worker_kwargs, sender))
+            for _, sender in pipes
+        ]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        rss = sum(receiver.recv() for receiver, _ in pipes)
+        for worker in workers:
+            worker.join()
+        throughput = jobs / (time.perf_counter() - start)
+        return {
+            "mode": mode,
+            "processes": processes,
+            "threads": threads,
+            "jobs_per_sec": throughput,
+            "rss_mb": rss / 2 ** 20,
+            "jobs_per_sec_per_gb": throughput / (rss / 2 ** 30),
+        }
+
+    results = []
+    try:
+        for processes in process_counts:
+            results.append(measure("fork", Worker, processes, 1, {}))
+        for threads in thread_counts:
+            results.append(measure("threaded", ThreadPoolWorker, 1, threads, {"max_threads": threads}))
+    finally:
+        queue.delete(delete_jobs=True)
+    return results
+
+
+def synthetic_dashboard_panels(count: int, row_size: int = 10, titles: int = 50) -> List[dict]:
+    """Panels of a synthetic dashboard: collapsed rows of `row_size` panels reusing `titles` distinct titles.
+
+    Args:
+        count (int): Number of panels, rows not included.
+        row_size (int): Panels held by each collapsed row.
+        titles (int): Distinct panel titles, every title is shared by `count / titles` panels.
+
+    Returns:
+        List[dict]: The `panels` of the dashboard document.
+    """
+    rows = []
+    for start in range(0, count, row_size):
+        rows.append(
+            {
+                "id": count + len(rows) + 1,
+                "type": "row",
+                "title": f"Row {len(rows)}",
+                "collapsed": True,
+                "panels": [
+                    {"id": panel_id, "type": "timeseries", "title": f"Interface {panel_id % titles} Traffic"}
+                    for panel_id in range(start, min(start + row_size, count))
+                ],
+            }
+        )
+    return rows
+
+
+def benchmark_panel_loader(panel_counts: List[int], iterations: int) -> List[Dict]:
+    """Time loading the panels of synthetic dashboards into the GrafanaPanel DiffSync adapter.
+
+    Args:
+        panel_counts (List[int]): Panels of each synthetic dashboard.
+        iterations (int): Loads per dashboard.
+
+    Returns:
+        List[Dict]: Mean milliseconds per load and microseconds per panel for each dashboard size.
+    """
+    # pylint: disable=import-outside-toplevel
+    from nautobot_plugin_chatops_grafana.diffsync.models import GrafanaPanel
+    from nautobot_plugin_chatops_grafana.models import Dashboard
+
+    dashboard = Dashboard(dashboard_slug="benchmark", dashboard_uid="benchmark")
+    results = []
+    for count in panel_counts:
+        panels = synthetic_dashboard_panels(count)
+        elapsed = timed(lambda: GrafanaPanel(panels, dashboard), iterations)
+        results.append({"panels": count, "ms": elapsed, "us_per_panel": elapsed * 1e3 / count})
+    return results
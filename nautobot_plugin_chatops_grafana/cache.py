@@ -0,0 +1,465 @@
+"""Caching and request coalescing helpers for rendered Grafana panel images and dashboard documents."""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Union
+
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+from django.core.cache.backends.locmem import LocMemCache
+
+LOGGER = logging.getLogger("nautobot.plugin.grafana")
+
+
+def make_render_key(params: dict, prefix: str = "grafana:render") -> str:
+    """Build a stable cache key from the canonical render parameters.
+
+    Args:
+        params (dict): Canonical render parameters (dashboard uid, panel id, variables, size, theme, tz and window).
+        prefix (str): Namespace prepended to the key.
+
+    Returns:
+        str: Cache key safe for every Django cache backend.
+
+    Examples:
+        >>> make_render_key({"panelId": 2, "uid": "abc"}) == make_render_key({"uid": "abc", "panelId": 2})
+        True
+    """
+    canonical = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{prefix}:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+
+
+class RenderCache:
+    """Two-tier cache of rendered images.
+
+    The first tier is an in-process LRU bounded by a byte budget, the second tier is a
+    shared Django cache (Redis in a standard Nautobot deployment) so every RQ worker and
+    Nautobot node benefit from a render done by any of them.
+    """
+
+    def __init__(self, max_bytes: int, shared_alias: Optional[str] = "default"):
+        """Initialize the cache.
+
+        Args:
+            max_bytes (int): Byte budget of the in-process tier, 0 disables the in-process tier.
+            shared_alias (str): Django cache alias used for the shared tier, empty disables the shared tier.
+        """
+        self.max_bytes = max_bytes
+        self.shared_alias = shared_alias
+        self._lock = threading.RLock()
+        self._local = OrderedDict()
+        self._local_bytes = 0
+        self._stats = {
+            "local_hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "oversize": 0,
+        }
+
+    @property
+    def shared(self):
+        """Return the shared Django cache, or None when it is disabled or not configured."""
+        if not self.shared_alias:
+            return None
+        try:
+            return caches[self.shared_alias]
+        except InvalidCacheBackendError:
+            LOGGER.warning("Render cache alias `%s` is not configured, shared tier disabled.", self.shared_alias)
+            self.shared_alias = None
+            return None
+
+    def _incr(self, counter: str):
+        with self._lock:
+            self._stats[counter] += 1
+
+    def _local_get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._local_pop(key)
+                self._incr("expirations")
+                return None
+            self._local.move_to_end(key)
+            return value
+
+    def _local_pop(self, key: str):
+        _, value = self._local.pop(key)
+        self._local_bytes -= len(value)
+
+    def _local_set(self, key: str, value: bytes, ttl: int):
+        if len(value) > self.max_bytes:
+            self._incr("oversize")
+            return
+        with self._lock:
+            if key in self._local:
+                self._local_pop(key)
+            self._local[key] = (time.monotonic() + ttl, value)
+            self._local_bytes += len(value)
+            # Evict the least recently used entries until we are back inside the byte budget.
+            while self._local_bytes > self.max_bytes:
+                oldest = next(iter(self._local))
+                self._local_pop(oldest)
+                self._incr("evictions")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Look the key up in the in-process tier, then in the shared tier.
+
+        Args:
+            key (str): Render cache key.
+
+        Returns:
+            Optional[bytes]: The cached image or None on a miss.
+        """
+        value = self._local_get(key) if self.max_bytes else None
+        if value is not None:
+            self._incr("local_hits")
+            return value
+
+        shared = self.shared
+        if shared is not None:
+            try:
+                entry = shared.get(key)
+            except Exception as exc:  # pylint: disable=broad-except
+                LOGGER.warning("Unable to read the shared render cache: %s", exc)
+                entry = None
+            if entry is not None:
+                self._incr("shared_hits")
+                value, expires_at = entry
+                remaining = int(expires_at - time.time())
+                if self.max_bytes and remaining > 0:
+                    self._local_set(key, value, remaining)
+                return value
+
+        self._incr("misses")
+        return None
+
+    def set(self, key: str, value: bytes, ttl: int):
+        """Store an image in both tiers.
+
+        Args:
+            key (str): Render cache key.
+            value (bytes): Rendered image.
+            ttl (int): Seconds the image may be served from the cache.
+        """
+        if not value or ttl <= 0:
+            return
+        self._incr("sets")
+        if self.max_bytes:
+            self._local_set(key, value, ttl)
+
+        shared = self.shared
+        if shared is not None:
+            try:
+                # Store the absolute expiry alongside the image so the in-process tier never outlives it.
+                shared.set(key, (value, time.time() + ttl), timeout=ttl)
+            except Exception as exc:  # pylint: disable=broad-except
+                LOGGER.warning("Unable to write the shared render cache: %s", exc)
+
+    def delete(self, key: str):
+        """Remove a key from both tiers."""
+        with self._lock:
+            if key in self._local:
+                self._local_pop(key)
+        shared = self.shared
+        if shared is not None:
+            try:
+                shared.delete(key)
+            except Exception as exc:  # pylint: disable=broad-except
+                LOGGER.warning("Unable to delete from the shared render cache: %s", exc)
+
+    def clear(self):
+        """Drop every entry of the in-process tier, the shared tier expires on its own."""
+        with self._lock:
+            self._local.clear()
+            self._local_bytes = 0
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Return hit/miss/eviction counters and the current size of the in-process tier."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._local)
+            stats["bytes"] = self._local_bytes
+        stats["max_bytes"] = self.max_bytes
+        lookups = stats["local_hits"] + stats["shared_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["local_hits"] + stats["shared_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+class _Flight:  # pylint: disable=too-few-public-methods
+    """An in-process render that other threads can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class SingleFlight:
+    """Coalesce identical concurrent renders into a single request to Grafana.
+
+    Within a process, threads asking for a key that is already being rendered wait on that
+    render. Across processes, the first job takes a lock in the shared Django cache and
+    publishes its result there; the other jobs poll for the result for a bounded time. If the
+    lock disappears without a result (the leader died) a follower takes over the render, and
+    if the wait is exceeded the follower renders on its own.
+    """
+
+    _FAILED = b""
+
+    def __init__(self, shared_alias: Optional[str] = "default", wait_timeout: float = 65, poll_interval: float = 0.25):
+        """Initialize the single-flight group.
+
+        Args:
+            shared_alias (str): Django cache alias used for the cross-worker lock and result, empty disables it.
+            wait_timeout (float): Seconds a follower waits for the leader, also used as the lock timeout.
+            poll_interval (float): Seconds between two polls of the shared result.
+        """
+        self.shared_alias = shared_alias
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._stats = {"leaders": 0, "local_followers": 0, "shared_followers": 0, "takeovers": 0, "timeouts": 0}
+
+    @property
+    def shared(self):
+        """Return the shared Django cache, or None when it is disabled or not configured."""
+        if not self.shared_alias:
+            return None
+        try:
+            return caches[self.shared_alias]
+        except InvalidCacheBackendError:
+            LOGGER.warning("Single-flight alias `%s` is not configured, coalescing is per process.", self.shared_alias)
+            self.shared_alias = None
+            return None
+
+    def _incr(self, counter: str):
+        with self._lock:
+            self._stats[counter] += 1
+
+    def run(self, key: str, func: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+        """Return the result of `func`, sharing it with every concurrent caller using the same key.
+
+        Args:
+            key (str): Render key identifying identical requests.
+            func (Callable): Function performing the render, returns the image or None on error.
+
+        Returns:
+            Optional[bytes]: The rendered image, or None if the render failed.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+
+        if not leader:
+            self._incr("local_followers")
+            flight.done.wait(self.wait_timeout)
+            if flight.done.is_set():
+                return flight.result
+            self._incr("timeouts")
+            return func()
+
+        try:
+            flight.result = self._run_shared(key, func)
+        finally:
+            flight.done.set()
+            with self._lock:
+                self._flights.pop(key, None)
+        return flight.result
+
+    def _run_shared(self, key: str, func: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+        """Coalesce the render with the other workers through the shared cache."""
+        shared = self.shared
+        if shared is None:
+            self._incr("leaders")
+            return func()
+
+        lock_key = f"{key}:lock"
+        result_key = f"{key}:result"
+        deadline = time.monotonic() + self.wait_timeout
+        first_attempt = True
+        while True:
+            try:
+                acquired = shared.add(lock_key, os.getpid(), timeout=int(self.wait_timeout) + 1)
+            except Exception as exc:  # pylint: disable=broad-except
+                LOGGER.warning("Unable to take the single-flight lock, rendering without it: %s", exc)
+                self._incr("leaders")
+                return func()
+
+            if acquired:
+                self._incr("leaders" if first_attempt else "takeovers")
+                return self._lead(shared, lock_key, result_key, func)
+
+            first_attempt = False
+            result = self._follow(shared, lock_key, result_key, deadline)
+            if result is not None:
+                self._incr("shared_followers")
+                return result or None
+            if time.monotonic() >= deadline:
+                self._incr("timeouts")
+                LOGGER.warning("Timed out waiting for an identical render, rendering without coalescing.")
+                return func()
+            # The lock was released without a result, the leader died: try to take over.
+
+    def _lead(self, shared, lock_key: str, result_key: str, func: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+        """Render as the leader and publish the result to the followers."""
+        result = None
+        try:
+            shared.delete(result_key)
+            result = func()
+        finally:
+            try:
+                shared.set(result_key, result or self._FAILED, timeout=int(self.wait_timeout) + 1)
+                shared.delete(lock_key)
+            except Exception as exc:  # pylint: disable=broad-except
+                LOGGER.warning("Unable to publish the single-flight result: %s", exc)
+        return result
+
+    def _follow(self, shared, lock_key: str, result_key: str, deadline: float) -> Optional[bytes]:
+        """Poll for the leader's result until it is published, the lock is released or the deadline passes.
+
+        Returns:
+            Optional[bytes]: The published result (empty bytes when the leader failed) or None.
+        """
+        while time.monotonic() < deadline:
+            try:
+                result = shared.get(result_key)
+                if result is not None:
+                    return result
+                if shared.get(lock_key) is None:
+                    # Check the result again, the leader may have finished between the two reads.
+                    return shared.get(result_key)
+            except Exception as exc:  # pylint: disable=broad-except
+                LOGGER.warning("Unable to poll the single-flight result: %s", exc)
+                return None
+            time.sleep(self.poll_interval)
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        """Return the leader/follower/takeover/timeout counters."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._flights)
+        return stats
+
+
+class DashboardDocumentCache:
+    """Parsed Grafana dashboard documents, shared by the panel and variable syncs of every worker.
+
+    Documents are stored in a shared Django cache keyed by dashboard uid and Grafana `version`. A
+    short-lived pointer to the version fetched last lets the syncs of a single run reuse the document
+    without knowing its version, while callers knowing the version of a dashboard reuse its document
+    across runs for as long as it does not change in Grafana.
+    """
+
+    def __init__(
+        self,
+        shared_alias: Optional[str] = "default",
+        ttl: int = 60,
+        version_ttl: int = 86400,
+        prefix: str = "grafana:dashboard",
+    ):
+        """Initialize the cache.
+
+        Args:
+            shared_alias (str): Django cache alias holding the documents, empty keeps them in-process.
+            ttl (int): Seconds the latest fetched document is served to callers not giving a version, 0 disables it.
+            version_ttl (int): Seconds a document is kept for callers giving its version, 0 disables it.
+            prefix (str): Namespace of the cache keys.
+        """
+        self.shared_alias = shared_alias
+        self.ttl = ttl
+        self.version_ttl = version_ttl
+        self.prefix = prefix
+        self._local = None
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "sets": 0}
+
+    @property
+    def shared(self):
+        """Return the Django cache holding the documents, an in-process cache when the alias is disabled or missing."""
+        if self.shared_alias:
+            try:
+                return caches[self.shared_alias]
+            except InvalidCacheBackendError:
+                LOGGER.warning(
+                    "Dashboard cache alias `%s` is not configured, documents kept in-process.", self.shared_alias
+                )
+                self.shared_alias = None
+        if self._local is None:
+            self._local = LocMemCache("grafana-dashboards", {})
+        return self._local
+
+    def _incr(self, counter: str):
+        with self._lock:
+            self._stats[counter] += 1
+
+    @staticmethod
+    def document_version(document: dict) -> Optional[int]:
+        """Return the Grafana version of a dashboard document.
+
+        Examples:
+            >>> DashboardDocumentCache.document_version({"dashboard": {"version": 7}, "meta": {}})
+            7
+        """
+        version = document.get("dashboard", {}).get("version", document.get("meta", {}).get("version"))
+        return None if version is None else int(version)
+
+    def get(self, dashboard_uid: str, version: int = None) -> Optional[dict]:
+        """Return the document of a dashboard, of the given version or the one fetched last.
+
+        Args:
+            dashboard_uid (str): Grafana uid of the dashboard.
+            version (int): Grafana version of the dashboard, when known.
+
+        Returns:
+            Optional[dict]: The parsed document, None on a miss.
+        """
+        shared = self.shared
+        document = None
+        try:
+            if version is None and self.ttl > 0:
+                version = shared.get(f"{self.prefix}:{dashboard_uid}:latest")
+            if version is not None:
+                document = shared.get(f"{self.prefix}:{dashboard_uid}:{version}")
+        except Exception as exc:  # pylint: disable=broad-except
+            LOGGER.warning("Unable to read the dashboard cache: %s", exc)
+        self._incr("misses" if document is None else "hits")
+        return document
+
+    def set(self, dashboard_uid: str, document: dict):
+        """Store the document of a dashboard under its version, and point the latest version to it.
+
+        Args:
+            dashboard_uid (str): Grafana uid of the dashboard.
+            document (dict): The parsed document.
+        """
+        version = self.document_version(document)
+        if version is None or (not self.ttl and not self.version_ttl):
+            return
+        self._incr("sets")
+        try:
+            self.shared.set(
+                f"{self.prefix}:{dashboard_uid}:{version}", document, timeout=max(self.ttl, self.version_ttl)
+            )
+            if self.ttl > 0:
+                self.shared.set(f"{self.prefix}:{dashboard_uid}:latest", version, timeout=self.ttl)
+        except Exception as exc:  # pylint: disable=broad-except
+            LOGGER.warning("Unable to write the dashboard cache: %s", exc)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the hit/miss/set counters."""
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,88 @@
+"""Delivery of rendered images to the chat clients without round-tripping them through the disk."""
+import logging
+import os
+import tempfile
+
+import nautobot_chatops
+from nautobot_chatops.dispatchers import Dispatcher
+
+LOGGER = logging.getLogger("nautobot.plugin.grafana")
+
+# Major releases of nautobot-chatops whose SlackDispatcher.send_image is mirrored by _slack_upload.
+SLACK_UPLOAD_MAJOR_VERSIONS = (1,)
+
+
+def chatops_major_version() -> int:
+    """Return the major version of the installed nautobot-chatops, 0 when it can not be told."""
+    try:
+        return int(str(getattr(nautobot_chatops, "__version__", "")).split(".", maxsplit=1)[0])
+    except ValueError:
+        return 0
+
+
+def _slack_upload(dispatcher: Dispatcher, raw_image: bytes, filename: str):
+    """Upload the buffer with the Slack client, which accepts bytes as well as a path.
+
+    This mirrors SlackDispatcher.send_image of nautobot-chatops 1.x, which only takes a path.
+    """
+    if dispatcher.context.get("channel_name") == "directmessage":
+        channels = dispatcher.context.get("user_id")
+    else:
+        channels = dispatcher.context.get("channel_id")
+    LOGGER.info("Sending image %s to %s", filename, channels)
+    dispatcher.slack_client.files_upload(channels=channels, file=raw_image, filename=filename)
+
+
+# Chat platforms whose client can upload straight from memory, keyed by Dispatcher.platform_slug. Other releases of
+# nautobot-chatops may change the dispatchers, their images go through the public send_image.
+IN_MEMORY_UPLOADERS = {"slack": _slack_upload} if chatops_major_version() in SLACK_UPLOAD_MAJOR_VERSIONS else {}
+
+
+def spool_dir(size: int, max_bytes: int, directory: str) -> str:
+    """Directory the image is written to for dispatchers that need a path.
+
+    Images up to `max_bytes` go to `directory`, a memory backed filesystem such as `/dev/shm`,
+    when it is available. Larger images spill to the default temporary directory on disk.
+
+    Args:
+        size (int): Size of the image in bytes.
+        max_bytes (int): Largest image kept in `directory`.
+        directory (str): Memory backed directory.
+
+    Returns:
+        str: Parent directory of the temporary directory holding the image, None for the default.
+    """
+    if directory and size <= max_bytes and os.path.isdir(directory) and os.access(directory, os.W_OK):
+        return directory
+    return None
+
+
+def send_image_bytes(dispatcher: Dispatcher, raw_image: bytes, filename: str, max_bytes: int, directory: str):
+    """Send an image held in memory to the chat client.
+
+    Dispatchers of a known release whose client uploads from memory are given the bytes directly. Every other
+    dispatcher gets the path of a temporary file through its public `send_image`.
+
+    Args:
+        dispatcher (nautobot_chatops.dispatchers.Dispatcher): Abstracted dispatcher class for chat-ops.
+        raw_image (bytes): The encoded image.
+        filename (str): Filename shown in the chat client.
+        max_bytes (int): Largest image spooled to the memory backed `directory`.
+        directory (str): Memory backed directory used by dispatchers that need a path.
+    """
+    uploader = IN_MEMORY_UPLOADERS.get(getattr(dispatcher, "platform_slug", None))
+    if uploader is not None:
+        uploader(dispatcher, raw_image, filename)
+        return
+
+    with tempfile.TemporaryDirectory(dir=spool_dir(len(raw_image), max_bytes, directory)) as tempdir:
+        img_path = os.path.join(tempdir, filename)
+        file_descriptor = os.open(img_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            view = memoryview(raw_image)
+            while view:
+                written = os.write(file_descriptor, view)
+                view = view[written:]
+        finally:
+            os.close(file_descriptor)
+        dispatcher.send_image(img_path)
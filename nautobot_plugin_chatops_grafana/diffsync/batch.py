@@ -0,0 +1,107 @@
+"""Batched ORM writes applied at the end of a DiffSync sync."""
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, Iterable
+
+from django.db import models, transaction
+
+from nautobot_plugin_chatops_grafana.registry import subcommand_registry
+
+LOGGER = logging.getLogger("nautobot.plugin.grafana")
+
+
+class BatchWriter:
+    """Collect the creates, updates and deletes of the DiffSync models and apply them in bulk.
+
+    The writes queued during a sync are applied by `flush` inside one transaction: deletes are filtered
+    deletes, updates and creates are `bulk_update` and `bulk_create` calls of `batch_size` rows. Bulk writes
+    do not call `save()` nor send its signals, so no change log entry is recorded for the rows written and the
+    subcommands of the workers are invalidated by `flush` itself.
+
+    Row counts and timings are summed over every flush in `stats`.
+    """
+
+    def __init__(self, batch_size: int = 500):
+        """Initialize the writer.
+
+        Args:
+            batch_size (int): Rows written per bulk query.
+        """
+        self.batch_size = batch_size
+        self._creates = defaultdict(list)
+        self._updates = defaultdict(dict)
+        self._update_fields = defaultdict(set)
+        self._deletes = defaultdict(set)
+        self.stats = {"created": 0, "updated": 0, "deleted": 0, "flushes": 0, "seconds": 0.0}
+
+    def create(self, instance: models.Model):
+        """Queue the insert of an unsaved instance."""
+        self._creates[type(instance)].append(instance)
+
+    def update(self, instance: models.Model, fields: Iterable[str]):
+        """Queue the update of `fields` of a saved instance, the instance carries the new values."""
+        model = type(instance)
+        self._updates[model][instance.pk] = instance
+        self._update_fields[model].update(fields)
+
+    def delete(self, instance: models.Model):
+        """Queue the delete of a saved instance, with the rows cascading from it."""
+        self._deletes[type(instance)].add(instance.pk)
+
+    def pending(self) -> int:
+        """Return the number of writes queued since the last flush."""
+        return sum(
+            len(queued) for writes in (self._creates, self._updates, self._deletes) for queued in writes.values()
+        )
+
+    def flush(self) -> Dict[str, int]:
+        """Apply the queued writes in one transaction, deletes first so freed unique values can be reused.
+
+        Once the transaction commits, every worker rebuilds its subcommands from the rows written.
+
+        Returns:
+            Dict[str, int]: Rows created, updated and deleted, not counting the rows deleted by cascade.
+        """
+        counts = {"created": 0, "updated": 0, "deleted": 0}
+        if not self.pending():
+            return counts
+
+        start = time.perf_counter()
+        with transaction.atomic():
+            for model, pks in self._deletes.items():
+                _, deleted = model.objects.filter(pk__in=pks).delete()
+                counts["deleted"] += deleted.get(model._meta.label, 0)  # pylint: disable=protected-access
+            for model, instances in self._updates.items():
+                fields = self._update_fields[model]
+                # bulk_update skips pre_save, refresh the `auto_now` timestamps as save() would.
+                for field in model._meta.concrete_fields:  # pylint: disable=protected-access
+                    if getattr(field, "auto_now", False):
+                        fields.add(field.name)
+                        for instance in instances.values():
+                            field.pre_save(instance, add=False)
+                model.objects.bulk_update(instances.values(), fields, batch_size=self.batch_size)
+                counts["updated"] += len(instances)
+            for model, instances in self._creates.items():
+                model.objects.bulk_create(instances, batch_size=self.batch_size)
+                counts["created"] += len(instances)
+            # The post_save and post_delete handlers of signals.py are not called by bulk writes.
+            transaction.on_commit(subcommand_registry.bump)
+        elapsed = time.perf_counter() - start
+
+        self._creates.clear()
+        self._updates.clear()
+        self._update_fields.clear()
+        self._deletes.clear()
+        for key, value in counts.items():
+            self.stats[key] += value
+        self.stats["flushes"] += 1
+        self.stats["seconds"] += elapsed
+        LOGGER.info(
+            "Batched sync writes: %s created, %s updated, %s deleted in %.3fs",
+            counts["created"],
+            counts["updated"],
+            counts["deleted"],
+            elapsed,
+        )
+        return counts
@@ -1,8 +1,37 @@
 """DiffSync model definitions for Grafana Dashboards."""
-from typing import Optional, List
-from diffsync import DiffSync, DiffSyncModel
+from typing import Iterator, Optional, List
+from diffsync import DiffSync, DiffSyncFlags, DiffSyncModel
 from nautobot_plugin_chatops_grafana.models import Dashboard, Panel, PanelVariable
 from nautobot_plugin_chatops_grafana.helpers import format_command
+from nautobot_plugin_chatops_grafana.diffsync.batch import BatchWriter
+
+
+class NautobotAdapter(DiffSync):
+    """Base of the DiffSync adapters loaded from the Nautobot ORM, optionally writing the sync through a BatchWriter.
+
+    The ORM instances loaded are kept by the unique id of their DiffSync model, so batched updates and deletes do
+    not look them up again. The queued writes are applied when the sync completes.
+    """
+
+    def __init__(self, *args, batch: Optional[BatchWriter] = None, **kwargs):
+        """Initialize the adapter.
+
+        Args:
+            batch (BatchWriter): Writer collecting the ORM writes of the sync, written one row at a time when None.
+        """
+        super().__init__(*args, **kwargs)
+        self.batch = batch
+        self.instances = {}
+
+    def add_instance(self, model: DiffSyncModel, instance):
+        """Add the DiffSync model of an ORM instance."""
+        self.add(model)
+        self.instances[model.get_unique_id()] = instance
+
+    def sync_complete(self, source, diff, flags=DiffSyncFlags.NONE, logger=None):
+        """Apply the writes queued during the sync in one transaction."""
+        if self.batch is not None:
+            self.batch.flush()
 
 
 class DashboardModel(DiffSyncModel):
@@ -15,6 +44,9 @@ class DashboardModel(DiffSyncModel):
         "friendly_name",
     )
 
+    # Names of the Dashboard fields the attributes are stored in, when they differ.
+    _model_fields = {"uid": "dashboard_uid"}
+
     slug: str
     uid: str
     friendly_name: Optional[str]
@@ -32,11 +64,15 @@ class DashboardModel(DiffSyncModel):
             Optional[DiffSyncModel]: [description]
         """
         item = super().create(ids=ids, diffsync=diffsync, attrs=attrs)
-        Dashboard.objects.create(
+        dashboard = Dashboard(
             dashboard_slug=ids["slug"],
             dashboard_uid=attrs["uid"],
             friendly_name=attrs["friendly_name"],
         )
+        if diffsync.batch is not None:
+            diffsync.batch.create(dashboard)
+        else:
+            dashboard.save()
         return item
 
     def update(self, attrs: dict) -> Optional[DiffSyncModel]:
@@ -48,11 +84,19 @@ class DashboardModel(DiffSyncModel):
         Returns:
             Optional[DiffSyncModel]: Updated model.
         """
-        dashboard_object = Dashboard.objects.get(dashboard_slug=self.slug)
-
-        for key, value in attrs.items():
-            setattr(dashboard_object, key, value)
-        dashboard_object.save()
+        if self.diffsync.batch is not None:
+            dashboard_object = self.diffsync.instances[self.get_unique_id()]
+        else:
+            dashboard_object = Dashboard.objects.get(dashboard_slug=self.slug)
+
+        fields = [self._model_fields.get(key, key) for key in attrs]
+        for field, value in zip(fields, attrs.values()):
+            setattr(dashboard_object, field, value)
+
+        if self.diffsync.batch is not None:
+            self.diffsync.batch.update(dashboard_object, fields)
+        else:
+            dashboard_object.save()
         return super().update(attrs)
 
     def delete(self) -> Optional[DiffSyncModel]:
@@ -61,13 +105,16 @@ class DashboardModel(DiffSyncModel):
         Returns:
             Optional[DiffSyncModel]: Updated model.
         """
-        Dashboard.objects.get(dashboard_slug=self.slug).delete()
+        if self.diffsync.batch is not None:
+            self.diffsync.batch.delete(self.diffsync.instances[self.get_unique_id()])
+        else:
+            Dashboard.objects.get(dashboard_slug=self.slug).delete()
 
         super().delete()
         return self
 
 
-class NautobotDashboard(DiffSync):
+class NautobotDashboard(NautobotAdapter):
     """NautobotDashboard class used to represent the data model for nautobot_plugin_chatops_grafana.models.Dashboard."""
 
     dashboard = DashboardModel
@@ -80,10 +127,11 @@ class NautobotDashboard(DiffSync):
 
         for dashboard in dashboards:
             # Create a dashboard record for this item
-            self.add(
+            self.add_instance(
                 self.dashboard(
                     uid=dashboard.dashboard_uid, slug=dashboard.dashboard_slug, friendly_name=dashboard.friendly_name
-                )
+                ),
+                dashboard,
             )
 
 
@@ -144,13 +192,17 @@ class PanelModel(DiffSyncModel):
             Optional[DiffSyncModel]: [description]
         """
         item = super().create(ids=ids, diffsync=diffsync, attrs=attrs)
-        Panel.objects.create(
+        panel = Panel(
             dashboard=attrs["dashboard"],
             command_name=ids["command_name"],
             panel_id=attrs["panel_id"],
             friendly_name=attrs["friendly_name"],
             active=False,
         )
+        if diffsync.batch is not None:
+            diffsync.batch.create(panel)
+        else:
+            panel.save()
         return item
 
     def update(self, attrs: dict) -> Optional[DiffSyncModel]:
@@ -162,11 +214,18 @@ class PanelModel(DiffSyncModel):
         Returns:
             Optional[DiffSyncModel]: Updated model.
         """
-        panel_object = Panel.objects.get(command_name=self.command_name)
+        if self.diffsync.batch is not None:
+            panel_object = self.diffsync.instances[self.get_unique_id()]
+        else:
+            panel_object = Panel.objects.get(command_name=self.command_name)
 
         for key, value in attrs.items():
             setattr(panel_object, key, value)
-        panel_object.save()
+
+        if self.diffsync.batch is not None:
+            self.diffsync.batch.update(panel_object, attrs.keys())
+        else:
+            panel_object.save()
         return super().update(attrs)
 
     def delete(self) -> Optional[DiffSyncModel]:
@@ -175,13 +234,16 @@ class PanelModel(DiffSyncModel):
         Returns:
             Optional[DiffSyncModel]: Updated model.
         """
-        Panel.objects.get(command_name=self.command_name).delete()
+        if self.diffsync.batch is not None:
+            self.diffsync.batch.delete(self.diffsync.instances[self.get_unique_id()])
+        else:
+            Panel.objects.get(command_name=self.command_name).delete()
 
         super().delete()
         return self
 
 
-class NautobotPanel(DiffSync):
+class NautobotPanel(NautobotAdapter):
     """NautobotPanel class used to represent the data model for nautobot_plugin_chatops_grafana.models.Panel."""
 
     panel = PanelModel
@@ -194,13 +256,14 @@ class NautobotPanel(DiffSync):
 
         for panel in panels:
             # Create a panel record for this item
-            self.add(
+            self.add_instance(
                 self.panel(
                     dashboard=panel.dashboard,
                     command_name=panel.command_name,
                     panel_id=panel.panel_id,
                     friendly_name=panel.friendly_name,
-                )
+                ),
+                panel,
             )
 
 
@@ -214,12 +277,14 @@ class GrafanaPanel(DiffSync):
     _required_fields = ("id",)
 
     def __init__(self, panels: List[dict], dashboard: Dashboard, *args, **kwargs):
-        """Initialize the DiffSync model and populate the object."""
+        """Initialize the DiffSync model and populate the object in a single pass over the panels."""
         super().__init__(*args, **kwargs)
 
-        panel_iterator = {}
+        # Command names given so far, and the last suffix used for each title that formatted to a taken name.
+        taken = set()
+        suffixes = {}
 
-        for panel in panels:
+        for panel in self.iter_panels(panels):
 
             # Validation to ensure the required keys exist. If not, fail and continue to the next.
             if not all(x in panel.keys() for x in self._required_fields):
@@ -237,15 +302,12 @@ class GrafanaPanel(DiffSync):
             if not title:
                 continue
 
-            command = format_command(title)
-            existing = self.dict()
-            if existing.get("panel"):
-                if command in existing["panel"].keys():
-                    if panel_iterator.get(command):
-                        command = f"{command}-{panel_iterator.get(command)+1}"
-                    else:
-                        command = f"{command}-1"
-                        panel_iterator[command] = 1
+            # Panels sharing a title are numbered in the order of the dashboard: cpu, cpu-1, cpu-2...
+            command = base = format_command(title)
+            while command in taken:
+                suffixes[base] = suffixes.get(base, 0) + 1
+                command = f"{base}-{suffixes[base]}"
+            taken.add(command)
 
             # Create a record for this item
             self.add(
@@ -257,6 +319,14 @@ class GrafanaPanel(DiffSync):
                 )
             )
 
+    @classmethod
+    def iter_panels(cls, panels: List[dict]) -> Iterator[dict]:
+        """Yield the panels of a dashboard, each row followed by the panels it holds while collapsed."""
+        for panel in panels:
+            yield panel
+            if panel.get("type", "row") == "row":
+                yield from cls.iter_panels(panel.get("panels", []))
+
 
 class VariableModel(DiffSyncModel):
     """VariableModel class used to model the response into a consumable format."""
@@ -290,7 +360,7 @@ class VariableModel(DiffSyncModel):
             Optional[DiffSyncModel]: [description]
         """
         item = super().create(ids=ids, diffsync=diffsync, attrs=attrs)
-        PanelVariable.objects.create(
+        variable = PanelVariable(
             panel=ids["panel"],
             name=ids["name"],
             includeincmd=attrs["includeincmd"],
@@ -299,6 +369,10 @@ class VariableModel(DiffSyncModel):
             friendly_name=attrs["friendly_name"],
             positional_order=100,
         )
+        if diffsync.batch is not None:
+            diffsync.batch.create(variable)
+        else:
+            variable.save()
         return item
 
     def update(self, attrs: dict) -> Optional[DiffSyncModel]:
@@ -310,14 +384,23 @@ class VariableModel(DiffSyncModel):
         Returns:
             Optional[DiffSyncModel]: Updated model.
         """
-        variable_object = PanelVariable.objects.get(name=self.name, panel=self.panel)
+        if self.diffsync.batch is not None:
+            variable_object = self.diffsync.instances[self.get_unique_id()]
+        else:
+            variable_object = PanelVariable.objects.get(name=self.name, panel=self.panel)
 
+        fields = []
         for key, value in attrs.items():
             # Skip synchronization of static created attributes during the sync process.
             if key in ["includeincmd", "includeinurl"]:
                 continue
             setattr(variable_object, key, value)
-        variable_object.save()
+            fields.append(key)
+
+        if self.diffsync.batch is not None:
+            self.diffsync.batch.update(variable_object, fields)
+        else:
+            variable_object.save()
         return super().update(attrs)
 
     def delete(self) -> Optional[DiffSyncModel]:
@@ -326,13 +409,16 @@ class VariableModel(DiffSyncModel):
         Returns:
             Optional[DiffSyncModel]: Updated model.
         """
-        PanelVariable.objects.get(name=self.name, panel=self.panel).delete()
+        if self.diffsync.batch is not None:
+            self.diffsync.batch.delete(self.diffsync.instances[self.get_unique_id()])
+        else:
+            PanelVariable.objects.get(name=self.name, panel=self.panel).delete()
 
         super().delete()
         return self
 
 
-class NautobotVariable(DiffSync):
+class NautobotVariable(NautobotAdapter):
     """NautobotVariable class used to represent the model for nautobot_plugin_chatops_grafana.models.PanelVariable."""
 
     variable = VariableModel
@@ -345,7 +431,7 @@ class NautobotVariable(DiffSync):
 
         for variable in variables:
             # Create a panel record for this item
-            self.add(
+            self.add_instance(
                 self.variable(
                     panel=variable.panel,
                     name=variable.name,
@@ -353,7 +439,8 @@ class NautobotVariable(DiffSync):
                     includeinurl=variable.includeinurl,
                     response=variable.response,
                     friendly_name=variable.friendly_name,
-                )
+                ),
+                variable,
             )
 
 
@@ -1,8 +1,17 @@
 """Synchronization functions for the implemented DiffSync models."""
-from typing import Union
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Union
 from diffsync import DiffSyncFlags
+from django.db import connections, transaction
+from django.utils.dateparse import parse_datetime
+from django_rq import job
+from nautobot_plugin_chatops_grafana.exceptions import SyncAbortedError
 from nautobot_plugin_chatops_grafana.grafana import handler
+from nautobot_plugin_chatops_grafana.grafana_async import async_handler, run_async
 from nautobot_plugin_chatops_grafana.models import Dashboard, Panel, PanelVariable
+from nautobot_plugin_chatops_grafana.diffsync.batch import BatchWriter
 from nautobot_plugin_chatops_grafana.diffsync.models import (
     NautobotDashboard,
     GrafanaDashboard,
@@ -12,23 +21,53 @@ from nautobot_plugin_chatops_grafana.diffsync.models import (
     GrafanaVariable,
 )
 
+LOGGER = logging.getLogger("nautobot.plugin.grafana")
 
-def run_dashboard_sync(overwrite: bool = False) -> Union[str, None]:
+
+def default_batch_writer() -> Union[BatchWriter, None]:
+    """Return a BatchWriter when `sync_batch_writes` is enabled, otherwise None to write one row at a time."""
+    if not handler.config.sync_batch_writes:
+        return None
+    return BatchWriter(batch_size=handler.config.sync_batch_size)
+
+
+def list_grafana_dashboards() -> List[dict]:
+    """Fetch the dashboards listed by `/api/search`.
+
+    Raises:
+        SyncAbortedError: Grafana could not list its dashboards. Diffing against an empty listing would delete every
+            dashboard, with its panels and variables, from Nautobot.
+    """
+    grafana_dashboards = handler.get_dashboards()
+    if grafana_dashboards is None:
+        raise SyncAbortedError("Grafana dashboards could not be listed, the synchronization was aborted.")
+    return grafana_dashboards
+
+
+def run_dashboard_sync(
+    overwrite: bool = False, grafana_dashboards: List[dict] = None, batch: BatchWriter = None
+) -> Union[str, None]:
     """run_dashboard_sync will run a diffsync between Grafana and Nautobot data, then sync if there are inconsistencies.
 
     Args:
         overwrite (bool): Overwrite Nautobot data and delete records that are no longer in Grafana.
+        grafana_dashboards (List[dict]): Dashboards already fetched from `/api/search`, fetched when not given.
+        batch (BatchWriter): Writer applying the changes in bulk, defaults to the `sync_batch_writes` setting.
+
+    Raises:
+        SyncAbortedError: Grafana could not list its dashboards.
     """
     df_flags = DiffSyncFlags.NONE if overwrite else DiffSyncFlags.SKIP_UNMATCHED_DST
 
     # Fetch dashboards from the Grafana API
-    grafana_dashboards = handler.get_dashboards()
+    if grafana_dashboards is None:
+        grafana_dashboards = list_grafana_dashboards()
 
     # Fetch dashboards from the Nautobot ORM
     nautobot_dashboards = Dashboard.objects.all()
 
     # Load the dashboards info retrieved from the API into the DiffSync model.
-    diff_nautobot_dashboards = NautobotDashboard(nautobot_dashboards)
+    diff_nautobot_dashboards = NautobotDashboard(nautobot_dashboards, batch=batch or default_batch_writer())
 
     # Load the Dashboard objects retrieved from the Nautobot ORM into the DiffSync model.
     diff_grafana_dashboards = GrafanaDashboard(grafana_dashboards)
@@ -42,23 +81,34 @@ def run_dashboard_sync(overwrite: bool = False) -> Union[str, None]:
     return diff_result.str()
 
 
-def run_panels_sync(dashboard: Dashboard, overwrite: bool = False) -> Union[str, None]:
+def run_panels_sync(
+    dashboard: Dashboard,
+    overwrite: bool = False,
+    version: int = None,
+    batch: BatchWriter = None,
+    refresh: bool = False,
+) -> Union[str, None]:
     """run_panels_sync will run a diffsync between Grafana and Nautobot data, then sync if there are inconsistencies.
 
     Args:
         dashboard (nautobot_plugin_chatops_grafana.models.Dashboard): The dashboard we are going to do a diffsync with.
         overwrite (bool): Overwrite Nautobot data and delete records that are no longer in Grafana.
+        version (int): Grafana version of the dashboard, when known, to reuse its cached document.
+        batch (BatchWriter): Writer applying the changes in bulk, in one transaction, defaults to the
+            `sync_batch_writes` setting.
+        refresh (bool): Fetch the document from Grafana rather than the one cached within `dashboard_cache_ttl`
+            seconds, when the version is unknown and the sync must see the latest changes.
     """
     df_flags = DiffSyncFlags.NONE if overwrite else DiffSyncFlags.SKIP_UNMATCHED_DST
 
     # Fetch panels from the Grafana API
-    grafana_panels = handler.get_panels(dashboard_uid=dashboard.dashboard_uid)
+    grafana_panels = handler.get_panels(dashboard_uid=dashboard.dashboard_uid, version=version, refresh=refresh)
 
     # Fetch panels from the Nautobot ORM
     nautobot_panels = Panel.objects.filter(dashboard=dashboard)
 
     # Load the panels info retrieved from the API into the DiffSync model.
-    diff_nautobot = NautobotPanel(nautobot_panels)
+    diff_nautobot = NautobotPanel(nautobot_panels, batch=batch or default_batch_writer())
 
     # Load the Panel objects retrieved from the Nautobot ORM into the DiffSync model.
     diff_grafana = GrafanaPanel(grafana_panels, dashboard)
@@ -72,17 +122,28 @@ def run_panels_sync(dashboard: Dashboard, overwrite: bool = False) -> Union[str,
     return diff_result.str()
 
 
-def run_variables_sync(dashboard: Dashboard, overwrite: bool = False) -> Union[str, None]:
+def run_variables_sync(
+    dashboard: Dashboard,
+    overwrite: bool = False,
+    version: int = None,
+    batch: BatchWriter = None,
+    refresh: bool = False,
+) -> Union[str, None]:
     """run_variables_sync will run a diffsync between Grafana and Nautobot data, then sync if there are inconsistencies.
 
     Args:
         dashboard (nautobot_plugin_chatops_grafana.models.Dashboard): The dashboard we are going to do a diffsync with.
         overwrite (bool): Overwrite Nautobot data and delete records that are no longer in Grafana.
+        version (int): Grafana version of the dashboard, when known, to reuse its cached document.
+        batch (BatchWriter): Writer applying the changes in bulk, in one transaction, defaults to the
+            `sync_batch_writes` setting.
+        refresh (bool): Fetch the document from Grafana rather than the one cached within `dashboard_cache_ttl`
+            seconds, when the version is unknown and the sync must see the latest changes.
     """
     df_flags = DiffSyncFlags.NONE if overwrite else DiffSyncFlags.SKIP_UNMATCHED_DST
 
     # Fetch panels from the Grafana API
-    grafana_variables = handler.get_variables(dashboard_uid=dashboard.dashboard_uid)
+    grafana_variables = handler.get_variables(dashboard_uid=dashboard.dashboard_uid, version=version, refresh=refresh)
 
     # Fetch panels from the Nautobot ORM
     nautobot_variables = []
@@ -90,7 +151,7 @@ def run_variables_sync(dashboard: Dashboard, overwrite: bool = False) -> Union[s
         nautobot_variables.extend(PanelVariable.objects.filter(panel=panel))
 
     # Load the panels info retrieved from the API into the DiffSync model.
-    diff_nautobot = NautobotVariable(nautobot_variables)
+    diff_nautobot = NautobotVariable(nautobot_variables, batch=batch or default_batch_writer())
 
     # Load the Panel objects retrieved from the Nautobot ORM into the DiffSync model.
     diff_grafana = GrafanaVariable(grafana_variables, dashboard)
@@ -102,3 +163,180 @@ def run_variables_sync(dashboard: Dashboard, overwrite: bool = False) -> Union[s
 
     diff_nautobot.sync_from(diff_grafana, flags=df_flags)
     return diff_result.str()
+
+
+def latest_versions(grafana_dashboards: List[dict]) -> Dict[str, dict]:
+    """Fetch the latest Grafana version of the dashboards listed by `/api/search` concurrently.
+
+    Args:
+        grafana_dashboards (List[dict]): Dashboards listed by `/api/search`.
+
+    Returns:
+        Dict[str, dict]: The `version` and `created` time of the latest save keyed by dashboard uid, empty for the
+            dashboards whose version could not be fetched.
+    """
+    dashboard_ids = {dashboard["uid"]: dashboard["id"] for dashboard in grafana_dashboards if "id" in dashboard}
+    versions = run_async(async_handler.get_dashboard_versions_many(dashboard_ids.values()))
+    return {uid: versions[dashboard_id] for uid, dashboard_id in dashboard_ids.items()}
+
+
+def dashboards_to_sync(versions: Dict[str, dict], incremental: bool = True) -> List[Dashboard]:
+    """Select the dashboards whose panels and variables must be synced.
+
+    Args:
+        versions (Dict[str, dict]): Latest Grafana versions keyed by dashboard uid, as returned by `latest_versions`.
+        incremental (bool): Select only the dashboards whose Grafana version changed since their last sync.
+            Dashboards whose version could not be fetched are left to the next sync: their document would most
+            likely fail to download too, and no version would be recorded for them.
+
+    Returns:
+        List[Dashboard]: The dashboards listed in `versions` to sync.
+    """
+    dashboards = []
+    for dashboard in Dashboard.objects.filter(dashboard_uid__in=versions.keys()):
+        version = versions[dashboard.dashboard_uid].get("version")
+        if incremental and version is None:
+            LOGGER.warning("Version of dashboard %s unknown, left to the next sync", dashboard.dashboard_slug)
+            continue
+        if incremental and version == dashboard.grafana_version:
+            continue
+        dashboards.append(dashboard)
+    return dashboards
+
+
+def run_contents_sync(
+    dashboard: Dashboard, overwrite: bool = False, latest: dict = None, batch: BatchWriter = None
+) -> List[str]:
+    """run_contents_sync will sync the panels, then the variables of a dashboard, and record its Grafana version.
+
+    Everything is written in one transaction, the writes of a BatchWriter are flushed inside it.
+
+    Args:
+        dashboard (nautobot_plugin_chatops_grafana.models.Dashboard): The dashboard we are going to do a diffsync with.
+        overwrite (bool): Overwrite Nautobot data and delete records that are no longer in Grafana.
+        latest (dict): Latest Grafana version of the dashboard, as returned by `latest_versions`. Nothing is recorded
+            when the version is unknown, so an incremental sync syncs the dashboard again.
+        batch (BatchWriter): Writer applying the changes in bulk, defaults to the `sync_batch_writes` setting.
+
+    Returns:
+        List[str]: The diffs of the panels and variables that were synchronized.
+    """
+    version = (latest or {}).get("version")
+    with transaction.atomic():
+        diffs = [
+            run_panels_sync(dashboard, overwrite, version=version, batch=batch),
+            run_variables_sync(dashboard, overwrite, version=version, batch=batch),
+        ]
+        if version is not None:
+            Dashboard.objects.filter(pk=dashboard.pk).update(
+                grafana_version=version, grafana_updated=parse_datetime(latest.get("created") or "")
+            )
+    return [diff for diff in diffs if diff]
+
+
+def run_incremental_sync(overwrite: bool = False, batch: BatchWriter = None) -> Union[str, None]:
+    """run_incremental_sync will sync the dashboards, then the panels and variables of the dashboards that changed.
+
+    The latest Grafana version of every dashboard listed by `/api/search` is fetched concurrently and compared
+    with the version recorded by the previous incremental sync. Only the documents of the dashboards whose version
+    differs are fetched and diffed, so a sync where nothing changed in Grafana costs one small request per dashboard.
+
+    Args:
+        overwrite (bool): Overwrite Nautobot data and delete records that are no longer in Grafana.
+        batch (BatchWriter): Writer applying the changes in bulk, defaults to the `sync_batch_writes` setting. Its
+            `stats` total the rows written by the dashboard sync and by every dashboard synced.
+
+    Raises:
+        SyncAbortedError: Grafana could not list its dashboards.
+    """
+    batch = batch or default_batch_writer()
+    grafana_dashboards = list_grafana_dashboards()
+    diffs = [run_dashboard_sync(overwrite, grafana_dashboards=grafana_dashboards, batch=batch)]
+
+    versions = latest_versions(grafana_dashboards)
+    for dashboard in dashboards_to_sync(versions, incremental=True):
+        diffs.extend(run_contents_sync(dashboard, overwrite, latest=versions[dashboard.dashboard_uid], batch=batch))
+
+    diffs = [diff for diff in diffs if diff]
+    return "\n".join(diffs) if diffs else None
+
+
+def _run_contents_sync_thread(dashboard: Dashboard, overwrite: bool, latest: dict) -> List[str]:
+    """Run the contents sync of a dashboard on a pool thread, releasing the database connection of the thread."""
+    try:
+        return run_contents_sync(dashboard, overwrite, latest=latest)
+    finally:
+        connections.close_all()
+
+
+def run_organization_sync(overwrite: bool = False, incremental: bool = False, concurrency: int = None) -> dict:
+    """run_organization_sync will sync the dashboards, then the panels and variables of every dashboard in parallel.
+
+    Dashboards are synced on a pool of `concurrency` threads, each in its own transactions. A dashboard failing to
+    sync is reported and does not stop the others.
+
+    Args:
+        overwrite (bool): Overwrite Nautobot data and delete records that are no longer in Grafana.
+        incremental (bool): Skip the dashboards whose Grafana version did not change since they were last synced.
+        concurrency (int): Dashboards synced at once, defaults to the `sync_concurrency` setting.
+
+    Returns:
+        dict: Number of dashboards listed by Grafana, synced, changed and skipped, the error of each dashboard that
+            failed keyed by slug, and the duration in seconds.
+
+    Raises:
+        SyncAbortedError: Grafana could not list its dashboards.
+    """
+    start = time.perf_counter()
+    grafana_dashboards = list_grafana_dashboards()
+    run_dashboard_sync(overwrite, grafana_dashboards=grafana_dashboards)
+    versions = latest_versions(grafana_dashboards)
+
+    dashboards = dashboards_to_sync(versions, incremental=incremental)
+    report = {
+        "dashboards": len(versions),
+        "synced": 0,
+        "changed": 0,
+        "skipped": len(versions) - len(dashboards),
+        "failed": {},
+        "seconds": 0.0,
+    }
+
+    with ThreadPoolExecutor(
+        max_workers=concurrency or handler.config.sync_concurrency, thread_name_prefix="grafana-sync"
+    ) as executor:
+        futures = {
+            executor.submit(
+                _run_contents_sync_thread, dashboard, overwrite, versions[dashboard.dashboard_uid]
+            ): dashboard
+            for dashboard in dashboards
+        }
+        for future in as_completed(futures):
+            dashboard = futures[future]
+            try:
+                diffs = future.result()
+            except Exception as exc:  # pylint: disable=broad-except
+                LOGGER.error("Synchronization of dashboard %s failed: %s", dashboard.dashboard_slug, exc)
+                report["failed"][dashboard.dashboard_slug] = str(exc)
+                continue
+            report["synced"] += 1
+            report["changed"] += bool(diffs)
+
+    report["seconds"] = time.perf_counter() - start
+    LOGGER.info(
+        "Synchronized %s of %s Grafana dashboards in %.1fs: %s changed, %s skipped, %s failed",
+        report["synced"],
+        report["dashboards"],
+        report["seconds"],
+        report["changed"],
+        report["skipped"],
+        len(report["failed"]),
+    )
+    handler.log_stats()
+    return report
+
+
+@job(handler.config.worker_queue, timeout=handler.config.sync_job_timeout)
+def sync_organization(overwrite: bool = False, incremental: bool = False) -> dict:
+    """RQ job running `run_organization_sync`, its report is kept as the result of the job."""
+    return run_organization_sync(overwrite=overwrite, incremental=incremental)
@@ -1,6 +1,7 @@
 """Nautobot Plugin ChatOps Grafana Exceptions."""
 from pydantic import ValidationError
 from isodate import ISO8601Error
+from requests.exceptions import RequestException
 
 
 class DefaultArgsError(BaseException):
@@ -34,3 +35,19 @@ class PanelError(BaseException):
 
 class MultipleOptionsError(BaseException):
     """Error raised when there are too many options to perform an action. Send options back to user."""
+
+
+class MultiValueError(BaseException):
+    """Error raised when comma separated or glob arguments of a chat command cannot be expanded."""
+
+
+class CircuitOpenError(RequestException):
+    """Error raised instead of calling Grafana while the circuit breaker is open."""
+
+
+class SyncAbortedError(Exception):
+    """Error raised when Grafana could not list its dashboards, to abort a sync rather than diff an empty listing."""
+
+
+class WorkerShutdownError(Exception):
+    """Error raised in the jobs still running on the threaded worker when it is shut down cold."""
@@ -81,13 +81,14 @@ class PanelsForm(BootstrapMixin, ModelForm):
     friendly_name = CharField(max_length=64)
     panel_id = IntegerField()
     active = BooleanField()
+    cache_ttl = IntegerField(required=False, min_value=0, label="Render Cache TTL")
 
     class Meta:
         """Metaclass attributes of Panel."""
 
         model = Panel
 
-        fields = ("dashboard", "command_name", "friendly_name", "panel_id", "active")
+        fields = ("dashboard", "command_name", "friendly_name", "panel_id", "active", "cache_ttl")
 
 
 class PanelsSyncForm(BootstrapMixin, ModelForm):
@@ -144,12 +145,14 @@ class PanelsBulkEditForm(BootstrapMixin, BulkEditForm):
     pk = ModelMultipleChoiceField(queryset=Panel.objects.all(), widget=MultipleHiddenInput)
     friendly_name = CharField(max_length=255, required=False)
     active = BooleanField(required=False)
+    cache_ttl = IntegerField(required=False, min_value=0, label="Render Cache TTL")
 
     class Meta:
         """Meta attributes."""
 
         nullable_fields = [
             "friendly_name",
+            "cache_ttl",
         ]
 
 
@@ -1,16 +1,23 @@
 """This module is intended to handle grafana requests generically perhaps outside of nautobot."""
 import datetime
+import functools
 import logging
+import math
+import time
 import urllib.parse
-from typing import Union, Tuple, List
+from typing import Dict, Optional, Union, Tuple, List
 import requests
 import isodate
 
 from django.conf import settings
 from pydantic import BaseModel  # pylint: disable=no-name-in-module
-from requests.exceptions import RequestException
+from requests.exceptions import ConnectionError as RequestsConnectionError, RequestException, Timeout
 from typing_extensions import Literal
-from nautobot_plugin_chatops_grafana.models import Panel, PanelVariable
+from nautobot_plugin_chatops_grafana.models import Dashboard, Panel, PanelVariable
+from nautobot_plugin_chatops_grafana.cache import DashboardDocumentCache, RenderCache, SingleFlight, make_render_key
+from nautobot_plugin_chatops_grafana.exceptions import CircuitOpenError
+from nautobot_plugin_chatops_grafana.resilience import CircuitBreaker, LatencyTracker, retry_budget, retry_call
+from nautobot_plugin_chatops_grafana.session import DownloadMetrics, GrafanaSession
 
 LOGGER = logging.getLogger("nautobot.plugin.grafana")
 PLUGIN_SETTINGS = settings.PLUGINS_CONFIG["nautobot_plugin_chatops_grafana"]
@@ -19,6 +26,9 @@ SLASH_COMMAND = "grafana"
 GRAFANA_LOGO_PATH = "grafana/grafana_icon.png"
 GRAFANA_LOGO_ALT = "Grafana Logo"
 REQUEST_TIMEOUT_SEC = 60
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+# Responses telling Grafana, or the proxy in front of it, is unhealthy, other errors do not trip the breaker.
+BREAKER_STATUS_CODES = (502, 503, 504)
 
 
 class GrafanaConfigSettings(BaseModel):  # pylint: disable=too-few-public-methods
@@ -32,6 +42,94 @@ class GrafanaConfigSettings(BaseModel):  # pylint: disable=too-few-public-method
     default_timespan: datetime.timedelta
     grafana_org_id: int
     default_tz: str
+    pool_connections: int = 10
+    pool_maxsize: int = 10
+    pool_block: bool = False
+    tcp_keepalive: bool = True
+    render_cache_ttl: int = 60
+    render_cache_max_bytes: int = 32 * 1024 * 1024
+    render_cache_alias: str = "default"
+    single_flight_enabled: bool = True
+    single_flight_wait: Optional[float] = None
+    single_flight_poll_interval: float = 0.25
+    dashboard_snapshot_width: int = 1920
+    render_concurrency: int = 8
+    fanout_max_renders: int = 12
+    fanout_columns: int = 2
+    menu_max_choices: int = 100
+    menu_token_ttl: int = 900
+    image_spool_max_bytes: int = 8 * 1024 * 1024
+    image_spool_dir: str = "/dev/shm"  # nosec
+    render_max_bytes: int = 16 * 1024 * 1024
+    render_chunk_size: int = 64 * 1024
+    image_postprocess: Literal["none", "optimize", "quantize", "webp", "jpeg"] = "none"
+    image_postprocess_platforms: Dict[str, Literal["none", "optimize", "quantize", "webp", "jpeg"]] = {}
+    image_quality: int = 80
+    image_palette_colors: int = 256
+    connect_timeout: float = 5.0
+    timeout_percentile: float = 0.99
+    timeout_multiplier: float = 3.0
+    timeout_min: float = 5.0
+    timeout_max: float = REQUEST_TIMEOUT_SEC
+    timeout_window: int = 200
+    retry_attempts: int = 2
+    retry_backoff: float = 0.5
+    retry_backoff_max: float = 5.0
+    breaker_failure_threshold: int = 5
+    breaker_reset_timeout: int = 30
+    dashboard_cache_ttl: int = 60
+    dashboard_version_ttl: int = 86400
+    worker_queue: str = "default"
+    worker_threads: int = 16
+    worker_stats_interval: int = 300
+    sync_batch_writes: bool = False
+    sync_batch_size: int = 500
+    sync_concurrency: int = 8
+    sync_job_timeout: int = 3600
+
+
+@functools.lru_cache(maxsize=128)
+def parse_timespan(timespan: str) -> Union[datetime.timedelta, isodate.Duration]:
+    """Parse an ISO8601 duration once per distinct value, the same few such as `P1D` or `PT6H` are used over and over.
+
+    Durations with years or months are returned as an `isodate.Duration`, their length depends on the date
+    they end on.
+
+    Examples:
+        >>> parse_timespan("PT6H")
+        datetime.timedelta(seconds=21600)
+    """
+    return isodate.parse_duration(timespan)
+
+
+class RenderContext(BaseModel):  # pylint: disable=too-few-public-methods
+    """Immutable parameters of a single chat request, carried through the render and url helpers.
+
+    Nothing about a request is kept on the shared `handler`, so concurrent requests served by one
+    process never see each other's arguments, and the time window is anchored on the moment the
+    request was made instead of when the process started.
+    """
+
+    subcommand: str = ""
+    width: int
+    height: int
+    theme: Literal["light", "dark"]
+    timespan: datetime.timedelta
+    timezone: str
+    now: datetime.datetime
+
+    class Config:  # pylint: disable=too-few-public-methods
+        """A context is never modified once built."""
+
+        allow_mutation = False
+
+    def time_range(self) -> Dict[str, str]:
+        """Return the `from` and `to` epoch milliseconds of the timespan ending now, empty for a zero timespan."""
+        from_time = str(int((self.now - self.timespan).timestamp() * 1e3))
+        to_time = str(int(self.now.timestamp() * 1e3))
+        if from_time == to_time:
+            return {}
+        return {"from": from_time, "to": to_time}
 
 
 class GrafanaHandler:
@@ -39,12 +137,56 @@ class GrafanaHandler:
 
     config: GrafanaConfigSettings = None
     panels = None
-    current_subcommand = ""
-    now = datetime.datetime.utcnow()
 
     def __init__(self, config: dict) -> None:
         """Initialize the class."""
         self.config = GrafanaConfigSettings(**config)
+        self.http = GrafanaSession(
+            pool_connections=self.config.pool_connections,
+            pool_maxsize=self.config.pool_maxsize,
+            pool_block=self.config.pool_block,
+            tcp_keepalive=self.config.tcp_keepalive,
+        )
+        self.render_cache = RenderCache(
+            max_bytes=self.config.render_cache_max_bytes,
+            shared_alias=self.config.render_cache_alias,
+        )
+        # Longest a render may take, retries and backoff included.
+        render_budget = retry_budget(
+            self.config.retry_attempts,
+            timeout=self.config.connect_timeout + self.config.timeout_max,
+            base=self.config.retry_backoff,
+            maximum=self.config.retry_backoff_max,
+        )
+        single_flight_wait = self.config.single_flight_wait
+        if single_flight_wait is None:
+            # Wait as long as the leader may spend on its request.
+            single_flight_wait = render_budget
+        # Bound told to the chat users, a follower may wait on the leader for up to `single_flight_wait`.
+        self.max_render_seconds = math.ceil(max(render_budget, single_flight_wait))
+        self.single_flight = SingleFlight(
+            shared_alias=self.config.render_cache_alias,
+            wait_timeout=single_flight_wait,
+            poll_interval=self.config.single_flight_poll_interval,
+        )
+        self.dashboard_documents = DashboardDocumentCache(
+            shared_alias=self.config.render_cache_alias,
+            ttl=self.config.dashboard_cache_ttl,
+            version_ttl=self.config.dashboard_version_ttl,
+        )
+        self.download_metrics = DownloadMetrics()
+        self.latency = LatencyTracker(
+            window=self.config.timeout_window,
+            percentile=self.config.timeout_percentile,
+            multiplier=self.config.timeout_multiplier,
+            min_timeout=self.config.timeout_min,
+            max_timeout=self.config.timeout_max,
+        )
+        self.circuit_breaker = CircuitBreaker(
+            shared_alias=self.config.render_cache_alias,
+            failure_threshold=self.config.breaker_failure_threshold,
+            reset_timeout=self.config.breaker_reset_timeout,
+        )
         self.load_panels()
         self.default_params = {
             "width": self.config.default_width,
@@ -83,82 +225,74 @@ class GrafanaHandler:
         """Simple Get Timezone."""
         return self.config.default_tz
 
-    @width.setter
-    def width(self, new_width: int):
-        """Simple Set Width.  Must redefine the config model for pydantic to validate."""
-        new_config = GrafanaConfigSettings(
-            grafana_url=self.config.grafana_url,
-            grafana_api_key=self.config.grafana_api_key,
-            default_width=new_width,
-            default_height=self.config.default_height,
-            default_theme=self.config.default_theme,
-            default_timespan=self.config.default_timespan,
-            grafana_org_id=self.config.grafana_org_id,
-            default_tz=self.config.default_tz,
-        )
-        self.config = new_config
-
-    @height.setter
-    def height(self, new_height: int):
-        """Simple Set Height.  Must redefine the config model for pydantic to validate."""
-        new_config = GrafanaConfigSettings(
-            grafana_url=self.config.grafana_url,
-            grafana_api_key=self.config.grafana_api_key,
-            default_width=self.config.default_width,
-            default_height=new_height,
-            default_theme=self.config.default_theme,
-            default_timespan=self.config.default_timespan,
-            grafana_org_id=self.config.grafana_org_id,
-            default_tz=self.config.default_tz,
-        )
-        self.config = new_config
-
-    @theme.setter
-    def theme(self, new_theme: Literal["light", "dark"]):
-        """Simple Set Theme.  Must redefine the config model for pydantic to validate."""
-        new_config = GrafanaConfigSettings(
-            grafana_url=self.config.grafana_url,
-            grafana_api_key=self.config.grafana_api_key,
-            default_width=self.config.default_width,
-            default_height=self.config.default_height,
-            default_theme=new_theme,
-            default_timespan=self.config.default_timespan,
-            grafana_org_id=self.config.grafana_org_id,
-            default_tz=self.config.default_tz,
+    def render_context(self, subcommand: str = "", **params) -> RenderContext:
+        """Build the context of a request from the configured defaults overridden by the chat arguments.
+
+        Args:
+            subcommand (str): Chat subcommand being served.
+            **params: `width`, `height`, `theme`, `timespan` (an ISO8601 duration) and `timezone` given by the user.
+
+        Raises:
+            pydantic.ValidationError: A parameter does not match its type.
+            isodate.ISO8601Error: The timespan is not an ISO8601 duration.
+
+        Returns:
+            RenderContext: The validated, immutable context.
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
+        values = {**self.default_params, **params}
+        if values == self.default_params:
+            # The configured defaults were validated with the plugin settings.
+            return RenderContext.construct(subcommand=subcommand, now=now, **values)
+        if isinstance(values["timespan"], str) and values["timespan"]:
+            timespan = parse_timespan(values["timespan"])
+            values["timespan"] = timespan.totimedelta(start=now) if isinstance(timespan, isodate.Duration) else timespan
+        # Every argument is checked in a single validation pass of the context.
+        return RenderContext(subcommand=subcommand, now=now, **values)
+
+    @property
+    def session(self) -> requests.Session:
+        """The pooled keep-alive session shared by every request this process makes to Grafana."""
+        return self.http.session
+
+    def connection_stats(self) -> dict:
+        """Counters of connections created versus reused by the pooled session in this process.
+
+        Returns:
+            (dict): `requests`, `connections_created` and `connections_reused` counters.
+        """
+        return self.http.stats()
+
+    def log_stats(self):
+        """Log the counters of the requests this process made to Grafana, its renders and its timeouts."""
+        connections = self.connection_stats()
+        LOGGER.info(
+            "Grafana requests: %s, connections created: %s, reused: %s",
+            connections["requests"],
+            connections["connections_created"],
+            connections["connections_reused"],
         )
-        self.config = new_config
-
-    @timespan.setter
-    def timespan(self, new_timespan: str):
-        """Simple Set Timespan.  Must redefine the config model for pydantic to validate."""
-        new_config = GrafanaConfigSettings(
-            grafana_url=self.config.grafana_url,
-            grafana_api_key=self.config.grafana_api_key,
-            default_width=self.config.default_width,
-            default_height=self.config.default_height,
-            default_theme=self.config.default_theme,
-            default_timespan=new_timespan
-            if not new_timespan
-            else isodate.parse_duration(new_timespan).totimedelta(start=self.now),
-            grafana_org_id=self.config.grafana_org_id,
-            default_tz=self.config.default_tz,
+        downloads = self.download_stats()
+        LOGGER.info(
+            "Grafana renders downloaded: %s, mean %.0f bytes, largest %s bytes, oversize aborts: %s, "
+            "mean first byte %.3fs, mean download %.3fs",
+            downloads["downloads"],
+            downloads["mean_bytes"],
+            downloads["max_bytes"],
+            downloads["oversize_aborts"],
+            downloads["mean_ttfb"],
+            downloads["mean_time"],
         )
-        self.config = new_config
-
-    @timezone.setter
-    def timezone(self, new_timezone: str):
-        """Simple Set Timezone.  Must redefine the config model for pydantic to validate."""
-        new_config = GrafanaConfigSettings(
-            grafana_url=self.config.grafana_url,
-            grafana_api_key=self.config.grafana_api_key,
-            default_width=self.config.default_width,
-            default_height=self.config.default_height,
-            default_theme=self.config.default_theme,
-            default_timespan=self.config.default_timespan,
-            grafana_org_id=self.config.grafana_org_id,
-            default_tz=new_timezone,
+        resilience = self.resilience_stats()
+        LOGGER.info(
+            "Grafana circuit breaker: %s, read timeouts: %s",
+            resilience["breaker"],
+            ", ".join(
+                f"{endpoint} {latency['deadline']:.1f}s ({latency['samples']} samples)"
+                for endpoint, latency in sorted(resilience["latency"].items())
+            )
+            or "none observed",
         )
-        self.config = new_config
 
     @property
     def headers(self) -> dict:
@@ -172,56 +306,239 @@ class GrafanaHandler:
             headers["Authorization"] = f"Bearer {self.config.grafana_api_key}"
         return headers
 
-    def get_png(self, panel: Panel, panel_vars: List[PanelVariable]) -> Union[bytes, None]:
+    def _request(self, endpoint: str, url: str, **kwargs) -> requests.Response:
+        """GET a Grafana url through the circuit breaker, with an adaptive deadline and bounded retries.
+
+        The read timeout of `endpoint` is derived from the latencies observed for it. Connection errors,
+        timeouts and 429/502/503/504 responses are retried with jittered backoff, every call made is a GET.
+        Only connection errors, timeouts and 502/503/504 responses count as failures of the breaker.
+
+        Args:
+            endpoint (str): Name the latencies of the url are tracked under.
+            url (str): Grafana url.
+            **kwargs: Additional arguments of requests.Session.get.
+
+        Returns:
+            requests.Response: The response of the last attempt.
+
+        Raises:
+            CircuitOpenError: Grafana is unhealthy and the breaker is open.
+            RequestException: The last attempt failed.
+        """
+        if not self.circuit_breaker.allow():
+            raise CircuitOpenError(f"Grafana is unhealthy, {url} was not requested.")
+        timeout = (self.config.connect_timeout, self.latency.deadline(endpoint))
+
+        def attempt() -> requests.Response:
+            start = time.perf_counter()
+            response = self.session.get(url, headers=self.headers, timeout=timeout, **kwargs)
+            if response.status_code < 500:
+                self.latency.observe(endpoint, time.perf_counter() - start)
+            return response
+
+        def should_retry(exc: RequestException, response: requests.Response) -> bool:
+            if exc is not None:
+                return isinstance(exc, (RequestsConnectionError, Timeout))
+            if response.status_code in RETRY_STATUS_CODES:
+                # Release the connection of the discarded response back to the pool.
+                response.close()
+                return True
+            return False
+
+        try:
+            response = retry_call(
+                attempt,
+                attempts=self.config.retry_attempts,
+                should_retry=should_retry,
+                base=self.config.retry_backoff,
+                maximum=self.config.retry_backoff_max,
+            )
+        except (RequestsConnectionError, Timeout):
+            self.circuit_breaker.record_failure()
+            raise
+        if response.status_code in BREAKER_STATUS_CODES:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        return response
+
+    def get_png(
+        self,
+        panel: Panel,
+        panel_vars: List[PanelVariable],
+        context: RenderContext = None,
+        width: int = None,
+        height: int = None,
+    ) -> Union[bytes, None]:
         """Using requests GET the generated URL and return the binary contents of the file.
 
+        Renders are served from the render cache when an identical request was made within the panel's TTL,
+        and identical renders already in flight are coalesced into a single request to Grafana.
+
         Args:
             panel (nautobot_plugin_chatops_grafana.models.Panel): The Panel object.
             panel_vars (List[nautobot_plugin_chatops_grafana.models.PanelVariable]): List of PanelVariable objects.
+            context (RenderContext): Parameters of the request, the configured defaults when not given.
+            width (int): Render width overriding the width of the context.
+            height (int): Render height overriding the height of the context.
+
+        Returns:
+            Union[bytes, None]: The raw image from the renderer or None if there was an error.
+        """
+        context = context or self.render_context()
+        url, payload = self.get_png_url(panel, panel_vars, context=context, width=width, height=height)
+        ttl = self.render_cache_ttl(panel)
+        key = self.render_cache_key(panel, payload, context.timespan)
+        if ttl:
+            raw_png = self.render_cache.get(key)
+            if raw_png is not None:
+                LOGGER.debug("Render cache hit for %s", url)
+                return raw_png
+
+        def render():
+            raw_png = self._render_png(url, payload)
+            if raw_png and ttl:
+                self.render_cache.set(key, raw_png, ttl)
+            return raw_png
+
+        if not self.config.single_flight_enabled:
+            return render()
+        # Identical renders already in flight in this or another worker are waited on instead of repeated.
+        return self.single_flight.run(key, render)
+
+    def _render_png(self, url: str, payload: dict) -> Union[bytes, None]:
+        """GET the image from the Grafana renderer, streaming the body in chunks up to `render_max_bytes`.
+
+        The download is aborted as soon as the announced or received size exceeds `render_max_bytes`,
+        so a misconfigured width or height can not make the worker buffer an unbounded image.
+
+        Args:
+            url (str): Grafana render url.
+            payload (dict): Query parameters sent to the renderer.
 
         Returns:
             Union[bytes, None]: The raw image from the renderer or None if there was an error.
         """
-        url, payload = self.get_png_url(panel, panel_vars)
+        max_bytes = self.config.render_max_bytes
+        start = time.perf_counter()
         try:
             LOGGER.debug("Begin GET %s", url)
-            results = requests.get(url, headers=self.headers, stream=True, params=payload, timeout=REQUEST_TIMEOUT_SEC)
+            with self._request("render", url, stream=True, params=payload) as results:
+                ttfb = time.perf_counter() - start
+                if results.status_code != 200:
+                    LOGGER.error("Request returned %s for %s", results.status_code, url)
+                    return None
+                LOGGER.debug("Request returned %s", results.status_code)
+
+                content_length = results.headers.get("Content-Length", "")
+                if content_length.isdigit() and int(content_length) > max_bytes:
+                    self.download_metrics.oversize()
+                    LOGGER.error(
+                        "Render of %s announced %s bytes, more than the %s bytes allowed",
+                        url,
+                        content_length,
+                        max_bytes,
+                    )
+                    return None
+
+                buffer = bytearray()
+                for chunk in results.iter_content(chunk_size=self.config.render_chunk_size):
+                    buffer += chunk
+                    if len(buffer) > max_bytes:
+                        self.download_metrics.oversize()
+                        LOGGER.error("Render of %s exceeded the %s bytes allowed, download aborted", url, max_bytes)
+                        return None
         except RequestException as exc:
             LOGGER.error("An error occurred while accessing the url: %s Exception: %s", url, exc)
             return None
 
-        if results.status_code == 200:
-            LOGGER.debug("Request returned %s", results.status_code)
-            return results.content
+        total = time.perf_counter() - start
+        self.download_metrics.record(len(buffer), ttfb, total)
+        LOGGER.debug("Downloaded %s bytes from %s, first byte in %.3fs, total %.3fs", len(buffer), url, ttfb, total)
+        return bytes(buffer)
 
-        LOGGER.error("Request returned %s for %s", results.status_code, url)
-        return None
+    def resilience_stats(self) -> dict:
+        """State of the circuit breaker and the adaptive deadline of every endpoint.
+
+        Returns:
+            (dict): `breaker` state and per endpoint `latency` samples, percentile and deadline.
+        """
+        return {"breaker": self.circuit_breaker.state(), "latency": self.latency.stats()}
+
+    def download_stats(self) -> dict:
+        """Counters of the images downloaded from the renderer by this process.
 
-    def get_png_url(self, panel: Panel, panel_vars: List[PanelVariable]) -> Tuple[str, dict]:
+        Returns:
+            (dict): download count, bytes, oversize aborts, mean size, time to first byte and download time.
+        """
+        return self.download_metrics.stats()
+
+    def render_cache_ttl(self, panel: Panel) -> int:
+        """Seconds a render of this panel may be served from the cache, the panel TTL overrides the plugin default.
+
+        Args:
+            panel (nautobot_plugin_chatops_grafana.models.Panel): The Panel object.
+
+        Returns:
+            int: TTL in seconds, 0 when caching is disabled.
+        """
+        ttl = getattr(panel, "cache_ttl", None)
+        return self.config.render_cache_ttl if ttl is None else ttl
+
+    def render_cache_key(self, panel: Panel, payload: dict, timespan: datetime.timedelta) -> str:
+        """Build the render cache key from the canonical render parameters.
+
+        The absolute `from`/`to` timestamps are replaced by the relative timespan so that identical
+        requests made within the TTL share a key.
+
+        Args:
+            panel (nautobot_plugin_chatops_grafana.models.Panel): The Panel object.
+            payload (dict): Query parameters sent to the renderer, as built by `get_png_url`.
+            timespan (datetime.timedelta): Timespan of the render.
+
+        Returns:
+            str: The render cache key.
+        """
+        params = {key: value for key, value in payload.items() if key not in ("from", "to")}
+        params["dashboard_uid"] = panel.dashboard.dashboard_uid
+        params["timespan"] = timespan.total_seconds()
+        params["grafana_url"] = self.config.grafana_url
+        return make_render_key(params)
+
+    def get_png_url(
+        self,
+        panel: Panel,
+        panel_vars: List[PanelVariable],
+        context: RenderContext = None,
+        width: int = None,
+        height: int = None,
+    ) -> Tuple[str, dict]:
         """Generate the URL and the Payload for the request.
 
         Args:
             panel (nautobot_plugin_chatops_grafana.models.Panel): The Panel object.
             panel_vars (List[nautobot_plugin_chatops_grafana.models.PanelVariable]): List of PanelVariable objects.
+            context (RenderContext): Parameters of the request, the configured defaults when not given.
+            width (int): Render width overriding the width of the context.
+            height (int): Render height overriding the height of the context.
 
         Returns:
             Tuple[str, dict]: Grafana url and payload to send to the grafana renderer.
         """
+        context = context or self.render_context()
         payload = {
             "orgId": self.config.grafana_org_id,
             "panelId": panel.panel_id,
-            "tz": urllib.parse.quote(self.config.default_tz),
-            "theme": self.config.default_theme,
+            "tz": urllib.parse.quote(context.timezone),
+            "theme": context.theme,
+            **context.time_range(),
         }
-        from_time = str(int((self.now - self.config.default_timespan).timestamp() * 1e3))
-        to_time = str(int(self.now.timestamp() * 1e3))
-        if from_time != to_time:
-            payload["from"] = from_time
-            payload["to"] = to_time
-        if self.config.default_width > 0:
-            payload["width"] = self.config.default_width
-        if self.config.default_height > 0:
-            payload["height"] = self.config.default_height
+        width = context.width if width is None else width
+        height = context.height if height is None else height
+        if width > 0:
+            payload["width"] = width
+        if height > 0:
+            payload["height"] = height
 
         for variable in panel_vars:
             if variable.includeinurl and variable.value:
@@ -232,134 +549,203 @@ class GrafanaHandler:
         LOGGER.debug("URL: %s Payload: %s", url, payload)
         return url, payload
 
-    def get_dashboards(self) -> List[dict]:
+    def get_dashboards(self) -> Optional[List[dict]]:
         """get_dashboards will fetch the active dashboards from the grafana API.
 
         Returns:
-            List[dict]: A list of the grafana dashboards.
+            List[dict]: A list of the grafana dashboards, None if there was an error, so a failed listing is not
+                taken for an organization without dashboards.
         """
         url = f"{self.config.grafana_url}/api/search"
         try:
             LOGGER.debug("Begin GET /api/search")
-            results = requests.get(
-                url=url,
-                headers=self.headers,
-                params={"type": "dash-db"},
-                timeout=REQUEST_TIMEOUT_SEC,
-            )
+            results = self._request("search", url, params={"type": "dash-db"})
         except RequestException as exc:
             LOGGER.error("An error occurred while accessing the url: %s Exception: %s", url, exc)
-            return []
+            return None
 
         if results.status_code == 200:
             LOGGER.debug("Request returned %s", results.status_code)
             return results.json()
 
         LOGGER.error("Request returned %s for %s", results.status_code, url)
-        return []
+        return None
 
-    def get_panels(self, dashboard_uid: str) -> List[dict]:
-        """get_panels will fetch the active panels for a given dashboard from the grafana API.
+    def get_dashboard(self, dashboard_uid: str, version: int = None, refresh: bool = False) -> dict:
+        """get_dashboard will fetch the dashboard document for a given dashboard from the grafana API.
+
+        The document is fetched once and shared through the dashboard cache: by the calls made within
+        `dashboard_cache_ttl` seconds, and by the calls giving its `version` while it does not change.
+
+        Args:
+            dashboard_uid (str): Grafana uid of the dashboard.
+            version (int): Grafana version of the dashboard, when known.
+            refresh (bool): Skip the cache and fetch the document from Grafana.
 
         Returns:
-            List[dict]: A list of the grafana panels.
+            dict: The `dashboard` and `meta` of the grafana dashboard, empty if there was an error.
         """
+        if not refresh:
+            document = self.dashboard_documents.get(dashboard_uid, version)
+            if document is not None:
+                LOGGER.debug("Dashboard cache hit for %s version %s", dashboard_uid, version)
+                return document
+
         url = f"{self.config.grafana_url}/api/dashboards/uid/{dashboard_uid}"
         try:
             LOGGER.debug("Begin GET /api/dashboards/uid/")
-            results = requests.get(
-                url=url,
-                headers=self.headers,
-                timeout=REQUEST_TIMEOUT_SEC,
-            )
+            results = self._request("dashboard", url)
         except RequestException as exc:
             LOGGER.error("An error occurred while accessing the url: %s Exception: %s", url, exc)
-            return []
+            return {}
 
         if results.status_code != 200:
             LOGGER.error("Request returned %s for %s", results.status_code, url)
-            return []
+            return {}
 
         LOGGER.debug("Request returned %s", results.status_code)
-        data = results.json()
-        if not data.get("dashboard"):
-            LOGGER.error("Response does not contain `dashboard` key.")
-            return []
+        document = results.json()
+        self.dashboard_documents.set(dashboard_uid, document)
+        return document
 
-        if not data["dashboard"].get("panels"):
-            LOGGER.error("Response does not contain `dashboard.panels` key.")
-            return []
+    def get_dashboard_version(self, dashboard_id: int) -> dict:
+        """get_dashboard_version will fetch the latest saved version of a given dashboard from the grafana API.
 
-        return data["dashboard"]["panels"]
+        `/api/search` carries no version of the dashboards it lists, the versions of a dashboard are
+        requested with a limit of one so only the metadata of the latest save is transferred.
 
-    def get_variables(self, dashboard_uid: str) -> List[dict]:
-        """get_variables will fetch the active templates for a given dashboard from the grafana API.
+        Args:
+            dashboard_id (int): Grafana id of the dashboard, as listed by `/api/search`.
 
         Returns:
-            List[dict]: A list of the grafana variables.
+            dict: The `version` and `created` time of the latest save, empty if there was an error.
         """
-        url = f"{self.config.grafana_url}/api/dashboards/uid/{dashboard_uid}"
+        url = f"{self.config.grafana_url}/api/dashboards/id/{dashboard_id}/versions"
         try:
-            LOGGER.debug("Begin GET /api/dashboards/uid/")
-            results = requests.get(
-                url=url,
-                headers=self.headers,
-                timeout=REQUEST_TIMEOUT_SEC,
-            )
+            LOGGER.debug("Begin GET /api/dashboards/id/versions")
+            results = self._request("version", url, params={"limit": 1})
         except RequestException as exc:
             LOGGER.error("An error occurred while accessing the url: %s Exception: %s", url, exc)
-            return []
+            return {}
 
         if results.status_code != 200:
             LOGGER.error("Request returned %s for %s", results.status_code, url)
-            return []
+            return {}
 
-        LOGGER.debug("Request returned %s", results.status_code)
-        data = results.json()
-        if not data.get("dashboard"):
-            LOGGER.error("Response does not contain `dashboard` key.")
-            return []
-
-        if not data["dashboard"].get("templating"):
-            LOGGER.error("Response does not contain `dashboard.templating` key.")
-            return []
-
-        if not data["dashboard"]["templating"].get("list"):
-            LOGGER.error("Response does not contain `dashboard.templating.list` key.")
-            return []
-
-        variables = []
-        for variable in data["dashboard"]["templating"]["list"]:
-            variables.append(
-                {
-                    "name": variable["name"],
-                    "response": variable["current"].get("text"),
-                    "includeinurl": True,
-                    "includeincmd": False,
-                    "friendly_name": variable["name"],
-                }
-            )
+        versions = results.json()
+        return versions[0] if versions else {}
+
+    def get_panels(self, dashboard_uid: str, version: int = None, refresh: bool = False) -> List[dict]:
+        """get_panels will fetch the active panels for a given dashboard from the grafana API.
+
+        Args:
+            dashboard_uid (str): Grafana uid of the dashboard.
+            version (int): Grafana version of the dashboard, when known.
+            refresh (bool): Skip the cache and fetch the document from Grafana.
+
+        Returns:
+            List[dict]: A list of the grafana panels.
+        """
+        return extract_panels(self.get_dashboard(dashboard_uid, version, refresh))
+
+    def get_variables(self, dashboard_uid: str, version: int = None, refresh: bool = False) -> List[dict]:
+        """get_variables will fetch the active templates for a given dashboard from the grafana API.
 
-        return variables
+        Args:
+            dashboard_uid (str): Grafana uid of the dashboard.
+            version (int): Grafana version of the dashboard, when known.
+            refresh (bool): Skip the cache and fetch the document from Grafana.
+
+        Returns:
+            List[dict]: A list of the grafana variables.
+        """
+        return extract_variables(self.get_dashboard(dashboard_uid, version, refresh))
+
+    def dashboard_url(self, dashboard: Dashboard, context: RenderContext = None) -> str:
+        """Helper method that will build the dashboard URL for a given request from ChatOps.
+
+        Args:
+            dashboard (Dashboard): Grafana Dashboard.
+            context (RenderContext): Parameters of the request, the configured defaults when not given.
+        """
+        context = context or self.render_context()
+        payload = {"orgId": self.config.grafana_org_id, **context.time_range()}
+
+        base_url = f"{self.config.grafana_url}/d/{dashboard.dashboard_uid}/{dashboard.dashboard_slug}"
+        return f"{base_url}?{urllib.parse.urlencode(payload)}"
 
-    def panel_url(self, panel: Panel):
+    def panel_url(self, panel: Panel, context: RenderContext = None):
         """Helper method that will build the panel URL for a given request from ChatOps.
 
         Args:
             panel (Panel): Grafana Dashboard panel.
+            context (RenderContext): Parameters of the request, the configured defaults when not given.
         """
+        context = context or self.render_context()
         payload = {
             "orgId": self.config.grafana_org_id,
             "viewPanel": panel.panel_id,
+            **context.time_range(),
         }
-        from_time = str(int((self.now - self.config.default_timespan).timestamp() * 1e3))
-        to_time = str(int(self.now.timestamp() * 1e3))
-        if from_time != to_time:
-            payload["from"] = from_time
-            payload["to"] = to_time
 
         base_url = f"{self.config.grafana_url}/d/{panel.dashboard.dashboard_uid}/{panel.dashboard.dashboard_slug}"
         return f"{base_url}?{urllib.parse.urlencode(payload)}"
 
 
+def extract_panels(document: dict) -> List[dict]:
+    """Return the panels of a dashboard document.
+
+    Args:
+        document (dict): Dashboard document as returned by GrafanaHandler.get_dashboard.
+
+    Returns:
+        List[dict]: A list of the grafana panels.
+    """
+    if not document.get("dashboard"):
+        LOGGER.error("Response does not contain `dashboard` key.")
+        return []
+
+    if not document["dashboard"].get("panels"):
+        LOGGER.error("Response does not contain `dashboard.panels` key.")
+        return []
+
+    return document["dashboard"]["panels"]
+
+
+def extract_variables(document: dict) -> List[dict]:
+    """Return the template variables of a dashboard document as PanelVariable fields.
+
+    Args:
+        document (dict): Dashboard document as returned by GrafanaHandler.get_dashboard.
+
+    Returns:
+        List[dict]: A list of the grafana variables.
+    """
+    if not document.get("dashboard"):
+        LOGGER.error("Response does not contain `dashboard` key.")
+        return []
+
+    if not document["dashboard"].get("templating"):
+        LOGGER.error("Response does not contain `dashboard.templating` key.")
+        return []
+
+    if not document["dashboard"]["templating"].get("list"):
+        LOGGER.error("Response does not contain `dashboard.templating.list` key.")
+        return []
+
+    variables = []
+    for variable in document["dashboard"]["templating"]["list"]:
+        variables.append(
+            {
+                "name": variable["name"],
+                "response": variable["current"].get("text"),
+                "includeinurl": True,
+                "includeincmd": False,
+                "friendly_name": variable["name"],
+            }
+        )
+
+    return variables
+
+
 handler = GrafanaHandler(PLUGIN_SETTINGS)
@@ -0,0 +1,202 @@
+"""Asyncio sibling of the GrafanaHandler used to fan out renders and syncs concurrently."""
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from django.db import connections
+
+from nautobot_plugin_chatops_grafana.grafana import GrafanaHandler, handler
+from nautobot_plugin_chatops_grafana.models import Panel, PanelVariable
+
+# A panel, its variables and optionally the keyword arguments of GrafanaHandler.get_png (context, width, height).
+PngRequest = Union[Tuple[Panel, Sequence[PanelVariable]], Tuple[Panel, Sequence[PanelVariable], dict]]
+
+
+class AsyncGrafanaHandler:
+    """Async client mirroring GrafanaHandler with bounded-concurrency `*_many` helpers.
+
+    Requests are issued through the pooled session, render cache and single-flight group of the
+    wrapped GrafanaHandler, on a small executor sized to the connection pool. Concurrency is bounded
+    by that executor and by a semaphore, never by one thread per request.
+
+    Panels passed to `get_png` should have their dashboard loaded (`select_related("dashboard")`)
+    so no database query is issued from the executor threads.
+    """
+
+    def __init__(self, sync_handler: GrafanaHandler, max_workers: Optional[int] = None):
+        """Initialize the async handler.
+
+        Args:
+            sync_handler (GrafanaHandler): Handler whose session, caches and configuration are used.
+            max_workers (int): Size of the executor, defaults to the connection pool size of the handler.
+        """
+        self.handler = sync_handler
+        self.max_workers = max_workers or sync_handler.config.pool_maxsize
+        self._executor = None
+        self._executor_pid = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Executor running the blocking requests, created on first use and again after a fork."""
+        pid = os.getpid()
+        if self._executor is None or self._executor_pid != pid:
+            with self._executor_lock:
+                if self._executor is None or self._executor_pid != pid:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="grafana")
+                    self._executor_pid = pid
+        return self._executor
+
+    @staticmethod
+    def _call(func: Callable, *args) -> Any:
+        """Run `func` in an executor thread, releasing any database connection it opened."""
+        try:
+            return func(*args)
+        finally:
+            connections.close_all()
+
+    async def _run(self, func: Callable, *args) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._call, func, *args)
+
+    async def get_png(self, panel: Panel, panel_vars: Sequence[PanelVariable], **kwargs) -> Union[bytes, None]:
+        """Async version of GrafanaHandler.get_png."""
+        return await self._run(functools.partial(self.handler.get_png, panel, panel_vars, **kwargs))
+
+    async def get_dashboards(self) -> Optional[List[dict]]:
+        """Async version of GrafanaHandler.get_dashboards."""
+        return await self._run(self.handler.get_dashboards)
+
+    async def get_dashboard(self, dashboard_uid: str) -> dict:
+        """Async version of GrafanaHandler.get_dashboard."""
+        return await self._run(self.handler.get_dashboard, dashboard_uid)
+
+    async def get_panels(self, dashboard_uid: str) -> List[dict]:
+        """Async version of GrafanaHandler.get_panels."""
+        return await self._run(self.handler.get_panels, dashboard_uid)
+
+    async def get_variables(self, dashboard_uid: str) -> List[dict]:
+        """Async version of GrafanaHandler.get_variables."""
+        return await self._run(self.handler.get_variables, dashboard_uid)
+
+    async def gather_bounded(self, coros: Iterable[Awaitable], concurrency: Optional[int] = None) -> List[Any]:
+        """Await the coroutines with at most `concurrency` running at once, results keep the input order.
+
+        Args:
+            coros (Iterable[Awaitable]): Coroutines to run.
+            concurrency (int): Maximum number of coroutines running at once, defaults to the executor size.
+
+        Returns:
+            List[Any]: The results in the same order as `coros`.
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.max_workers)
+
+        async def bounded(coro):
+            async with semaphore:
+                return await coro
+
+        return await asyncio.gather(*(bounded(coro) for coro in coros))
+
+    async def get_png_many(
+        self, requests: Iterable[PngRequest], concurrency: Optional[int] = None
+    ) -> List[Union[bytes, None]]:
+        """Render several panels concurrently.
+
+        Args:
+            requests (Iterable[PngRequest]): Panels, their variables and optional get_png keyword arguments.
+            concurrency (int): Maximum number of renders running at once.
+
+        Returns:
+            List[Union[bytes, None]]: The images in the same order as `requests`, None for failed renders.
+        """
+        return await self.gather_bounded(
+            (self.get_png(request[0], request[1], **(request[2] if len(request) > 2 else {})) for request in requests),
+            concurrency=concurrency,
+        )
+
+    async def get_dashboards_many(
+        self, dashboard_uids: Iterable[str], concurrency: Optional[int] = None
+    ) -> Dict[str, dict]:
+        """Fetch several dashboard documents concurrently.
+
+        Args:
+            dashboard_uids (Iterable[str]): Grafana uids of the dashboards to fetch.
+            concurrency (int): Maximum number of requests running at once.
+
+        Returns:
+            Dict[str, dict]: Dashboard documents keyed by uid, empty documents for failed requests.
+        """
+        dashboard_uids = list(dashboard_uids)
+        documents = await self.gather_bounded(
+            (self.get_dashboard(uid) for uid in dashboard_uids), concurrency=concurrency
+        )
+        return dict(zip(dashboard_uids, documents))
+
+    async def get_dashboard_version(self, dashboard_id: int) -> dict:
+        """Async version of GrafanaHandler.get_dashboard_version."""
+        return await self._run(self.handler.get_dashboard_version, dashboard_id)
+
+    async def get_dashboard_versions_many(
+        self, dashboard_ids: Iterable[int], concurrency: Optional[int] = None
+    ) -> Dict[int, dict]:
+        """Fetch the latest version of several dashboards concurrently.
+
+        Args:
+            dashboard_ids (Iterable[int]): Grafana ids of the dashboards.
+            concurrency (int): Maximum number of requests running at once.
+
+        Returns:
+            Dict[int, dict]: Latest versions keyed by dashboard id, empty versions for failed requests.
+        """
+        dashboard_ids = list(dashboard_ids)
+        versions = await self.gather_bounded(
+            (self.get_dashboard_version(dashboard_id) for dashboard_id in dashboard_ids), concurrency=concurrency
+        )
+        return dict(zip(dashboard_ids, versions))
+
+    def close(self):
+        """Shut the executor down."""
+        with self._executor_lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown(wait=True)
+            self._executor = None
+            self._executor_pid = None
+
+
+_LOOPS = threading.local()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Return the long-lived event loop of the current thread, creating it on first use."""
+    loop = getattr(_LOOPS, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        _LOOPS.loop = loop
+    return loop
+
+
+def run_async(coro: Awaitable) -> Any:
+    """Run a coroutine to completion from synchronous code such as an RQ job.
+
+    A single event loop is kept per thread and reused between calls instead of creating
+    and tearing one down for every job.
+
+    Args:
+        coro (Awaitable): Coroutine to run.
+
+    Returns:
+        Any: The result of the coroutine.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return get_event_loop().run_until_complete(coro)
+    if asyncio.iscoroutine(coro):
+        coro.close()
+    raise RuntimeError("run_async() cannot be called while an event loop is running, await the coroutine instead.")
+
+
+async_handler = AsyncGrafanaHandler(handler)
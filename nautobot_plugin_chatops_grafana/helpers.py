@@ -1,7 +1,11 @@
 """Schema Enforcer wrapper used to mimic the validate cli functionality."""
-from typing import List
+import functools
+import logging
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Type
 from termcolor import colored
 
+from django.db.models import Model
+
 from nautobot.dcim import models as dcim_models
 from nautobot.ipam import models as ipam_models
 from nautobot.extras import models as extra_models
@@ -14,6 +18,8 @@ from schema_enforcer.schemas.manager import SchemaManager
 from schema_enforcer.instances.file import InstanceFileManager
 from schema_enforcer.exceptions import InvalidJSONSchema
 
+LOGGER = logging.getLogger("nautobot.plugin.grafana")
+
 SPECIAL_CHAR = {
     "%": "percent",
     "&": "and",
@@ -35,6 +41,104 @@ VALID_MODELS = (
 )
 
 
+class ModelInfo(NamedTuple):
+    """A Nautobot model usable as the query of a panel variable, with the fields it can be filtered on."""
+
+    model: Type[Model]
+    fields: FrozenSet[str]
+    indexed: FrozenSet[str]
+
+    def has_attribute(self, attribute: str) -> bool:
+        """Whether `attribute` is a concrete field (name or column attribute) or any other attribute of the model."""
+        return attribute in self.fields or hasattr(self.model, attribute)
+
+    def is_indexed(self, attribute: str) -> bool:
+        """Whether filtering the model on `attribute` can use a database index."""
+        return attribute in self.indexed
+
+
+def model_info(model: Type[Model]) -> ModelInfo:
+    """Collect the concrete fields of `model` and the ones leading a database index.
+
+    A field is indexed when it is the primary key, unique, has `db_index` (the default of foreign keys),
+    or is the first column of a `Meta.indexes`, `unique_together` or `index_together` entry.
+
+    Args:
+        model (Model): The Django model.
+
+    Returns:
+        ModelInfo: The model with its field names.
+    """
+    meta = model._meta  # pylint: disable=protected-access
+    fields, indexed = set(), set()
+    by_name = {}
+    for field in meta.concrete_fields:
+        names = {field.name, field.attname}
+        fields.update(names)
+        by_name[field.name] = names
+        if field.primary_key or field.unique or field.db_index:
+            indexed.update(names)
+    leading = [index.fields[0].lstrip("-") for index in meta.indexes if index.fields]
+    leading += [together[0] for together in (*meta.unique_together, *meta.index_together) if together]
+    for name in leading:
+        indexed.update(by_name.get(name, ()))
+    if "pk" not in fields:
+        fields.add("pk")
+        indexed.add("pk")
+    return ModelInfo(model=model, fields=frozenset(fields), indexed=frozenset(indexed))
+
+
+# Models of VALID_MODELS keyed by class name, built once when the app is ready.
+MODEL_REGISTRY: Dict[str, ModelInfo] = {}
+
+
+def build_model_registry() -> Dict[str, ModelInfo]:
+    """Index the concrete models exposed by the VALID_MODELS modules, the first module wins on duplicate names."""
+    registry = {}
+    for module in VALID_MODELS:
+        for name, obj in vars(module).items():
+            if name in registry or not isinstance(obj, type) or not issubclass(obj, Model):
+                continue
+            if obj._meta.abstract:  # pylint: disable=protected-access
+                continue
+            registry[name] = model_info(obj)
+    MODEL_REGISTRY.clear()
+    MODEL_REGISTRY.update(registry)
+    return MODEL_REGISTRY
+
+
+def get_model_info(name: str) -> Optional[ModelInfo]:
+    """Return the registered model named `name`, None when it is not a valid Nautobot model.
+
+    Args:
+        name (str): Class name of the model, such as `Site`.
+    """
+    if not MODEL_REGISTRY:
+        build_model_registry()
+    return MODEL_REGISTRY.get(name)
+
+
+@functools.lru_cache(maxsize=256)
+def warn_unindexed(name: str, modelattr: str) -> bool:
+    """Log a warning, once per process, when filtering the model `name` on `modelattr` cannot use an index.
+
+    Every chat request resolving the variable then scans the whole table.
+
+    Returns:
+        bool: Whether a warning was logged.
+    """
+    info = get_model_info(name)
+    if info is None or not modelattr or info.is_indexed(modelattr):
+        return False
+    LOGGER.warning(
+        "`%s.%s` is not indexed, every chat request resolving it scans the whole table. Indexed fields: %s",
+        name,
+        modelattr,
+        ", ".join(sorted(info.indexed)),
+    )
+    return True
+
+
 def format_command(command: str) -> str:
     """_format_command_name will format the panel titles into a valid slash command.
 
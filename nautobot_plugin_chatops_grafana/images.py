@@ -0,0 +1,212 @@
+"""Helpers to lay out and stitch rendered Grafana panels into a single image."""
+import io
+import logging
+from typing import Dict, List, NamedTuple, Optional
+
+from PIL import Image, ImageDraw, ImageFont
+
+# Grafana dashboards are laid out on a 24 column grid, each grid row is 30px high with an 8px margin.
+GRID_COLUMNS = 24
+GRID_CELL_HEIGHT = 30
+GRID_CELL_MARGIN = 8
+
+BACKGROUND = {"dark": (17, 18, 23), "light": (255, 255, 255)}
+LABEL_COLOR = {"dark": (204, 204, 220), "light": (36, 41, 46)}
+
+# Post-processing modes applied before upload, with the Pillow format and the file extension they produce.
+POSTPROCESS_FORMATS = {
+    "none": ("PNG", "png"),
+    "optimize": ("PNG", "png"),
+    "quantize": ("PNG", "png"),
+    "webp": ("WEBP", "webp"),
+    "jpeg": ("JPEG", "jpg"),
+}
+
+LOGGER = logging.getLogger("nautobot.plugin.grafana")
+
+
+class Tile(NamedTuple):
+    """Pixel box of a panel in the stitched image."""
+
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+def layout_grid(grid_positions: Dict[int, Optional[dict]], width: int) -> Dict[int, Tile]:
+    """Compute the pixel boxes of panels from their Grafana `gridPos`, removing empty grid rows.
+
+    Panels are laid out like on the Grafana dashboard. Grid rows left empty because their panels are
+    not rendered are collapsed, and panels without a `gridPos` are stacked full width at the bottom.
+
+    Args:
+        grid_positions (Dict[int, dict]): Grafana `gridPos` (x, y, w, h) keyed by panel id.
+        width (int): Width of the stitched image in pixels.
+
+    Returns:
+        Dict[int, Tile]: Pixel box of every panel keyed by panel id.
+
+    Examples:
+        >>> layout_grid({1: {"x": 0, "y": 10, "w": 12, "h": 2}, 2: {"x": 12, "y": 10, "w": 12, "h": 2}}, 240)
+        {1: Tile(x=0, y=0, width=120, height=68), 2: Tile(x=120, y=0, width=120, height=68)}
+    """
+    column_width = width // GRID_COLUMNS
+    positions = {}
+    bottom = 0
+    for panel_id, grid_pos in grid_positions.items():
+        if grid_pos and all(key in grid_pos for key in ("x", "y", "w", "h")):
+            positions[panel_id] = grid_pos
+            bottom = max(bottom, grid_pos["y"] + grid_pos["h"])
+    for panel_id, grid_pos in grid_positions.items():
+        if panel_id not in positions:
+            positions[panel_id] = {"x": 0, "y": bottom, "w": GRID_COLUMNS, "h": 8}
+            bottom += 8
+
+    occupied = sorted({row for pos in positions.values() for row in range(pos["y"], pos["y"] + max(pos["h"], 1))})
+    compact_row = {row: index for index, row in enumerate(occupied)}
+
+    tiles = {}
+    row_height = GRID_CELL_HEIGHT + GRID_CELL_MARGIN
+    for panel_id, pos in positions.items():
+        tiles[panel_id] = Tile(
+            x=pos["x"] * column_width,
+            y=compact_row[pos["y"]] * row_height,
+            width=pos["w"] * column_width,
+            height=pos["h"] * row_height - GRID_CELL_MARGIN,
+        )
+    return tiles
+
+
+def layout_gallery(count: int, tile_width: int, tile_height: int, columns: int = 2) -> List[Tile]:
+    """Compute the pixel boxes of `count` equally sized images laid out in rows of `columns`.
+
+    Examples:
+        >>> [(tile.x, tile.y) for tile in layout_gallery(3, 100, 50, columns=2)]
+        [(0, 0), (100, 0), (0, 50)]
+    """
+    columns = max(1, min(columns, count))
+    return [
+        Tile(x=(index % columns) * tile_width, y=(index // columns) * tile_height, width=tile_width, height=tile_height)
+        for index in range(count)
+    ]
+
+
+def stitch(
+    images: List[Optional[bytes]], tiles: List[Tile], theme: str = "dark", labels: Optional[List[str]] = None
+) -> bytes:
+    """Paste every image in its tile on a single canvas and return it as a PNG.
+
+    Args:
+        images (List[Optional[bytes]]): Encoded images, None entries leave their tile empty.
+        tiles (List[Tile]): Pixel box of each image, in the same order as `images`.
+        theme (str): Grafana theme, used for the background color.
+        labels (List[str]): Optional caption drawn in the top-right corner of each tile.
+
+    Returns:
+        bytes: The stitched PNG.
+    """
+    width = max((tile.x + tile.width for tile in tiles), default=1)
+    height = max((tile.y + tile.height for tile in tiles), default=1)
+    canvas = Image.new("RGB", (width, height), BACKGROUND.get(theme, BACKGROUND["dark"]))
+    for raw, tile in zip(images, tiles):
+        if not raw:
+            continue
+        with Image.open(io.BytesIO(raw)) as image:
+            tile_image = image.convert("RGB")
+        if tile_image.size != (tile.width, tile.height):
+            tile_image.thumbnail((tile.width, tile.height))
+        canvas.paste(tile_image, (tile.x, tile.y))
+
+    if labels:
+        draw = ImageDraw.Draw(canvas)
+        font = ImageFont.load_default()
+        color = LABEL_COLOR.get(theme, LABEL_COLOR["dark"])
+        for label, tile in zip(labels, tiles):
+            label_width = draw.textbbox((0, 0), label, font=font)[2]
+            draw.text((tile.x + tile.width - label_width - 8, tile.y + 8), label, fill=color, font=font)
+
+    output = io.BytesIO()
+    canvas.save(output, format="PNG", optimize=True)
+    return output.getvalue()
+
+
+def gallery(
+    images: List[Optional[bytes]], labels: Optional[List[str]] = None, columns: int = 2, theme: str = "dark"
+) -> bytes:
+    """Stitch images of the same panel side by side, `columns` per row, sized to the largest image.
+
+    Args:
+        images (List[Optional[bytes]]): Encoded images, None entries leave their tile empty.
+        labels (List[str]): Optional caption of each image.
+        columns (int): Number of images per row.
+        theme (str): Grafana theme, used for the background and caption colors.
+
+    Returns:
+        bytes: The stitched PNG.
+    """
+    sizes = []
+    for raw in images:
+        if raw:
+            with Image.open(io.BytesIO(raw)) as image:
+                sizes.append(image.size)
+    tile_width = max((size[0] for size in sizes), default=1)
+    tile_height = max((size[1] for size in sizes), default=1)
+    return stitch(images, layout_gallery(len(images), tile_width, tile_height, columns), theme=theme, labels=labels)
+
+
+class ProcessedImage(NamedTuple):
+    """Image ready to be uploaded and the number of bytes the post-processing saved."""
+
+    data: bytes
+    extension: str
+    original_bytes: int
+
+    @property
+    def bytes_saved(self) -> int:
+        """Bytes saved compared to the image returned by the renderer."""
+        return self.original_bytes - len(self.data)
+
+
+def postprocess(raw_png: bytes, mode: str = "none", quality: int = 80, colors: int = 256) -> ProcessedImage:
+    """Shrink a rendered PNG before it is uploaded to the chat client.
+
+    `optimize` re-encodes the PNG losslessly, `quantize` reduces it to a palette of `colors` colors which
+    suits Grafana graphs and their flat backgrounds, `webp` and `jpeg` convert it using `quality`.
+    The original image is kept when the mode is `none`, when it can not be processed (e.g. Pillow
+    was built without WebP support) or when the result is not smaller.
+
+    Args:
+        raw_png (bytes): The PNG returned by the renderer.
+        mode (str): One of `none`, `optimize`, `quantize`, `webp` or `jpeg`.
+        quality (int): Quality of the lossy WebP and JPEG encoders, 1 to 100.
+        colors (int): Size of the palette used by `quantize`, 2 to 256.
+
+    Returns:
+        ProcessedImage: The image to upload, its file extension and the size of the original.
+    """
+    original = ProcessedImage(data=raw_png, extension="png", original_bytes=len(raw_png))
+    if mode == "none" or mode not in POSTPROCESS_FORMATS:
+        return original
+
+    image_format, extension = POSTPROCESS_FORMATS[mode]
+    output = io.BytesIO()
+    try:
+        with Image.open(io.BytesIO(raw_png)) as image:
+            if mode == "optimize":
+                image.save(output, format=image_format, optimize=True)
+            elif mode == "quantize":
+                image = image.convert("RGBA") if image.mode not in ("RGB", "RGBA") else image
+                image.quantize(colors=colors, method=Image.FASTOCTREE).save(output, format=image_format, optimize=True)
+            elif mode == "webp":
+                image.save(output, format=image_format, quality=quality, method=4)
+            else:
+                image.convert("RGB").save(output, format=image_format, quality=quality, optimize=True)
+    except (OSError, KeyError, ValueError) as exc:
+        LOGGER.warning("Unable to post-process the image with mode %s, sending it unchanged: %s", mode, exc)
+        return original
+
+    processed = ProcessedImage(data=output.getvalue(), extension=extension, original_bytes=len(raw_png))
+    if processed.bytes_saved <= 0:
+        return original
+    return processed
@@ -0,0 +1,73 @@
+"""Run the micro benchmarks of the Grafana ChatOps plugin."""
+from termcolor import colored
+from django.core.management.base import BaseCommand
+from nautobot_plugin_chatops_grafana import benchmarks
+
+
+class Command(BaseCommand):
+    """Extends the nautobot-server command to benchmark the plugin hot paths."""
+
+    def handle(self, *args, **kwargs):
+        """Run the requested benchmark suite and print its results."""
+        if kwargs["suite"] == "delivery":
+            sizes = [size * 1024 for size in kwargs["sizes"]]
+            print(
+                colored(
+                    text=f"{'size (KiB)':>12}{'tempfile ms':>14}{'spool ms':>12}{'in-memory ms':>15}", color="green"
+                )
+            )
+            for row in benchmarks.benchmark_delivery(sizes, kwargs["iterations"]):
+                print(
+                    f"{row['size'] // 1024:>12}{row['tempfile']:>14.3f}{row['spool']:>12.3f}{row['in_memory']:>15.3f}"
+                )
+        elif kwargs["suite"] == "worker":
+            print(
+                colored(
+                    text=f"{'mode':>10}{'processes':>11}{'threads':>9}{'jobs/s':>10}{'RSS MB':>10}{'jobs/s per GB':>15}",
+                    color="green",
+                )
+            )
+            for row in benchmarks.benchmark_worker(
+                kwargs["jobs"], kwargs["processes"], kwargs["threads"], kwargs["latency"]
+            ):
+                print(
+                    f"{row['mode']:>10}{row['processes']:>11}{row['threads']:>9}{row['jobs_per_sec']:>10.1f}"
+                    f"{row['rss_mb']:>10.1f}{row['jobs_per_sec_per_gb']:>15.1f}"
+                )
+        elif kwargs["suite"] == "panels":
+            print(colored(text=f"{'panels':>10}{'ms/load':>12}{'us/panel':>12}", color="green"))
+            for row in benchmarks.benchmark_panel_loader(kwargs["panels"], kwargs["iterations"]):
+                print(f"{row['panels']:>10}{row['ms']:>12.3f}{row['us_per_panel']:>12.3f}")
+
+    def add_arguments(self, parser):
+        """Adds arguments to the command.
+
+        Args:
+            parser: Argument parser.
+        """
+        parser.add_argument("suite", choices=["delivery", "worker", "panels"], help="Benchmark suite to run.")
+        parser.add_argument("-n", "--iterations", type=int, default=200, help="Iterations per measurement.")
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=[64, 256, 1024, 4096], help="Image sizes in KiB (delivery)."
+        )
+        parser.add_argument("--jobs", type=int, default=64, help="Jobs run per measurement (worker).")
+        parser.add_argument(
+            "--processes",
+            type=int,
+            nargs="+",
+            default=[1, 4],
+            help="Processes of the forking RQ worker (worker).",
+        )
+        parser.add_argument(
+            "--threads", type=int, nargs="+", default=[4, 16, 32], help="Pool sizes of the threaded worker (worker)."
+        )
+        parser.add_argument(
+            "--latency", type=float, default=0.25, help="Seconds each job waits on the renderer (worker)."
+        )
+        parser.add_argument(
+            "--panels",
+            type=int,
+            nargs="+",
+            default=[250, 500, 1000, 2000],
+            help="Panels of the synthetic dashboards (panels).",
+        )
@@ -0,0 +1,38 @@
+"""Run the threaded RQ worker serving the Grafana ChatOps jobs."""
+import django_rq
+from django.core.management.base import BaseCommand
+from django.db import connections
+from nautobot_plugin_chatops_grafana.grafana import handler
+from nautobot_plugin_chatops_grafana.threaded_worker import ThreadPoolWorker
+
+
+class Command(BaseCommand):
+    """Extends the nautobot-server command to run many grafana jobs concurrently in one process."""
+
+    def handle(self, *args, **kwargs):
+        """Listen on the queues and run their jobs on a thread pool until a shutdown is requested."""
+        queues = [django_rq.get_queue(name) for name in kwargs["queues"] or [handler.config.worker_queue]]
+        # Connections opened while loading the app are not shared with the job threads.
+        connections.close_all()
+        worker = ThreadPoolWorker(
+            queues,
+            connection=queues[0].connection,
+            name=kwargs["name"],
+            max_threads=kwargs["threads"] or handler.config.worker_threads,
+            report_stats=handler.log_stats,
+            stats_interval=handler.config.worker_stats_interval,
+        )
+        worker.work(burst=kwargs["burst"], logging_level=kwargs["logging_level"], max_jobs=kwargs["max_jobs"])
+
+    def add_arguments(self, parser):
+        """Adds arguments to the command.
+
+        Args:
+            parser: Argument parser.
+        """
+        parser.add_argument("queues", nargs="*", help="Queues to listen on, defaults to the `worker_queue` setting.")
+        parser.add_argument("--threads", type=int, help="Jobs run at once, defaults to the `worker_threads` setting.")
+        parser.add_argument("--name", help="Name of the worker.")
+        parser.add_argument("--burst", action="store_true", help="Quit once the queues are empty.")
+        parser.add_argument("--max-jobs", type=int, help="Quit after taking this many jobs.")
+        parser.add_argument("--logging-level", default="INFO", help="Level of the worker logs.")
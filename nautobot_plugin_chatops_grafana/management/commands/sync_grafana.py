@@ -0,0 +1,49 @@
+"""Synchronize every Grafana dashboard, with its panels and variables, into Nautobot."""
+from termcolor import colored
+from django.core.management.base import BaseCommand, CommandError
+from nautobot_plugin_chatops_grafana.diffsync.sync import run_organization_sync, sync_organization
+from nautobot_plugin_chatops_grafana.exceptions import SyncAbortedError
+
+
+class Command(BaseCommand):
+    """Extends the nautobot-server command to synchronize the whole Grafana organization."""
+
+    def handle(self, *args, **kwargs):
+        """Run the synchronization, or queue it as an RQ job, and print its report."""
+        if kwargs["enqueue"]:
+            sync_job = sync_organization.delay(overwrite=kwargs["overwrite"], incremental=kwargs["incremental"])
+            print(colored(text=f"Synchronization queued as job {sync_job.id}.", color="green"))
+            return
+
+        try:
+            report = run_organization_sync(
+                overwrite=kwargs["overwrite"], incremental=kwargs["incremental"], concurrency=kwargs["concurrency"]
+            )
+        except SyncAbortedError as exc:
+            raise CommandError(str(exc)) from exc
+        print(
+            colored(
+                text=f"Synchronized {report['synced']} of {report['dashboards']} dashboards in "
+                f"{report['seconds']:.1f}s: {report['changed']} changed, {report['skipped']} skipped.",
+                color="green",
+            )
+        )
+        for slug, error in sorted(report["failed"].items()):
+            print(colored(text=f"Dashboard `{slug}` failed: {error}", color="red"))
+
+    def add_arguments(self, parser):
+        """Adds arguments to the command.
+
+        Args:
+            parser: Argument parser.
+        """
+        parser.add_argument(
+            "--overwrite", action="store_true", help="Delete the records that are no longer in Grafana."
+        )
+        parser.add_argument(
+            "--incremental", action="store_true", help="Skip the dashboards unchanged since they were last synced."
+        )
+        parser.add_argument(
+            "--concurrency", type=int, help="Dashboards synced at once, defaults to the `sync_concurrency` setting."
+        )
+        parser.add_argument("--enqueue", action="store_true", help="Queue the synchronization as an RQ job.")
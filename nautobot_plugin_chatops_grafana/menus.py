@@ -0,0 +1,120 @@
+"""Paginated, type-ahead narrowed menus offering Nautobot objects for ambiguous chat arguments."""
+import logging
+import secrets
+from typing import List, NamedTuple, Optional, Tuple
+
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models import Q, QuerySet
+
+from nautobot_plugin_chatops_grafana.grafana import handler
+
+LOGGER = logging.getLogger("nautobot.plugin.grafana")
+
+# Chat argument values starting with this prefix are continuation tokens of a menu, not object values.
+MENU_TOKEN_PREFIX = "menu:"
+NEXT_PAGE_LABEL = "Next page ›"
+
+
+class MenuPage(NamedTuple):
+    """A page of choices, ending with a `Next page` choice carrying the continuation token when more exist."""
+
+    choices: List[Tuple[str, str]]
+    token: Optional[str]
+
+
+class MenuPaginator:
+    """Build menu pages with keyset pagination on the variable's model attribute.
+
+    Each page is a single `LIMIT page_size + 1` query ordered by the attribute and the primary key.
+    The filter and the last object of the page are kept in a shared Django cache under a short random
+    token, which is the value of the `Next page` choice. Picking it runs the command again with the token
+    as argument, which is turned into the next page. Without a shared cache the tokens are kept in-process,
+    they are only found again by a worker serving its jobs in one process, such as the threaded worker.
+    """
+
+    def __init__(self, shared_alias: Optional[str] = "default", page_size: int = 99, ttl: int = 900):
+        """Initialize the paginator.
+
+        Args:
+            shared_alias (str): Django cache alias holding the continuation tokens, empty keeps them in-process.
+            page_size (int): Objects per page, the `Next page` choice comes on top of them.
+            ttl (int): Seconds a continuation token stays valid.
+        """
+        self.shared_alias = shared_alias
+        self.page_size = max(page_size, 1)
+        self.ttl = ttl
+        self._local = None
+
+    @property
+    def shared(self):
+        """Return the Django cache holding the tokens, an in-process cache when the alias is disabled or missing."""
+        if self.shared_alias:
+            try:
+                return caches[self.shared_alias]
+            except InvalidCacheBackendError:
+                LOGGER.warning("Menu alias `%s` is not configured, tokens kept in-process.", self.shared_alias)
+                self.shared_alias = None
+        if self._local is None:
+            self._local = LocMemCache("grafana-menus", {})
+        return self._local
+
+    @staticmethod
+    def is_token(value: str) -> bool:
+        """Whether a chat argument is a menu continuation token.
+
+        Examples:
+            >>> [MenuPaginator.is_token(value) for value in ("menu:3fZq", "ams01", None)]
+            [True, False, False]
+        """
+        return isinstance(value, str) and value.startswith(MENU_TOKEN_PREFIX)
+
+    def load(self, token: str) -> Optional[dict]:
+        """Return the filter and position saved for a continuation token, None once it expired."""
+        return self.shared.get(f"grafana:{token}")
+
+    def _save(self, state: dict) -> str:
+        token = f"{MENU_TOKEN_PREFIX}{secrets.token_urlsafe(9)}"
+        self.shared.set(f"grafana:{token}", state, timeout=self.ttl)
+        return token
+
+    def page(self, objects: QuerySet, modelattr: str, lookup: dict, after: Optional[Tuple] = None) -> MenuPage:
+        """Return a page of the objects matching `lookup`, following the object `after`.
+
+        Args:
+            objects (QuerySet): Objects of the variable's model.
+            modelattr (str): Attribute used as the value of the choices, and to order them when it is a field.
+            lookup (dict): Filter applied to `objects`.
+            after (tuple): Attribute value and primary key of the last object of the previous page.
+
+        Returns:
+            MenuPage: The choices of the page and the token of the next page.
+        """
+        fields = {field.name for field in objects.model._meta.concrete_fields}  # pylint: disable=protected-access
+        ordering = [modelattr, "pk"] if modelattr in fields else ["pk"]
+        queryset = objects.filter(**lookup)
+        if after:
+            last_value, last_pk = after
+            if modelattr in fields:
+                queryset = queryset.filter(
+                    Q(**{f"{modelattr}__gt": last_value}) | Q(**{modelattr: last_value, "pk__gt": last_pk})
+                )
+            else:
+                queryset = queryset.filter(pk__gt=last_pk)
+        rows = list(queryset.order_by(*ordering)[: self.page_size + 1])
+
+        choices = [(f"{row.name}", getattr(row, modelattr)) for row in rows[: self.page_size]]
+        token = None
+        if len(rows) > self.page_size:
+            last = rows[self.page_size - 1]
+            token = self._save({"lookup": lookup, "after": (getattr(last, modelattr), last.pk)})
+            choices.append((NEXT_PAGE_LABEL, token))
+        return MenuPage(choices=choices, token=token)
+
+
+menu_paginator = MenuPaginator(
+    shared_alias=handler.config.render_cache_alias,
+    page_size=handler.config.menu_max_choices - 1,
+    ttl=handler.config.menu_token_ttl,
+)
@@ -0,0 +1,23 @@
+# Generated by Django 3.1.13 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nautobot_plugin_chatops_grafana", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="panel",
+            name="cache_ttl",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Seconds a rendered image of this panel is reused. Empty uses the plugin default, 0 disables caching.",
+                null=True,
+                verbose_name="Render Cache TTL",
+            ),
+        ),
+    ]
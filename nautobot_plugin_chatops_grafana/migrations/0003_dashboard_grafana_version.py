@@ -0,0 +1,33 @@
+# Generated by Django 3.1.13 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nautobot_plugin_chatops_grafana", "0002_panel_cache_ttl"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dashboard",
+            name="grafana_updated",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="Time the synchronized Grafana version of the dashboard was saved.",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="dashboard",
+            name="grafana_version",
+            field=models.PositiveIntegerField(
+                blank=True,
+                editable=False,
+                help_text="Grafana version of the dashboard when its panels and variables were last synchronized.",
+                null=True,
+            ),
+        ),
+    ]
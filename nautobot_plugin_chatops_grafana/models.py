@@ -5,7 +5,9 @@ from django.core.serializers.json import DjangoJSONEncoder
 from django.utils.translation import gettext_lazy as _
 from nautobot.extras.utils import extras_features
 from nautobot.core.models.generics import PrimaryModel, OrganizationalModel
-from nautobot_plugin_chatops_grafana.helpers import VALID_MODELS
+from jinja2 import TemplateSyntaxError
+from nautobot_plugin_chatops_grafana.helpers import get_model_info, warn_unindexed
+from nautobot_plugin_chatops_grafana.templating import validate_template
 
 
 @extras_features(
@@ -23,6 +25,18 @@ class Dashboard(PrimaryModel):
     dashboard_slug = models.CharField(max_length=255, unique=True, blank=False)
     friendly_name = models.CharField(max_length=255, default="", blank=True)
     dashboard_uid = models.CharField(max_length=64, unique=True, blank=False)
+    grafana_version = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Grafana version of the dashboard when its panels and variables were last synchronized.",
+    )
+    grafana_updated = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Time the synchronized Grafana version of the dashboard was saved.",
+    )
 
     csv_headers = ["dashboard_slug", "dashboard_uid", "friendly_name"]
 
@@ -56,8 +70,14 @@ class Panel(OrganizationalModel):
     friendly_name = models.CharField(max_length=64, default="", blank=False)
     panel_id = models.IntegerField(blank=False)
     active = models.BooleanField(default=False)
+    cache_ttl = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name="Render Cache TTL",
+        help_text="Seconds a rendered image of this panel is reused. Empty uses the plugin default, 0 disables caching.",
+    )
 
-    csv_headers = ["dashboard", "command_name", "friendly_name", "panel_id", "active"]
+    csv_headers = ["dashboard", "command_name", "friendly_name", "panel_id", "active", "cache_ttl"]
 
     class Meta:
         """Metadata for the model."""
@@ -70,7 +90,7 @@ class Panel(OrganizationalModel):
 
     def to_csv(self):
         """Return fields for bulk view."""
-        return self.dashboard, self.command_name, self.friendly_name, self.panel_id, self.active
+        return self.dashboard, self.command_name, self.friendly_name, self.panel_id, self.active, self.cache_ttl
 
 
 @extras_features(
@@ -123,26 +143,31 @@ class PanelVariable(OrganizationalModel):
         """Override clean to do custom validation."""
         super().clean()
 
+        # Raise error if the value is not a valid Jinja2 template, rather than when the panel is used in chat.
+        try:
+            validate_template(self.value)
+        except TemplateSyntaxError as exc:
+            raise ValidationError({"value": _(f"Invalid Jinja2 template: {exc}")}) from exc
+
         # Raise error if a query (model) is specified but an associated attribute is not.
         if self.query and not self.modelattr:
             raise ValidationError(_("A modelattr must be specified when a query is set!"))
 
         # Validate that the model name passed in is correct, and that the modelattr is an element
         # on the model.
-        for nb_model in VALID_MODELS:
-            if hasattr(nb_model, str(self.query)):
-                model = getattr(nb_model, str(self.query))
-                if hasattr(model, str(self.modelattr)):
-                    return
-
-                raise ValidationError(
-                    _(
-                        f"Nautobot model `{self.query}` does not have an attribute of `{self.modelattr}`."
-                        f" {[f.name for f in model._meta.fields if not f.name.startswith('_')]}"
-                    )
+        info = get_model_info(str(self.query))
+        if info is None:
+            raise ValidationError(_(f"`{self.query}` is not a valid Nautobot model."))
+
+        if not info.has_attribute(str(self.modelattr)):
+            raise ValidationError(
+                _(
+                    f"Nautobot model `{self.query}` does not have an attribute of `{self.modelattr}`."
+                    f" {[f.name for f in info.model._meta.fields if not f.name.startswith('_')]}"
                 )
+            )
 
-        raise ValidationError(_(f"`{self.query}` is not a valid Nautobot model."))
+        warn_unindexed(self.query, self.modelattr)
 
     def to_csv(self):
         """Return fields for bulk view."""
@@ -0,0 +1,187 @@
+"""Per-process registry of the grafana chat subcommands, rebuilt only when the panels configuration changes."""
+import copy
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
+from django.db.models import Prefetch
+
+from nautobot_plugin_chatops_grafana.grafana import handler
+from nautobot_plugin_chatops_grafana.models import Panel, PanelVariable
+
+LOGGER = logging.getLogger("nautobot.plugin.grafana")
+
+
+class PanelSpec(NamedTuple):
+    """A panel compiled for the chat hot path, with its dashboard loaded and its variables in positional order.
+
+    Specs are shared by every job of the process and must not be modified, use `panel_vars()` to get
+    variables that can be validated and rendered.
+    """
+
+    panel: Panel
+    variables: Tuple[PanelVariable, ...]
+
+    @property
+    def command_name(self) -> str:
+        """Command name of the panel, the subcommand is `get-{command_name}`."""
+        return self.panel.command_name
+
+    @property
+    def dashboard_uid(self) -> str:
+        """Grafana uid of the dashboard of the panel."""
+        return self.panel.dashboard.dashboard_uid
+
+    @property
+    def dashboard_slug(self) -> str:
+        """Slug of the dashboard of the panel."""
+        return self.panel.dashboard.dashboard_slug
+
+    @property
+    def command_variables(self) -> List[PanelVariable]:
+        """Variables given as positional arguments of the chat command."""
+        return [variable for variable in self.variables if variable.includeincmd]
+
+    def panel_vars(self) -> List[PanelVariable]:
+        """Return copies of the variables, with their own filter, that the current job may modify."""
+        panel_vars = []
+        for variable in self.variables:
+            variable = copy.copy(variable)
+            variable.filter = dict(variable.filter or {})
+            panel_vars.append(variable)
+        return panel_vars
+
+
+def load_panel_specs(**filters) -> Dict[str, Tuple[PanelSpec, ...]]:
+    """Compile the panels matching `filters`, with their dashboard joined and their variables prefetched.
+
+    Args:
+        **filters: Lookups applied to the Panel queryset.
+
+    Returns:
+        Dict[str, Tuple[PanelSpec, ...]]: Specs keyed by command name, several when the name is used on many dashboards.
+    """
+    panels = (
+        Panel.objects.filter(**filters)
+        .select_related("dashboard")
+        .prefetch_related(
+            Prefetch(
+                "panelvariable_set",
+                queryset=PanelVariable.objects.order_by("positional_order", "name"),
+                to_attr="ordered_variables",
+            )
+        )
+    )
+    specs = {}
+    for panel in panels:
+        spec = PanelSpec(panel=panel, variables=tuple(panel.ordered_variables))
+        specs[panel.command_name] = specs.get(panel.command_name, ()) + (spec,)
+    return specs
+
+
+class SubcommandRegistry:
+    """Track the version of the panels configuration the subcommands of this process were built from.
+
+    The version lives in a shared Django cache and is bumped whenever a Dashboard, Panel or PanelVariable
+    is saved or deleted. Each worker compares it with the version it built its subcommands from and only
+    rebuilds them when it changed, instead of querying every panel on each job.
+    """
+
+    def __init__(self, shared_alias: Optional[str] = "default", key: str = "grafana:registry:version"):
+        """Initialize the registry.
+
+        Args:
+            shared_alias (str): Django cache alias holding the version, empty keeps the version in-process.
+            key (str): Cache key of the version.
+        """
+        self.shared_alias = shared_alias
+        self.key = key
+        self.built_version = None
+        self.subcommands: Set[str] = set()
+        self.specs: Dict[str, Tuple[PanelSpec, ...]] = {}
+        self._lock = threading.Lock()
+        self._local = None
+
+    @property
+    def shared(self):
+        """Return the Django cache holding the version, an in-process cache when the alias is disabled or missing."""
+        if self.shared_alias:
+            try:
+                return caches[self.shared_alias]
+            except InvalidCacheBackendError:
+                LOGGER.warning("Registry alias `%s` is not configured, version kept in-process.", self.shared_alias)
+                self.shared_alias = None
+        if self._local is None:
+            self._local = LocMemCache("grafana-registry", {})
+        return self._local
+
+    def version(self) -> int:
+        """Return the current version, seeding it when it is missing from the cache (first start or eviction)."""
+        shared = self.shared
+        version = shared.get(self.key)
+        if version is None:
+            # Seed with a timestamp so an evicted version never matches one a worker already built from.
+            shared.add(self.key, time.time_ns(), timeout=None)
+            version = shared.get(self.key)
+        return version
+
+    def bump(self):
+        """Invalidate the subcommands of every worker."""
+        shared = self.shared
+        try:
+            shared.incr(self.key)
+        except ValueError:
+            shared.set(self.key, time.time_ns(), timeout=None)
+
+    def ensure(self, build: Callable[[Dict[str, Tuple[PanelSpec, ...]]], Iterable[str]]) -> bool:
+        """Recompile the active panels and rebuild the subcommands when the version changed since the last build.
+
+        Args:
+            build (Callable): Registers the subcommands of the given panel specs and returns their names.
+
+        Returns:
+            bool: Whether the subcommands were rebuilt.
+        """
+        version = self.version()
+        if version == self.built_version:
+            return False
+        with self._lock:
+            if version == self.built_version:
+                return False
+            specs = load_panel_specs(active=True)
+            self.subcommands = set(build(specs))
+            self.specs = specs
+            self.built_version = version
+        LOGGER.debug("Built %s grafana subcommands for version %s", len(self.subcommands), version)
+        return True
+
+    def get_spec(self, command_name: str) -> PanelSpec:
+        """Return the compiled panel of a command, without any query when the panel is active.
+
+        Args:
+            command_name (str): Command name of the panel.
+
+        Raises:
+            ObjectDoesNotExist: No panel uses this command name.
+            MultipleObjectsReturned: Several panels use this command name.
+
+        Returns:
+            PanelSpec: The compiled panel.
+        """
+        specs = self.specs.get(command_name)
+        if specs is None:
+            # Inactive panels are not compiled ahead of time.
+            specs = load_panel_specs(command_name=command_name).get(command_name, ())
+        if not specs:
+            raise ObjectDoesNotExist(f"No panel named {command_name}.")
+        if len(specs) > 1:
+            raise MultipleObjectsReturned(f"{len(specs)} panels named {command_name}.")
+        return specs[0]
+
+
+subcommand_registry = SubcommandRegistry(shared_alias=handler.config.render_cache_alias)
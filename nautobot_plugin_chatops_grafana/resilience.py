@@ -0,0 +1,257 @@
+"""Adaptive timeouts, retries and circuit breaking for the requests made to Grafana."""
+import logging
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Callable, Dict, Optional, Union
+
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+from django.core.cache.backends.locmem import LocMemCache
+
+LOGGER = logging.getLogger("nautobot.plugin.grafana")
+
+
+class LatencyTracker:
+    """Rolling window of the observed latency of each Grafana endpoint, used to derive its deadline."""
+
+    def __init__(
+        self,
+        window: int = 200,
+        percentile: float = 0.99,
+        multiplier: float = 3.0,
+        min_timeout: float = 5.0,
+        max_timeout: float = 60.0,
+        min_samples: int = 20,
+    ):
+        """Initialize the tracker.
+
+        Args:
+            window (int): Number of latencies kept per endpoint.
+            percentile (float): Percentile of the observed latencies the deadline is derived from.
+            multiplier (float): Head room applied to the percentile.
+            min_timeout (float): Lowest deadline in seconds.
+            max_timeout (float): Highest deadline in seconds, also used until `min_samples` latencies were observed.
+            min_samples (int): Number of latencies needed before the deadline adapts.
+        """
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+
+    def observe(self, endpoint: str, latency: float):
+        """Record the latency in seconds of a successful request to `endpoint`."""
+        with self._lock:
+            self._samples[endpoint].append(latency)
+
+    def quantile(self, endpoint: str) -> Optional[float]:
+        """Return the configured percentile of the latencies of `endpoint`, None without enough samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(endpoint, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(int(len(samples) * self.percentile), len(samples) - 1)]
+
+    def deadline(self, endpoint: str) -> float:
+        """Return the read timeout in seconds to use for the next request to `endpoint`.
+
+        Examples:
+            >>> tracker = LatencyTracker(min_samples=2, multiplier=2, min_timeout=1, max_timeout=60)
+            >>> tracker.deadline("render")
+            60
+            >>> for latency in (0.5, 3.0):
+            ...     tracker.observe("render", latency)
+            >>> tracker.deadline("render")
+            6.0
+        """
+        quantile = self.quantile(endpoint)
+        if quantile is None:
+            return self.max_timeout
+        return min(max(quantile * self.multiplier, self.min_timeout), self.max_timeout)
+
+    def stats(self) -> Dict[str, Dict[str, Union[int, float]]]:
+        """Return the sample count, percentile and current deadline of every endpoint."""
+        with self._lock:
+            endpoints = list(self._samples)
+        return {
+            endpoint: {
+                "samples": len(self._samples[endpoint]),
+                "quantile": self.quantile(endpoint),
+                "deadline": self.deadline(endpoint),
+            }
+            for endpoint in endpoints
+        }
+
+
+class CircuitBreaker:
+    """Circuit breaker shared by every worker through a Django cache.
+
+    The breaker opens after `failure_threshold` consecutive failures within `failure_window` seconds and
+    rejects calls for `reset_timeout` seconds. It is then half-open: a single worker is let through to
+    probe Grafana, closing the breaker on success and opening it again on failure.
+    """
+
+    def __init__(
+        self,
+        shared_alias: Optional[str] = "default",
+        failure_threshold: int = 5,
+        failure_window: int = 60,
+        reset_timeout: int = 30,
+        probe_timeout: int = 60,
+        prefix: str = "grafana:breaker",
+    ):
+        """Initialize the breaker.
+
+        Args:
+            shared_alias (str): Django cache alias holding the breaker state, empty keeps the state in-process.
+            failure_threshold (int): Consecutive failures opening the breaker, 0 disables the breaker.
+            failure_window (int): Seconds after which the failure count is forgotten.
+            reset_timeout (int): Seconds the breaker stays open before letting a probe through.
+            probe_timeout (int): Seconds after which another worker may probe if the probe never reported back.
+            prefix (str): Namespace of the cache keys.
+        """
+        self.shared_alias = shared_alias
+        self.failure_threshold = failure_threshold
+        self.failure_window = failure_window
+        self.reset_timeout = reset_timeout
+        self.probe_timeout = probe_timeout
+        self.open_key = f"{prefix}:open"
+        self.tripped_key = f"{prefix}:tripped"
+        self.probe_key = f"{prefix}:probe"
+        self.failures_key = f"{prefix}:failures"
+        self._local = None
+
+    @property
+    def shared(self):
+        """Return the Django cache holding the state, an in-process cache when the alias is disabled or missing."""
+        if self.shared_alias:
+            try:
+                return caches[self.shared_alias]
+            except InvalidCacheBackendError:
+                LOGGER.warning(
+                    "Circuit breaker alias `%s` is not configured, state kept in-process.", self.shared_alias
+                )
+                self.shared_alias = None
+        if self._local is None:
+            self._local = LocMemCache("grafana-breaker", {})
+        return self._local
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the breaker can open at all."""
+        return self.failure_threshold > 0
+
+    def state(self) -> str:
+        """Return `closed`, `open` or `half-open`."""
+        shared = self.shared
+        if shared.get(self.open_key):
+            return "open"
+        if shared.get(self.tripped_key):
+            return "half-open"
+        return "closed"
+
+    def allow(self) -> bool:
+        """Whether a call to Grafana may be made now."""
+        if not self.enabled:
+            return True
+        state = self.state()
+        if state == "closed":
+            return True
+        if state == "half-open":
+            # Only one worker probes Grafana, everyone else keeps failing fast until it reports back.
+            return self.shared.add(self.probe_key, 1, timeout=self.probe_timeout)
+        return False
+
+    def record_success(self):
+        """Close the breaker and reset the failure count, the cache is only written when either is set."""
+        if not self.enabled:
+            return
+        shared = self.shared
+        keys = [self.failures_key, self.tripped_key, self.probe_key]
+        if shared.get_many(keys):
+            shared.delete_many(keys)
+
+    def record_failure(self):
+        """Count a failure, opening the breaker once the threshold is reached or when the probe failed."""
+        if not self.enabled:
+            return
+        shared = self.shared
+        if shared.get(self.tripped_key):
+            self._open(shared)
+            return
+        shared.add(self.failures_key, 0, timeout=self.failure_window)
+        try:
+            failures = shared.incr(self.failures_key)
+        except ValueError:
+            # The count expired between add and incr.
+            failures = 1
+            shared.set(self.failures_key, failures, timeout=self.failure_window)
+        if failures >= self.failure_threshold:
+            self._open(shared)
+
+    def _open(self, shared):
+        LOGGER.warning("Grafana is unhealthy, failing fast for %s seconds.", self.reset_timeout)
+        shared.set(self.open_key, time.time(), timeout=self.reset_timeout)
+        shared.set(self.tripped_key, 1, timeout=None)
+        shared.delete_many([self.failures_key, self.probe_key])
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """Return a full-jitter exponential backoff delay for the given retry attempt (0 based).
+
+    Examples:
+        >>> 0 <= backoff_delay(3, base=0.5, maximum=2.0) <= 2.0
+        True
+    """
+    return random.uniform(0, min(maximum, base * 2 ** attempt))  # nosec
+
+
+def retry_budget(attempts: int, timeout: float, base: float, maximum: float) -> float:
+    """Return the longest time in seconds `retry_call` can take when each call takes up to `timeout` seconds.
+
+    Examples:
+        >>> retry_budget(2, timeout=65, base=0.5, maximum=5.0)
+        196.5
+    """
+    return (attempts + 1) * timeout + sum(min(maximum, base * 2 ** attempt) for attempt in range(attempts))
+
+
+def retry_call(
+    func: Callable,
+    attempts: int,
+    should_retry: Callable[[Optional[BaseException], object], bool],
+    base: float = 0.5,
+    maximum: float = 5.0,
+    sleep: Callable[[float], None] = time.sleep,
+):
+    """Call `func` up to `attempts + 1` times with jittered exponential backoff in between.
+
+    Args:
+        func (Callable): Idempotent call to make.
+        attempts (int): Number of retries after the first call.
+        should_retry (Callable): Called with the exception raised, or None and the result, returns whether to retry.
+        base (float): Backoff of the first retry in seconds.
+        maximum (float): Highest backoff in seconds.
+        sleep (Callable): Function used to wait between calls.
+
+    Returns:
+        The result of the last call, the exception of the last call is raised.
+    """
+    for attempt in range(attempts + 1):
+        last = attempt == attempts
+        try:
+            result = func()
+        except Exception as exc:  # pylint: disable=broad-except
+            if last or not should_retry(exc, None):
+                raise
+        else:
+            if last or not should_retry(None, result):
+                return result
+        delay = backoff_delay(attempt, base, maximum)
+        LOGGER.debug("Retrying Grafana request in %.2fs (attempt %s of %s)", delay, attempt + 2, attempts + 1)
+        sleep(delay)
+    return None
@@ -0,0 +1,159 @@
+"""Pooled, keep-alive HTTP session used for all requests to Grafana."""
+import os
+import socket
+import threading
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+
+class GrafanaHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter with configurable per-host limits, TCP keep-alive and connection reuse counters."""
+
+    def __init__(self, pool_connections: int, pool_maxsize: int, pool_block: bool, tcp_keepalive: bool):
+        """Initialize the adapter.
+
+        Args:
+            pool_connections (int): Number of per-host connection pools to keep around.
+            pool_maxsize (int): Maximum number of connections kept open per host.
+            pool_block (bool): Block when `pool_maxsize` connections to a host are busy instead of opening more.
+            tcp_keepalive (bool): Enable SO_KEEPALIVE on the sockets to Grafana.
+        """
+        self.tcp_keepalive = tcp_keepalive
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        """Create the urllib3 pool manager, adding keep-alive socket options when enabled."""
+        if self.tcp_keepalive:
+            pool_kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            ]
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the connection counters summed across every host pool held by this adapter.
+
+        Returns:
+            Dict[str, int]: `requests`, `connections_created` and `connections_reused` counters.
+        """
+        total_requests = 0
+        total_connections = 0
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            total_requests += pool.num_requests
+            total_connections += pool.num_connections
+        return {
+            "requests": total_requests,
+            "connections_created": total_connections,
+            "connections_reused": max(total_requests - total_connections, 0),
+        }
+
+
+class GrafanaSession:
+    """Per-process holder of the long-lived requests.Session used to talk to Grafana.
+
+    The session is rebuilt when the process id changes so sockets are never shared
+    between a forked RQ work-horse and its parent.
+    """
+
+    def __init__(self, pool_connections: int, pool_maxsize: int, pool_block: bool, tcp_keepalive: bool):
+        """Initialize the session holder, the session itself is created lazily."""
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.tcp_keepalive = tcp_keepalive
+        self._lock = threading.Lock()
+        self._session = None
+        self._adapter = None
+        self._pid = None
+
+    def _build(self):
+        """Create a new requests.Session mounted with a GrafanaHTTPAdapter."""
+        adapter = GrafanaHTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+            tcp_keepalive=self.tcp_keepalive,
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["Connection"] = "keep-alive"
+        return session, adapter
+
+    @property
+    def session(self) -> requests.Session:
+        """Return the session for the current process, creating it on first use."""
+        pid = os.getpid()
+        if self._session is None or self._pid != pid:
+            with self._lock:
+                if self._session is None or self._pid != pid:
+                    self._session, self._adapter = self._build()
+                    self._pid = pid
+        return self._session
+
+    def stats(self) -> Dict[str, int]:
+        """Return the connection counters of the current process' session."""
+        if self._adapter is None or self._pid != os.getpid():
+            return {"requests": 0, "connections_created": 0, "connections_reused": 0}
+        return self._adapter.stats()
+
+    def close(self):
+        """Close every pooled connection held by the session."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+            self._adapter = None
+            self._pid = None
+
+
+class DownloadMetrics:
+    """Thread-safe counters of the images downloaded from the Grafana renderer."""
+
+    def __init__(self):
+        """Initialize the counters."""
+        self._lock = threading.Lock()
+        self._stats = {
+            "downloads": 0,
+            "bytes": 0,
+            "max_bytes": 0,
+            "oversize_aborts": 0,
+            "ttfb_total": 0.0,
+            "time_total": 0.0,
+        }
+
+    def record(self, size: int, ttfb: float, total: float):
+        """Record a completed download.
+
+        Args:
+            size (int): Bytes downloaded.
+            ttfb (float): Seconds until the response headers were received.
+            total (float): Seconds until the whole body was received.
+        """
+        with self._lock:
+            self._stats["downloads"] += 1
+            self._stats["bytes"] += size
+            self._stats["max_bytes"] = max(self._stats["max_bytes"], size)
+            self._stats["ttfb_total"] += ttfb
+            self._stats["time_total"] += total
+
+    def oversize(self):
+        """Record a download aborted because it exceeded the size limit."""
+        with self._lock:
+            self._stats["oversize_aborts"] += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Return the counters along with the mean size, time to first byte and download time."""
+        with self._lock:
+            stats = dict(self._stats)
+        downloads = stats["downloads"] or 1
+        stats["mean_bytes"] = stats["bytes"] / downloads
+        stats["mean_ttfb"] = stats.pop("ttfb_total") / downloads
+        stats["mean_time"] = stats.pop("time_total") / downloads
+        return stats
@@ -0,0 +1,20 @@
+"""Signal handlers of the nautobot_plugin_chatops_grafana plugin."""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from nautobot_plugin_chatops_grafana.models import Dashboard, Panel, PanelVariable
+from nautobot_plugin_chatops_grafana.registry import subcommand_registry
+
+
+def invalidate_subcommands(sender, **kwargs):  # pylint: disable=unused-argument
+    """Make every worker rebuild its grafana subcommands once the change is committed."""
+    transaction.on_commit(subcommand_registry.bump)
+
+
+def connect_signals():
+    """Invalidate the subcommands whenever a Dashboard, Panel or PanelVariable is saved or deleted."""
+    for model in (Dashboard, Panel, PanelVariable):
+        post_save.connect(invalidate_subcommands, sender=model, dispatch_uid=f"grafana_registry_save_{model.__name__}")
+        post_delete.connect(
+            invalidate_subcommands, sender=model, dispatch_uid=f"grafana_registry_delete_{model.__name__}"
+        )
@@ -0,0 +1,94 @@
+"""Sandboxed, cached rendering of the Jinja2 templates found in PanelVariable values."""
+import functools
+from typing import Any, Dict, Optional, Set, Union
+
+from jinja2 import Template, TemplateSyntaxError, nodes
+from jinja2.sandbox import SandboxedEnvironment
+
+# Markers of Jinja2 expressions, statements and comments, values without any of them are plain strings.
+TEMPLATE_MARKERS = ("{{", "{%", "{#")
+
+ENVIRONMENT = SandboxedEnvironment()
+
+
+def is_template(source: str) -> bool:
+    """Whether a variable value holds Jinja2 syntax and needs rendering.
+
+    Examples:
+        >>> [is_template(value) for value in ("ams01", "{{ site.slug }}", "{% if site %}x{% endif %}")]
+        [False, True, True]
+    """
+    return isinstance(source, str) and any(marker in source for marker in TEMPLATE_MARKERS)
+
+
+@functools.lru_cache(maxsize=512)
+def compile_template(source: str) -> Template:
+    """Compile a template with the shared sandboxed environment, cached by source.
+
+    Raises:
+        jinja2.TemplateSyntaxError: The template is invalid.
+    """
+    return ENVIRONMENT.from_string(source)
+
+
+def render_value(source: Union[str, Any], context: Dict[str, Any]) -> Union[str, Any]:
+    """Render a variable value, returning plain strings and non string values untouched.
+
+    Examples:
+        >>> render_value("{{ site.slug }}-01", {"site": {"slug": "ams"}})
+        'ams-01'
+        >>> render_value("ams01", {})
+        'ams01'
+    """
+    if not is_template(source):
+        return source
+    return compile_template(source).render(context)
+
+
+def validate_template(source: str):
+    """Parse a template without caching it.
+
+    Raises:
+        jinja2.TemplateSyntaxError: The template is invalid.
+    """
+    if is_template(source):
+        ENVIRONMENT.parse(source)
+
+
+@functools.lru_cache(maxsize=512)
+def template_attributes(source: str, name: str) -> Optional[Set[str]]:
+    """Attributes of the variable `name` that a template reads, e.g. `slug` for `{{ site.slug }}`.
+
+    Returns:
+        Set[str]: The attributes read, None when the template uses the variable as a whole or is invalid.
+
+    Examples:
+        >>> sorted(template_attributes("{{ site.slug }}-{{ site['name'] }}", "site"))
+        ['name', 'slug']
+        >>> template_attributes("{{ site }}", "site") is None
+        True
+        >>> template_attributes("ams01", "site")
+        set()
+    """
+    if not is_template(source):
+        return set()
+    try:
+        tree = ENVIRONMENT.parse(source)
+    except TemplateSyntaxError:
+        return None
+
+    attributes = set()
+    accessed = 0
+    for node in tree.find_all((nodes.Getattr, nodes.Getitem)):
+        if not isinstance(node.node, nodes.Name) or node.node.name != name:
+            continue
+        if isinstance(node, nodes.Getattr):
+            attributes.add(node.attr)
+        elif isinstance(node.arg, nodes.Const) and isinstance(node.arg.value, str):
+            attributes.add(node.arg.value)
+        else:
+            return None
+        accessed += 1
+    used = sum(1 for node in tree.find_all(nodes.Name) if node.name == name)
+    # Every use of the variable must be an attribute lookup for the others fields to be skipped.
+    return attributes if used == accessed else None
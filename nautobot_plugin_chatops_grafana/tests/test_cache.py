@@ -0,0 +1,101 @@
+"""Test cases for the render cache."""
+import threading
+import time
+
+from django.test import TestCase
+
+from nautobot_plugin_chatops_grafana.cache import DashboardDocumentCache, RenderCache, SingleFlight, make_render_key
+
+
+class TestRenderCache(TestCase):
+    """Test the in-process tier of the render cache."""
+
+    def setUp(self):
+        """Create a render cache without a shared tier."""
+        self.cache = RenderCache(max_bytes=10, shared_alias=None)
+
+    def test_key_is_order_independent(self):
+        """Verify that the render key does not depend on the parameter order."""
+        self.assertEqual(
+            make_render_key({"panelId": 1, "var-site": "ams01", "theme": "dark"}),
+            make_render_key({"theme": "dark", "var-site": "ams01", "panelId": 1}),
+        )
+        self.assertNotEqual(make_render_key({"panelId": 1}), make_render_key({"panelId": 2}))
+
+    def test_hit_and_miss(self):
+        """Verify hits and misses are served and counted."""
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.set("a", b"1234", ttl=60)
+        self.assertEqual(self.cache.get("a"), b"1234")
+        stats = self.cache.stats()
+        self.assertEqual(stats["local_hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["bytes"], 4)
+
+    def test_byte_budget_eviction(self):
+        """Verify the least recently used images are evicted once the byte budget is exceeded."""
+        self.cache.set("a", b"1234", ttl=60)
+        self.cache.set("b", b"1234", ttl=60)
+        self.cache.get("a")
+        self.cache.set("c", b"1234", ttl=60)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a"), b"1234")
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_oversize_and_zero_ttl_are_not_stored(self):
+        """Verify images larger than the budget or with no TTL are never cached."""
+        self.cache.set("big", b"x" * 11, ttl=60)
+        self.cache.set("nottl", b"x", ttl=0)
+        self.assertIsNone(self.cache.get("big"))
+        self.assertIsNone(self.cache.get("nottl"))
+        self.assertEqual(self.cache.stats()["oversize"], 1)
+
+
+class TestSingleFlight(TestCase):
+    """Test the in-process coalescing of identical renders."""
+
+    def test_concurrent_calls_are_coalesced(self):
+        """Verify that concurrent calls for the same key trigger a single render."""
+        single_flight = SingleFlight(shared_alias=None, wait_timeout=5)
+        calls = []
+        results = []
+
+        def render():
+            calls.append(1)
+            time.sleep(0.2)
+            return b"png"
+
+        threads = [threading.Thread(target=lambda: results.append(single_flight.run("k", render))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [b"png"] * 5)
+        self.assertEqual(single_flight.stats()["local_followers"], 4)
+
+
+class TestDashboardDocumentCache(TestCase):
+    """Test the cache of the dashboard documents shared by the syncs."""
+
+    def setUp(self):
+        """Create a dashboard cache kept in-process."""
+        self.cache = DashboardDocumentCache(shared_alias=None, ttl=60, version_ttl=600)
+        self.document = {"dashboard": {"uid": "abc", "version": 3, "panels": [{"id": 1}]}, "meta": {"version": 3}}
+
+    def test_latest_and_versioned_lookups(self):
+        """Verify a document is found by uid alone while it is the latest, and by uid and version."""
+        self.assertIsNone(self.cache.get("abc"))
+        self.cache.set("abc", self.document)
+        self.assertEqual(self.cache.get("abc"), self.document)
+        self.assertEqual(self.cache.get("abc", version=3), self.document)
+        self.assertIsNone(self.cache.get("abc", version=4))
+        self.assertEqual(self.cache.stats(), {"hits": 2, "misses": 2, "sets": 1})
+
+    def test_latest_pointer_disabled(self):
+        """Verify only callers giving the version are served when the latest pointer is disabled."""
+        cache = DashboardDocumentCache(shared_alias=None, ttl=0, version_ttl=600)
+        cache.set("abc", self.document)
+        self.assertIsNone(cache.get("abc"))
+        self.assertEqual(cache.get("abc", version=3), self.document)
@@ -0,0 +1,74 @@
+"""Test cases for the delivery of rendered images to the chat clients."""
+import os
+import tempfile
+from unittest.mock import MagicMock, patch
+
+import nautobot_chatops
+from django.test import TestCase
+
+from nautobot_plugin_chatops_grafana import delivery
+from nautobot_plugin_chatops_grafana.delivery import chatops_major_version, send_image_bytes, spool_dir
+
+IMAGE = b"\x89PNG\r\n\x1a\n" + os.urandom(1024)
+
+
+class PathDispatcher:  # pylint: disable=too-few-public-methods
+    """Dispatcher reading the uploaded file back like the Mattermost, Teams and WebEx clients do."""
+
+    platform_slug = "mattermost"
+
+    def __init__(self):
+        """Record the files sent."""
+        self.sent = []
+
+    def send_image(self, image_path):
+        """Read the image back while its file exists."""
+        with open(image_path, "rb") as image_file:
+            self.sent.append((image_path, image_file.read()))
+
+
+class TestSendImageBytes(TestCase):
+    """Test the in-memory and the temporary file deliveries."""
+
+    def test_path_dispatchers_get_a_temporary_file(self):
+        """Verify the image is written to a file passed to send_image, then removed."""
+        dispatcher = PathDispatcher()
+        with tempfile.TemporaryDirectory() as spool:
+            send_image_bytes(dispatcher, IMAGE, "panel.png", max_bytes=len(IMAGE), directory=spool)
+            [(image_path, sent)] = dispatcher.sent
+            self.assertEqual(sent, IMAGE)
+            self.assertEqual(os.path.basename(image_path), "panel.png")
+            self.assertTrue(image_path.startswith(spool))
+            self.assertFalse(os.path.exists(image_path))
+
+    def test_large_images_spill_to_the_default_directory(self):
+        """Verify images over the spool limit, or without a usable spool, use the default temporary directory."""
+        with tempfile.TemporaryDirectory() as spool:
+            self.assertEqual(spool_dir(10, max_bytes=10, directory=spool), spool)
+            self.assertIsNone(spool_dir(11, max_bytes=10, directory=spool))
+        self.assertIsNone(spool_dir(10, max_bytes=10, directory="/nonexistent"))
+
+    def test_slack_uploads_from_memory(self):
+        """Verify the Slack client of a known nautobot-chatops release is given the bytes."""
+        dispatcher = MagicMock(platform_slug="slack", context={"channel_id": "C0000000"})
+        with patch.dict(delivery.IN_MEMORY_UPLOADERS, {"slack": delivery._slack_upload}):  # pylint: disable=W0212
+            send_image_bytes(dispatcher, IMAGE, "panel.png", max_bytes=len(IMAGE), directory="")
+        dispatcher.slack_client.files_upload.assert_called_once_with(
+            channels="C0000000", file=IMAGE, filename="panel.png"
+        )
+        dispatcher.send_image.assert_not_called()
+
+    def test_unknown_release_falls_back_to_send_image(self):
+        """Verify Slack goes through the public send_image when its release is not a known one."""
+        dispatcher = MagicMock(platform_slug="slack", context={"channel_id": "C0000000"})
+        with patch.dict(delivery.IN_MEMORY_UPLOADERS, clear=True):
+            send_image_bytes(dispatcher, IMAGE, "panel.png", max_bytes=len(IMAGE), directory="")
+        dispatcher.slack_client.files_upload.assert_not_called()
+        dispatcher.send_image.assert_called_once()
+
+    def test_major_version(self):
+        """Verify the major version of nautobot-chatops is parsed, 0 when unknown."""
+        with patch.object(nautobot_chatops, "__version__", "1.5.0"):
+            self.assertEqual(chatops_major_version(), 1)
+        with patch.object(nautobot_chatops, "__version__", "unknown"):
+            self.assertEqual(chatops_major_version(), 0)
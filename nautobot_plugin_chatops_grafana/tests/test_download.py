@@ -0,0 +1,89 @@
+"""Test cases for the bounded download of the images rendered by Grafana."""
+import io
+from unittest.mock import patch
+
+import requests
+from django.test import TestCase
+
+from nautobot_plugin_chatops_grafana.grafana import handler
+from nautobot_plugin_chatops_grafana.session import DownloadMetrics
+
+
+class RenderBody(io.BytesIO):
+    """Body of a streamed response, remembering how much of it was read once the response is closed."""
+
+    position = 0
+
+    def close(self):
+        """Record the bytes read before closing."""
+        self.position = self.tell()
+        super().close()
+
+
+def render_response(body: bytes, content_length: bool = True) -> requests.Response:
+    """Return a streamed response of the renderer, announcing its size or not."""
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = RenderBody(body)
+    if content_length:
+        response.headers["Content-Length"] = str(len(body))
+    return response
+
+
+class TestRenderDownload(TestCase):
+    """Test the download of a render limited to `render_max_bytes`."""
+
+    def setUp(self):
+        """Allow renders of 1000 bytes, read 100 bytes at a time, with fresh metrics."""
+        patches = (
+            patch.object(handler.config, "render_max_bytes", 1000),
+            patch.object(handler.config, "render_chunk_size", 100),
+            patch.object(handler, "download_metrics", DownloadMetrics()),
+        )
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def download(self, response: requests.Response):
+        """Download a render answered with `response`."""
+        with patch.object(handler, "_request", return_value=response):
+            return handler._render_png("http://grafana/render/d-solo/uid", {})  # pylint: disable=protected-access
+
+    def test_images_within_the_limit(self):
+        """Verify an image up to the limit is returned and recorded."""
+        self.assertEqual(self.download(render_response(b"x" * 1000)), b"x" * 1000)
+        stats = handler.download_stats()
+        self.assertEqual((stats["downloads"], stats["bytes"], stats["oversize_aborts"]), (1, 1000, 0))
+
+    def test_announced_size_is_checked_before_reading(self):
+        """Verify a Content-Length over the limit aborts the download without reading the body."""
+        response = render_response(b"x" * 1001)
+        self.assertIsNone(self.download(response))
+        self.assertEqual(response.raw.position, 0)
+        self.assertEqual(handler.download_stats()["oversize_aborts"], 1)
+
+    def test_streaming_stops_at_the_limit(self):
+        """Verify an image sent without its size is abandoned after the first chunk over the limit."""
+        response = render_response(b"x" * 5000, content_length=False)
+        self.assertIsNone(self.download(response))
+        self.assertEqual(response.raw.position, 1100)
+        stats = handler.download_stats()
+        self.assertEqual((stats["downloads"], stats["oversize_aborts"]), (0, 1))
+
+
+class TestDownloadMetrics(TestCase):
+    """Test the download counters."""
+
+    def test_means_and_largest_download(self):
+        """Verify the means are computed over the recorded downloads."""
+        metrics = DownloadMetrics()
+        self.assertEqual(metrics.stats()["mean_bytes"], 0)
+        metrics.record(100, ttfb=0.1, total=0.3)
+        metrics.record(300, ttfb=0.3, total=0.5)
+        metrics.oversize()
+        stats = metrics.stats()
+        self.assertEqual((stats["downloads"], stats["bytes"], stats["max_bytes"]), (2, 400, 300))
+        self.assertEqual(stats["oversize_aborts"], 1)
+        self.assertAlmostEqual(stats["mean_bytes"], 200)
+        self.assertAlmostEqual(stats["mean_ttfb"], 0.2)
+        self.assertAlmostEqual(stats["mean_time"], 0.4)
@@ -0,0 +1,92 @@
+"""Test cases for the concurrent renders of the asyncio handler."""
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from django.test import TestCase
+
+from nautobot_plugin_chatops_grafana.grafana_async import AsyncGrafanaHandler, get_event_loop, run_async
+from nautobot_plugin_chatops_grafana.models import Panel
+
+
+class SlowHandler:
+    """GrafanaHandler answering after a delay, recording how many renders run at once."""
+
+    def __init__(self, pool_maxsize: int = 8):
+        """Initialize the counters."""
+        self.config = SimpleNamespace(pool_maxsize=pool_maxsize)
+        self.running = 0
+        self.peak = 0
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get_png(self, panel, panel_vars, **kwargs):
+        """Render slower for lower panel ids, fail for negative ones."""
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            self.calls.append((panel.panel_id, kwargs))
+        time.sleep(0.01 * (10 - abs(panel.panel_id)))
+        with self._lock:
+            self.running -= 1
+        return None if panel.panel_id < 0 else f"png-{panel.panel_id}".encode()
+
+
+class TestGetPngMany(TestCase):
+    """Test the bounded fan-out of the renders."""
+
+    def setUp(self):
+        """Create an async handler of four executor threads."""
+        self.sync_handler = SlowHandler(pool_maxsize=4)
+        self.async_handler = AsyncGrafanaHandler(self.sync_handler)
+        self.addCleanup(self.async_handler.close)
+
+    def test_results_keep_the_order_of_the_requests(self):
+        """Verify images come back in request order though the first requests finish last, failures as None."""
+        requests = [(Panel(panel_id=panel_id), []) for panel_id in (1, 2, -3, 4)]
+        requests.append((Panel(panel_id=5), [], {"width": 120, "height": 80}))
+        images = run_async(self.async_handler.get_png_many(requests))
+        self.assertEqual(images, [b"png-1", b"png-2", None, b"png-4", b"png-5"])
+        self.assertIn((5, {"width": 120, "height": 80}), self.sync_handler.calls)
+
+    def test_concurrency_is_bounded(self):
+        """Verify no more renders than `concurrency` run at once, and no more than the executor size by default."""
+        requests = [(Panel(panel_id=panel_id), []) for panel_id in range(1, 9)]
+        run_async(self.async_handler.get_png_many(requests, concurrency=2))
+        self.assertEqual(self.sync_handler.peak, 2)
+
+        self.sync_handler.peak = 0
+        run_async(self.async_handler.get_png_many(requests))
+        self.assertEqual(self.sync_handler.peak, 4)
+
+
+class TestRunAsync(TestCase):
+    """Test running coroutines from synchronous code."""
+
+    def test_event_loop_is_reused_per_thread(self):
+        """Verify consecutive calls run on the same loop of the calling thread, and other threads get their own."""
+
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        first = run_async(current_loop())
+        self.assertIs(run_async(current_loop()), first)
+        self.assertIs(get_event_loop(), first)
+
+        loops = []
+        thread = threading.Thread(target=lambda: loops.append(run_async(current_loop())))
+        thread.start()
+        thread.join()
+        self.assertIsNot(loops[0], first)
+
+    def test_refused_inside_a_running_loop(self):
+        """Verify calling it from a coroutine raises instead of blocking the running loop."""
+
+        async def nested():
+            inner = asyncio.sleep(0)
+            with self.assertRaises(RuntimeError):
+                run_async(inner)
+            return inner.cr_frame is None
+
+        self.assertTrue(run_async(nested()))
@@ -0,0 +1,97 @@
+"""Test cases for the image post-processing."""
+import io
+
+from django.test import TestCase
+from PIL import Image
+
+from nautobot_plugin_chatops_grafana.images import BACKGROUND, Tile, layout_grid, postprocess, stitch
+
+
+def make_png(width: int = 200, height: int = 100) -> bytes:
+    """Return an unoptimised PNG resembling a dark-theme graph."""
+    image = Image.new("RGBA", (width, height), (17, 18, 23, 255))
+    for x_coord in range(width):
+        image.putpixel((x_coord, (x_coord * 7) % height), (115, 191, 105, 255))
+    output = io.BytesIO()
+    image.save(output, format="PNG", compress_level=0)
+    return output.getvalue()
+
+
+def solid_png(width: int, height: int, color: tuple) -> bytes:
+    """Return a PNG filled with a single color."""
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(output, format="PNG")
+    return output.getvalue()
+
+
+class TestLayoutGrid(TestCase):
+    """Test the layout of the panels of a dashboard on the stitched image."""
+
+    def test_empty_rows_are_collapsed(self):
+        """Verify the grid rows without a rendered panel take no space and panels keep their columns."""
+        tiles = layout_grid(
+            {1: {"x": 0, "y": 0, "w": 24, "h": 2}, 2: {"x": 12, "y": 10, "w": 12, "h": 1}},
+            width=240,
+        )
+        self.assertEqual(tiles[1], Tile(x=0, y=0, width=240, height=68))
+        self.assertEqual(tiles[2], Tile(x=120, y=76, width=120, height=30))
+
+    def test_panels_without_position_are_stacked_at_the_bottom(self):
+        """Verify panels missing from the dashboard document, or with a partial `gridPos`, go full width below."""
+        tiles = layout_grid({1: {"x": 0, "y": 4, "w": 12, "h": 2}, 2: None, 3: {"x": 0, "y": 0}}, width=240)
+        self.assertEqual(tiles[1], Tile(x=0, y=0, width=120, height=68))
+        self.assertEqual(tiles[2], Tile(x=0, y=76, width=240, height=296))
+        self.assertEqual(tiles[3], Tile(x=0, y=380, width=240, height=296))
+
+
+class TestStitch(TestCase):
+    """Test the stitching of the rendered panels into a single image."""
+
+    def test_images_are_pasted_in_their_tiles(self):
+        """Verify the canvas spans every tile, images are scaled to their tile, and failed renders stay empty."""
+        tiles = [
+            Tile(x=0, y=0, width=100, height=50),
+            Tile(x=100, y=0, width=100, height=50),
+            Tile(x=0, y=50, width=200, height=50),
+        ]
+        images = [solid_png(100, 50, (255, 0, 0)), solid_png(200, 100, (0, 0, 255)), None]
+        with Image.open(io.BytesIO(stitch(images, tiles, theme="light"))) as snapshot:
+            self.assertEqual(snapshot.size, (200, 100))
+            snapshot = snapshot.convert("RGB")
+            self.assertEqual(snapshot.getpixel((50, 25)), (255, 0, 0))
+            self.assertEqual(snapshot.getpixel((150, 25)), (0, 0, 255))
+            self.assertEqual(snapshot.getpixel((100, 75)), BACKGROUND["light"])
+
+
+class TestPostprocess(TestCase):
+    """Test the post-processing applied before upload."""
+
+    def test_none_returns_the_original(self):
+        """Verify the image is unchanged when post-processing is disabled."""
+        raw_png = make_png()
+        image = postprocess(raw_png, mode="none")
+        self.assertIs(image.data, raw_png)
+        self.assertEqual(image.extension, "png")
+        self.assertEqual(image.bytes_saved, 0)
+
+    def test_optimize_and_quantize_shrink_the_png(self):
+        """Verify the lossless and palette modes produce smaller PNGs of the same size."""
+        raw_png = make_png()
+        for mode in ("optimize", "quantize"):
+            image = postprocess(raw_png, mode=mode, colors=16)
+            self.assertEqual(image.extension, "png")
+            self.assertGreater(image.bytes_saved, 0)
+            with Image.open(io.BytesIO(image.data)) as decoded:
+                self.assertEqual(decoded.size, (200, 100))
+
+    def test_jpeg_conversion(self):
+        """Verify the JPEG mode changes the format and the extension."""
+        image = postprocess(make_png(), mode="jpeg", quality=70)
+        self.assertEqual(image.extension, "jpg")
+        with Image.open(io.BytesIO(image.data)) as decoded:
+            self.assertEqual(decoded.format, "JPEG")
+
+    def test_unreadable_image_is_sent_unchanged(self):
+        """Verify an image Pillow can not decode is returned as is."""
+        image = postprocess(b"not a png", mode="optimize")
+        self.assertEqual(image.data, b"not a png")
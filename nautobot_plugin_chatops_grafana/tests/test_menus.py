@@ -0,0 +1,46 @@
+"""Test cases for the paginated menus of Nautobot objects."""
+from django.test import TestCase
+from nautobot.dcim.models import Site
+
+from nautobot_plugin_chatops_grafana.menus import NEXT_PAGE_LABEL, MenuPaginator
+
+
+class TestMenuPaginator(TestCase):
+    """Test the keyset pagination of the menus and their continuation tokens."""
+
+    def setUp(self):
+        """Create five sites, two of them sharing a description, and a paginator of two choices per page."""
+        for index, description in enumerate(("core", "edge", "edge", "lab", "core")):
+            Site.objects.create(name=f"Site {index}", slug=f"site-{index}", description=description)
+        self.paginator = MenuPaginator(shared_alias=None, page_size=2, ttl=60)
+
+    def walk(self, modelattr: str, lookup: dict):
+        """Return the choices of every page, following the continuation tokens."""
+        pages = []
+        page = self.paginator.page(Site.objects.all(), modelattr, lookup)
+        while True:
+            pages.append([value for _, value in page.choices])
+            if page.token is None:
+                return pages
+            self.assertEqual(page.choices[-1], (NEXT_PAGE_LABEL, page.token))
+            state = self.paginator.load(page.token)
+            self.assertEqual(state["lookup"], lookup)
+            page = self.paginator.page(Site.objects.all(), modelattr, state["lookup"], after=state["after"])
+
+    def test_pages_follow_the_attribute_order(self):
+        """Verify every object is offered once, in attribute order, with a token on every page but the last."""
+        pages = self.walk("slug", {})
+        self.assertEqual([page[:2] for page in pages], [["site-0", "site-1"], ["site-2", "site-3"], ["site-4"]])
+        self.assertEqual([MenuPaginator.is_token(page[-1]) for page in pages], [True, True, False])
+
+    def test_ties_are_broken_by_primary_key(self):
+        """Verify objects sharing the attribute value are neither repeated nor skipped across pages."""
+        pages = self.walk("description", {"description__in": ["core", "edge"]})
+        values = [value for page in pages for value in page if not MenuPaginator.is_token(value)]
+        self.assertEqual(values, ["core", "core", "edge", "edge"])
+
+    def test_tokens_are_kept_in_process_without_a_shared_cache(self):
+        """Verify the tokens are stored without a shared cache, and unknown tokens are reported as expired."""
+        token = self.paginator.page(Site.objects.all(), "slug", {}).token
+        self.assertIsNotNone(self.paginator.load(token))
+        self.assertIsNone(self.paginator.load("menu:unknown"))
@@ -0,0 +1,137 @@
+"""Test cases for the timeouts, retries and circuit breaker of the Grafana requests."""
+from unittest.mock import patch
+
+import requests
+from django.test import TestCase
+
+from nautobot_plugin_chatops_grafana.grafana import GrafanaHandler, handler
+from nautobot_plugin_chatops_grafana.resilience import CircuitBreaker, LatencyTracker, retry_budget, retry_call
+
+
+class TestLatencyTracker(TestCase):
+    """Test the adaptive deadlines."""
+
+    def test_deadline_follows_the_observed_latency(self):
+        """Verify the deadline is the maximum until enough samples exist, then the scaled and clamped percentile."""
+        tracker = LatencyTracker(percentile=0.9, multiplier=2, min_timeout=1, max_timeout=30, min_samples=10)
+        self.assertEqual(tracker.deadline("render"), 30)
+        for _ in range(10):
+            tracker.observe("render", 2.0)
+        self.assertEqual(tracker.deadline("render"), 4.0)
+        for _ in range(10):
+            tracker.observe("search", 0.01)
+        self.assertEqual(tracker.deadline("search"), 1)
+
+
+class TestCircuitBreaker(TestCase):
+    """Test the circuit breaker with its in-process state."""
+
+    def setUp(self):
+        """Create a breaker opening after two failures."""
+        self.breaker = CircuitBreaker(shared_alias=None, failure_threshold=2, reset_timeout=30)
+        self.breaker.shared.clear()
+
+    def test_opens_after_consecutive_failures(self):
+        """Verify the breaker opens after the threshold and a success resets the count."""
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state(), "open")
+        self.assertFalse(self.breaker.allow())
+
+    def test_half_open_lets_a_single_probe_through(self):
+        """Verify a single call probes Grafana once the reset timeout expired."""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.shared.delete(self.breaker.open_key)
+        self.assertEqual(self.breaker.state(), "half-open")
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state(), "open")
+        self.breaker.shared.delete(self.breaker.open_key)
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state(), "closed")
+
+    def test_success_of_a_closed_breaker_writes_nothing(self):
+        """Verify the shared state is only written when a success changes it."""
+        with patch.object(self.breaker.shared, "delete_many") as delete_many:
+            self.breaker.record_success()
+            delete_many.assert_not_called()
+            self.breaker.record_failure()
+            self.breaker.record_success()
+            delete_many.assert_called_once()
+
+
+class TestBreakerFailures(TestCase):
+    """Test which responses of Grafana count as failures of the breaker."""
+
+    def setUp(self):
+        """Use a breaker opening on the first failure and make a single attempt per request."""
+        breaker = CircuitBreaker(shared_alias=None, failure_threshold=1)
+        breaker.shared.clear()
+        patches = (
+            patch.object(handler, "circuit_breaker", breaker),
+            patch.object(handler.config, "retry_attempts", 0),
+        )
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def get(self, status_code: int) -> requests.Response:
+        """Request Grafana, answering with `status_code`."""
+        response = requests.Response()
+        response.status_code = status_code
+        with patch.object(requests.Session, "get", return_value=response):
+            return handler._request("search", "http://grafana/api/search")  # pylint: disable=protected-access
+
+    def test_application_errors_do_not_open_the_breaker(self):
+        """Verify a 500 response is returned without counting as a failure."""
+        self.assertEqual(self.get(500).status_code, 500)
+        self.assertEqual(handler.circuit_breaker.state(), "closed")
+
+    def test_unavailable_grafana_opens_the_breaker(self):
+        """Verify a 503 response counts as a failure."""
+        self.get(503)
+        self.assertEqual(handler.circuit_breaker.state(), "open")
+
+
+class TestRetryCall(TestCase):
+    """Test the bounded retries."""
+
+    def test_retries_are_bounded(self):
+        """Verify retryable errors are retried `attempts` times and the last error is raised."""
+        calls = []
+
+        def failing():
+            calls.append(1)
+            raise ConnectionError
+
+        with self.assertRaises(ConnectionError):
+            retry_call(failing, attempts=2, should_retry=lambda exc, _: True, sleep=lambda _: None)
+        self.assertEqual(len(calls), 3)
+
+    def test_result_is_returned_once_not_retryable(self):
+        """Verify a result that should not be retried is returned."""
+        results = iter([503, 503, 200])
+        result = retry_call(
+            lambda: next(results), attempts=5, should_retry=lambda _, code: code == 503, sleep=lambda _: None
+        )
+        self.assertEqual(result, 200)
+
+    def test_budget_covers_every_attempt_and_backoff(self):
+        """Verify the budget adds the timeout of every attempt and the longest backoff before each retry."""
+        self.assertEqual(retry_budget(0, timeout=10, base=0.5, maximum=5), 10)
+        self.assertEqual(retry_budget(3, timeout=10, base=1, maximum=3), 40 + 1 + 2 + 3)
+
+    def test_advertised_render_time(self):
+        """Verify the time told to the chat users covers the render budget and the wait of the single-flight followers."""
+        config = {**handler.config.dict(), "single_flight_wait": None}
+        derived = GrafanaHandler(config)
+        self.assertEqual(derived.single_flight.wait_timeout, 196.5)
+        self.assertEqual(derived.max_render_seconds, 197)
+        self.assertEqual(GrafanaHandler({**config, "single_flight_wait": 300}).max_render_seconds, 300)
+        self.assertEqual(GrafanaHandler({**config, "single_flight_wait": 10}).max_render_seconds, 197)
@@ -0,0 +1,87 @@
+"""Test cases for the pooled keep-alive session used to talk to Grafana."""
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from nautobot_plugin_chatops_grafana.session import GrafanaSession
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Answer every request on a persistent HTTP/1.1 connection, waiting on the server barrier if any."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Send a small JSON body."""
+        if self.server.barrier is not None:
+            self.server.barrier.wait(timeout=5)
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """Keep the test output quiet."""
+
+
+class TestGrafanaSession(TestCase):
+    """Test the connection reuse of the session and its counters."""
+
+    def setUp(self):
+        """Serve HTTP on a local port and create a session of two connections per host."""
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        self.server.barrier = None
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/health"
+        self.http = GrafanaSession(pool_connections=1, pool_maxsize=2, pool_block=True, tcp_keepalive=True)
+        self.addCleanup(self.http.close)
+
+    def get(self, _=None):
+        """Request the health endpoint, reading the whole body so the connection goes back to the pool."""
+        response = self.http.session.get(self.url, timeout=5)
+        response.raise_for_status()
+        return response.content
+
+    def test_sequential_requests_reuse_one_connection(self):
+        """Verify consecutive requests are sent over the connection opened by the first one."""
+        self.assertEqual(self.http.stats(), {"requests": 0, "connections_created": 0, "connections_reused": 0})
+        for _ in range(5):
+            self.get()
+        self.assertEqual(self.http.stats(), {"requests": 5, "connections_created": 1, "connections_reused": 4})
+
+    def test_concurrent_requests_are_bounded_by_the_pool(self):
+        """Verify concurrent requests never open more connections than `pool_maxsize`."""
+        self.server.barrier = threading.Barrier(2)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(self.get, range(8)))
+        self.assertEqual(self.http.stats(), {"requests": 8, "connections_created": 2, "connections_reused": 6})
+
+    def test_keepalive_socket_option(self):
+        """Verify the sockets to Grafana are opened with SO_KEEPALIVE."""
+        self.get()
+        pools = self.http.session.get_adapter(self.url).poolmanager.pools
+        pool = pools.get(next(iter(pools.keys())))
+        connection = pool.pool.get()
+        try:
+            self.assertEqual(connection.sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE), 1)
+        finally:
+            pool.pool.put(connection)
+
+    def test_session_is_rebuilt_after_a_fork(self):
+        """Verify a forked process starts with its own session and counters."""
+        self.get()
+        session = self.http.session
+        with patch("nautobot_plugin_chatops_grafana.session.os.getpid", return_value=-1):
+            self.assertEqual(self.http.stats()["requests"], 0)
+            self.assertIsNot(self.http.session, session)
+            self.get()
+            self.assertEqual(self.http.stats(), {"requests": 1, "connections_created": 1, "connections_reused": 0})
@@ -0,0 +1,259 @@
+"""Test cases for the DiffSync synchronization functions."""
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from nautobot_plugin_chatops_grafana.benchmarks import synthetic_dashboard_panels
+from nautobot_plugin_chatops_grafana.cache import DashboardDocumentCache
+from nautobot_plugin_chatops_grafana.diffsync.batch import BatchWriter
+from nautobot_plugin_chatops_grafana.diffsync.models import GrafanaPanel
+from nautobot_plugin_chatops_grafana.diffsync.sync import (
+    run_dashboard_sync,
+    run_incremental_sync,
+    run_organization_sync,
+    run_panels_sync,
+)
+from nautobot_plugin_chatops_grafana.exceptions import CircuitOpenError, SyncAbortedError
+from nautobot_plugin_chatops_grafana.grafana import handler
+from nautobot_plugin_chatops_grafana.models import Dashboard, Panel
+
+SEARCH = [{"id": 7, "uid": "7Wkldj8Q", "uri": "db/test-dashboard", "title": "Test Dashboard"}]
+DOCUMENT = {
+    "dashboard": {
+        "uid": "7Wkldj8Q",
+        "version": 3,
+        "panels": [{"id": 1, "type": "graph", "title": "Interface Traffic"}],
+        "templating": {"list": []},
+    },
+    "meta": {},
+}
+
+
+class TestIncrementalSync(TestCase):
+    """Test the sync of the dashboards changed in Grafana."""
+
+    def setUp(self):
+        """Serve the Grafana responses of a single dashboard at version 3."""
+        patches = (
+            patch.object(handler, "get_dashboards", return_value=SEARCH),
+            patch.object(
+                handler, "get_dashboard_version", return_value={"version": 3, "created": "2022-03-14T10:00:00Z"}
+            ),
+            patch.object(handler, "get_dashboard", return_value=DOCUMENT),
+        )
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_unchanged_dashboards_are_skipped(self):
+        """Verify the documents are fetched for a new version only, and the version is recorded."""
+        self.assertIsNotNone(run_incremental_sync())
+        dashboard = Dashboard.objects.get(dashboard_uid="7Wkldj8Q")
+        self.assertEqual(dashboard.grafana_version, 3)
+        self.assertIsNotNone(dashboard.grafana_updated)
+        self.assertEqual(Panel.objects.filter(dashboard=dashboard).count(), 1)
+        self.assertEqual(handler.get_dashboard.call_count, 2)
+
+        self.assertIsNone(run_incremental_sync())
+        self.assertEqual(handler.get_dashboard.call_count, 2)
+
+    def test_unknown_versions_are_left_to_the_next_sync(self):
+        """Verify the view and the job both skip a dashboard whose version could not be fetched."""
+        run_dashboard_sync()
+        with patch.object(handler, "get_dashboard_version", return_value={}):
+            self.assertIsNone(run_incremental_sync())
+            self.assertEqual(run_organization_sync(incremental=True)["skipped"], 1)
+        handler.get_dashboard.assert_not_called()
+        self.assertIsNone(Dashboard.objects.get(dashboard_uid="7Wkldj8Q").grafana_version)
+
+
+class TestFailedListing(TestCase):
+    """Test the syncs when Grafana can not list its dashboards."""
+
+    def setUp(self):
+        """Create a dashboard with a panel that a sync against an empty listing would delete."""
+        self.dashboard = Dashboard.objects.create(
+            dashboard_slug="test-dashboard", dashboard_uid="7Wkldj8Q", friendly_name="Test Dashboard"
+        )
+        Panel.objects.create(dashboard=self.dashboard, command_name="traffic", friendly_name="Traffic", panel_id=1)
+
+    def test_failed_listing_is_not_empty(self):
+        """Verify an open circuit breaker or an error response is told apart from an organization without dashboards."""
+        with patch.object(handler, "_request", side_effect=CircuitOpenError("Grafana is unavailable")):
+            self.assertIsNone(handler.get_dashboards())
+        response = requests.Response()
+        response.status_code = 500
+        with patch.object(handler, "_request", return_value=response):
+            self.assertIsNone(handler.get_dashboards())
+
+    def test_syncs_are_aborted(self):
+        """Verify every sync overwriting Nautobot aborts and keeps the dashboards when the listing failed."""
+        with patch.object(handler, "get_dashboards", return_value=None):
+            for sync in (run_dashboard_sync, run_incremental_sync, run_organization_sync):
+                with self.assertRaises(SyncAbortedError):
+                    sync(overwrite=True)
+        self.assertTrue(Panel.objects.filter(dashboard=self.dashboard).exists())
+
+
+class TestDashboardsSyncView(TestCase):
+    """Test the dashboards Sync button."""
+
+    def setUp(self):
+        """Log a superuser in."""
+        self.client.force_login(get_user_model().objects.create(username="testuser", is_superuser=True))
+        self.url = reverse("plugins:nautobot_plugin_chatops_grafana:dashboard_sync")
+
+    def test_incremental_sync_is_queued(self):
+        """Verify the incremental option queues the organization sync instead of running it in the request."""
+        with patch(
+            "nautobot_plugin_chatops_grafana.views.sync_organization.delay", return_value=MagicMock(id="42")
+        ) as delay, patch.object(handler, "get_dashboards") as get_dashboards:
+            response = self.client.post(self.url, {"confirm": True, "incremental": "true"})
+        self.assertEqual(response.status_code, 302)
+        delay.assert_called_once_with(overwrite=False, incremental=True)
+        get_dashboards.assert_not_called()
+
+    def test_failed_listing_is_reported(self):
+        """Verify the dashboard sync reports a failed listing instead of deleting the dashboards."""
+        Dashboard.objects.create(dashboard_slug="test-dashboard", dashboard_uid="7Wkldj8Q")
+        with patch.object(handler, "get_dashboards", return_value=None):
+            response = self.client.post(self.url, {"confirm": True, "delete": "true"}, follow=True)
+        self.assertIn("could not be listed", str(list(response.context["messages"])[0]))
+        self.assertTrue(Dashboard.objects.filter(dashboard_uid="7Wkldj8Q").exists())
+
+
+class TestBatchedSync(TestCase):
+    """Test the panel sync applying its changes through a BatchWriter."""
+
+    def setUp(self):
+        """Create a dashboard with a panel that is renamed and one that is removed in Grafana."""
+        self.dashboard = Dashboard.objects.create(
+            dashboard_slug="test-dashboard", dashboard_uid="7Wkldj8Q", friendly_name="Test Dashboard"
+        )
+        Panel.objects.create(dashboard=self.dashboard, command_name="cpu", friendly_name="CPU", panel_id=1)
+        Panel.objects.create(dashboard=self.dashboard, command_name="removed", friendly_name="Removed", panel_id=9)
+        panels = [
+            {"id": 2, "type": "graph", "title": "CPU"},
+            {"id": 3, "type": "graph", "title": "Memory"},
+            {"id": 4, "type": "graph", "title": "Disk"},
+        ]
+        patcher = patch.object(handler, "get_panels", return_value=panels)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_writes_are_applied_in_bulk(self):
+        """Verify the created, updated and deleted rows are written and counted."""
+        batch = BatchWriter()
+        self.assertIsNotNone(run_panels_sync(self.dashboard, overwrite=True, batch=batch))
+
+        self.assertEqual(
+            sorted(Panel.objects.filter(dashboard=self.dashboard).values_list("command_name", "panel_id")),
+            [("cpu", 2), ("disk", 4), ("memory", 3)],
+        )
+        self.assertEqual(
+            {key: batch.stats[key] for key in ("created", "updated", "deleted", "flushes")},
+            {"created": 2, "updated": 1, "deleted": 1, "flushes": 1},
+        )
+        self.assertEqual(batch.pending(), 0)
+
+
+class TestManualSync(TestCase):
+    """Test the panel sync of a single dashboard requested from the UI."""
+
+    def setUp(self):
+        """Cache a document of the dashboard older than the one Grafana serves."""
+        self.dashboard = Dashboard.objects.create(
+            dashboard_slug="test-dashboard", dashboard_uid="7Wkldj8Q", friendly_name="Test Dashboard"
+        )
+        documents = DashboardDocumentCache(shared_alias=None, ttl=60)
+        documents.shared.clear()
+        documents.set("7Wkldj8Q", {"dashboard": {"uid": "7Wkldj8Q", "version": 2, "panels": []}, "meta": {}})
+        response = requests.Response()
+        response.status_code = 200
+        response.json = lambda: DOCUMENT
+        patches = (
+            patch.object(handler, "dashboard_documents", documents),
+            patch.object(handler, "_request", return_value=response),
+        )
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_refresh_skips_the_cached_document(self):
+        """Verify the cached document is only used when the sync does not ask for a refresh."""
+        self.assertIsNone(run_panels_sync(self.dashboard))
+        self.assertIsNotNone(run_panels_sync(self.dashboard, refresh=True))
+        self.assertEqual(Panel.objects.filter(dashboard=self.dashboard).count(), 1)
+        self.assertEqual(handler.dashboard_documents.get("7Wkldj8Q")["dashboard"]["version"], 3)
+
+
+class TestGrafanaPanelLoader(TestCase):
+    """Test loading the panels of a Grafana dashboard into DiffSync."""
+
+    def setUp(self):
+        """Create the dashboard the panels belong to."""
+        self.dashboard = Dashboard(dashboard_slug="test-dashboard", dashboard_uid="7Wkldj8Q")
+
+    def test_collapsed_rows_and_shared_titles(self):
+        """Verify the panels of collapsed rows are loaded and shared titles are numbered in dashboard order."""
+        panels = [
+            {"id": 1, "type": "graph", "title": "CPU"},
+            {"id": 2, "type": "graph", "title": "CPU-1"},
+            {
+                "id": 3,
+                "type": "row",
+                "title": "Details",
+                "collapsed": True,
+                "panels": [{"id": 4, "type": "graph", "title": "CPU"}, {"id": 5, "type": "graph", "title": "CPU"}],
+            },
+        ]
+        loaded = {panel.command_name: panel.panel_id for panel in GrafanaPanel(panels, self.dashboard).get_all("panel")}
+        self.assertEqual(loaded, {"cpu": 1, "cpu-1": 2, "cpu-2": 4, "cpu-3": 5})
+
+    def test_synthetic_dashboard(self):
+        """Verify every panel of a large dashboard is loaded under a distinct command."""
+        panels = synthetic_dashboard_panels(1000)
+        self.assertEqual(len(GrafanaPanel(panels, self.dashboard).get_all("panel")), 1000)
+
+
+class TestOrganizationSync(TransactionTestCase):
+    """Test the parallel sync of every dashboard, the pool threads only see committed rows."""
+
+    def setUp(self):
+        """Serve two dashboards, the documents of the second one can not be fetched."""
+        search = [
+            {"id": 7, "uid": "7Wkldj8Q", "uri": "db/test-dashboard", "title": "Test Dashboard"},
+            {"id": 8, "uid": "broken", "uri": "db/broken-dashboard", "title": "Broken Dashboard"},
+        ]
+
+        def get_dashboard(dashboard_uid, version=None, refresh=False):
+            if dashboard_uid == "broken":
+                raise ValueError("Unexpected response")
+            return DOCUMENT
+
+        patches = (
+            patch.object(handler, "get_dashboards", return_value=search),
+            patch.object(handler, "get_dashboard_version", return_value={"version": 3}),
+            patch.object(handler, "get_dashboard", side_effect=get_dashboard),
+        )
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_failures_are_isolated(self):
+        """Verify a dashboard failing to sync is reported without stopping the others."""
+        report = run_organization_sync(concurrency=2)
+
+        self.assertEqual(report["dashboards"], 2)
+        self.assertEqual(report["synced"], 1)
+        self.assertEqual(report["failed"], {"broken-dashboard": "Unexpected response"})
+        dashboard = Dashboard.objects.get(dashboard_uid="7Wkldj8Q")
+        self.assertEqual(Panel.objects.filter(dashboard=dashboard).count(), 1)
+        self.assertEqual(dashboard.grafana_version, 3)
+
+        report = run_organization_sync(incremental=True)
+        self.assertEqual((report["synced"], report["skipped"], len(report["failed"])), (0, 1, 1))
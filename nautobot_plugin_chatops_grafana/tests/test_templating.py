@@ -0,0 +1,48 @@
+"""Test cases for the sandboxed rendering of the PanelVariable templates."""
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from jinja2.exceptions import SecurityError
+from nautobot.dcim.models import Site
+
+from nautobot_plugin_chatops_grafana.models import PanelVariable
+from nautobot_plugin_chatops_grafana.templating import compile_template, render_value
+
+
+class TestRenderValue(TestCase):
+    """Test the rendering of the variable values."""
+
+    def test_templates_are_rendered_and_compiled_once(self):
+        """Verify templates are rendered with the context, compiled once, and other values returned untouched."""
+        compile_template.cache_clear()
+        for slug in ("ams01", "fra01"):
+            self.assertEqual(render_value("{{ site.slug | upper }}", {"site": {"slug": slug}}), slug.upper())
+        self.assertEqual(compile_template.cache_info().misses, 1)
+        self.assertEqual(render_value("ams01", {}), "ams01")
+        self.assertEqual(render_value(42, {}), 42)
+        self.assertEqual(compile_template.cache_info().currsize, 1)
+
+    def test_unsafe_attributes_and_methods_are_refused(self):
+        """Verify templates can neither reach the internals of an object nor call methods altering data."""
+        site = Site(name="Amsterdam 01", slug="ams01")
+        with self.assertRaises(SecurityError):
+            render_value("{{ site.__class__.__mro__ }}", {"site": site})
+        with self.assertRaises(SecurityError):
+            render_value("{{ site.delete() }}", {"site": site})
+        self.assertEqual(render_value("{{ site.name }}", {"site": site}), "Amsterdam 01")
+
+
+class TestPanelVariableClean(TestCase):
+    """Test the validation of the variable templates when the variable is saved."""
+
+    def test_invalid_template_is_refused(self):
+        """Verify a template with a syntax error is reported on the value field."""
+        variable = PanelVariable(name="site", query="Site", modelattr="slug", value="{{ site.slug ")
+        with self.assertRaises(ValidationError) as error:
+            variable.clean()
+        self.assertIn("value", error.exception.message_dict)
+        self.assertIn("Invalid Jinja2 template", error.exception.message_dict["value"][0])
+
+    def test_valid_template_is_accepted(self):
+        """Verify valid templates and plain values pass the validation."""
+        for value in ("{{ site.name }}", "{% if site %}{{ site.slug }}{% endif %}", "ams01", ""):
+            PanelVariable(name="site", query="Site", modelattr="slug", value=value).clean()
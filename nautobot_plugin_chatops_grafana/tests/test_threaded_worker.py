@@ -0,0 +1,95 @@
+"""Test cases for the threaded RQ worker."""
+import threading
+import time
+from unittest.mock import Mock
+
+import django_rq
+from django.test import TestCase
+from rq.timeouts import JobTimeoutException
+
+from nautobot_plugin_chatops_grafana.exceptions import WorkerShutdownError
+from nautobot_plugin_chatops_grafana.threaded_worker import ThreadDeathPenalty, ThreadPoolWorker
+
+
+def run_with_penalty(timeout: float, duration: float, results: dict):
+    """Busy the thread for `duration` seconds under a death penalty of `timeout` seconds."""
+    try:
+        with ThreadDeathPenalty(timeout):
+            end = time.monotonic() + duration
+            while time.monotonic() < end:
+                time.sleep(0.01)
+        results[duration] = "finished"
+    except JobTimeoutException:
+        results[duration] = "timed out"
+
+
+class TestThreadDeathPenalty(TestCase):
+    """Test the job timeout of the jobs running on the pool threads."""
+
+    def test_only_the_late_job_times_out(self):
+        """Verify the timeout is raised in the thread of the late job only."""
+        results = {}
+        threads = [threading.Thread(target=run_with_penalty, args=(0.2, duration, results)) for duration in (0.05, 1.0)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, {0.05: "finished", 1.0: "timed out"})
+
+    def test_no_timeout(self):
+        """Verify a timeout of -1 never fires."""
+        results = {}
+        run_with_penalty(-1, 0.05, results)
+        self.assertEqual(results, {0.05: "finished"})
+
+
+class TestThreadPoolWorker(TestCase):
+    """Test the bookkeeping and the shutdown of the threaded worker."""
+
+    def setUp(self):
+        """Create a worker of two threads, it is never started."""
+        queue = django_rq.get_queue()
+        self.worker = ThreadPoolWorker([queue], connection=queue.connection, max_threads=2)
+        self.addCleanup(self.worker.executor.shutdown, wait=False)
+
+    def run_job(self, job_id: str, duration: float) -> str:
+        """Run a job on the calling thread of the pool, like perform_job records it."""
+        self.worker.set_current_job_id(job_id)
+        try:
+            end = time.monotonic() + duration
+            while time.monotonic() < end:
+                time.sleep(0.01)
+            return "finished"
+        except WorkerShutdownError:
+            return "aborted"
+        finally:
+            self.worker.set_current_job_id(None)
+
+    def test_current_job_is_the_last_started(self):
+        """Verify the worker record names a running job until every job finished."""
+        first = self.worker.executor.submit(self.run_job, "first", 0.3)
+        time.sleep(0.1)
+        second = self.worker.executor.submit(self.run_job, "second", 0.05)
+        time.sleep(0.02)
+        self.assertEqual(self.worker.get_current_job_id(), "second")
+        second.result()
+        self.assertEqual(self.worker.get_current_job_id(), "first")
+        first.result()
+        self.assertIsNone(self.worker.get_current_job_id())
+
+    def test_cold_shutdown_aborts_running_jobs(self):
+        """Verify a cold shutdown fails the running jobs instead of waiting for them."""
+        future = self.worker.executor.submit(self.run_job, "slow", 10)
+        time.sleep(0.1)
+        start = time.monotonic()
+        with self.assertRaises(SystemExit):
+            self.worker.request_force_stop(None, None)
+        self.worker.register_death()
+        self.assertEqual(future.result(timeout=1), "aborted")
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_stats_are_reported_at_shutdown(self):
+        """Verify the statistics of the process are reported once more when the worker stops."""
+        self.worker.report_stats = Mock()
+        self.worker.register_death()
+        self.worker.report_stats.assert_called_once_with()
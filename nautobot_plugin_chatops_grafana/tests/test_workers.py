@@ -1,13 +1,39 @@
 """Test cases for the Nautobot workers module."""
+import io
+from unittest.mock import MagicMock, patch
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from nautobot.dcim.models import Site
+from PIL import Image
 
 from prybar import dynamic_entrypoint
 
+from nautobot_chatops.utils import enqueue_task
 from nautobot_chatops.workers import parse_command_string, get_commands_registry, add_subcommand
 from nautobot_chatops.tests.workers.dynamic_commands import dynamic_command, dynamic_subcommand
 import nautobot_chatops.workers
-from nautobot_plugin_chatops_grafana.worker import initialize_subcommands
-from nautobot_plugin_chatops_grafana.models import Panel, Dashboard
+from nautobot_plugin_chatops_grafana.exceptions import DefaultArgsError, MultiValueError
+from nautobot_plugin_chatops_grafana.grafana import handler, parse_timespan
+from nautobot_plugin_chatops_grafana.grafana_async import async_handler
+from nautobot_plugin_chatops_grafana.helpers import get_model_info, warn_unindexed
+from nautobot_plugin_chatops_grafana.worker import (
+    chat_expand_multi_value_args,
+    chat_get_dashboard,
+    chat_parse_args,
+    chat_validate_default_args,
+    chat_validate_nautobot_args,
+    compile_arg_parser,
+    grafana,
+    get_nautobot_objects,
+    initialize_subcommands,
+    multi_value_filter,
+    projected_fields,
+    required_fields,
+)
+from nautobot_plugin_chatops_grafana.models import Panel, PanelVariable, Dashboard
+from nautobot_plugin_chatops_grafana.registry import subcommand_registry
 
 
 class TestGrafana(TestCase):
@@ -161,3 +187,308 @@ class TestGrafana(TestCase):
             self.assertIn("worker", registry["grafana"]["subcommands"]["get-test-command-1"])
             self.assertIn("timespan", str(registry["grafana"]["subcommands"]["get-test-command-1"]["params"]))
             self.assertTrue(callable(registry["grafana"]["subcommands"]["get-test-command-1"]["worker"]))
+
+    def test_grafana_subcommands_rebuilt_on_change(self):
+        """Verify the subcommands are only rebuilt after a change and subcommands of inactive panels are removed."""
+        with dynamic_entrypoint("nautobot.workers", name="grafana", module="nautobot_plugin_chatops_grafana.worker"):
+            registry = get_commands_registry()
+
+            subcommand_registry.bump()
+            self.assertTrue(subcommand_registry.ensure(initialize_subcommands))
+            self.assertFalse(subcommand_registry.ensure(initialize_subcommands))
+            self.assertIn("get-test-command-1", registry["grafana"]["subcommands"])
+
+            # QuerySet.update does not send signals, bump the version like the post_save handler would.
+            Panel.objects.filter(command_name="test-command-1").update(active=False)
+            subcommand_registry.bump()
+            self.assertTrue(subcommand_registry.ensure(initialize_subcommands))
+            self.assertNotIn("get-test-command-1", registry["grafana"]["subcommands"])
+            self.assertIn("get-test-command-2", registry["grafana"]["subcommands"])
+
+    def test_panel_spec_lookup_without_queries(self):
+        """Verify an active panel and its dashboard are looked up without hitting the database."""
+        subcommand_registry.bump()
+        subcommand_registry.ensure(initialize_subcommands)
+        with self.assertNumQueries(0):
+            spec = subcommand_registry.get_spec("test-command-1")
+            self.assertEqual(spec.dashboard_slug, "test-dashboard")
+            self.assertEqual(spec.panel_vars(), [])
+
+    def test_chat_parse_args_reuses_the_compiled_parser(self):
+        """Verify the parser is compiled once per variable definitions and takes the current defaults."""
+        compile_arg_parser.cache_clear()
+        panel_vars = [
+            PanelVariable(name="site", response="ams01", includeincmd=True),
+            PanelVariable(name="role", response="edge", includeincmd=False),
+        ]
+        parsed_args = chat_parse_args(panel_vars, "fra01", "width=800")
+        self.assertEqual(parsed_args["site"], "fra01")
+        self.assertEqual(parsed_args["role"], "edge")
+        self.assertEqual(parsed_args["width"], "800")
+        self.assertEqual(parsed_args["height"], handler.height)
+
+        self.assertEqual(chat_parse_args(panel_vars)["site"], "ams01")
+        self.assertEqual(compile_arg_parser.cache_info().misses, 1)
+
+        panel_vars[1].includeincmd = True
+        self.assertEqual(chat_parse_args(panel_vars, "fra01", "core")["role"], "core")
+        self.assertEqual(compile_arg_parser.cache_info().misses, 2)
+
+    def test_query_models_resolved_from_the_model_registry(self):
+        """Verify query variables resolve their model from the registry and flag unindexed attributes."""
+        site = get_model_info("Site")
+        self.assertIs(site.model, Site)
+        self.assertTrue(site.is_indexed("slug"))
+        self.assertFalse(site.is_indexed("description"))
+        self.assertIsNone(get_model_info("NotAModel"))
+
+        variable = PanelVariable(name="site", query="Site", modelattr="slug")
+        self.assertEqual(get_nautobot_objects(variable).model, Site)
+
+        warn_unindexed.cache_clear()
+        with self.assertLogs("nautobot.plugin.grafana", level="WARNING"):
+            self.assertTrue(warn_unindexed("Site", "description"))
+        self.assertFalse(warn_unindexed("Site", "slug"))
+
+    def test_default_args_build_a_request_context(self):
+        """Verify the default arguments build an immutable context and leave the shared handler untouched."""
+        parsed_args = chat_parse_args([], "width=800", "timespan=P1D", "theme=dark")
+        context = chat_validate_default_args(parsed_args, subcommand="get-test-command-1")
+        self.assertEqual(context.subcommand, "get-test-command-1")
+        self.assertEqual((context.width, context.theme), (800, "dark"))
+        self.assertEqual(context.timespan.days, 1)
+        self.assertEqual(int(context.time_range()["to"]) - int(context.time_range()["from"]), 86400000)
+        self.assertEqual(handler.width, handler.config.default_width)
+        with self.assertRaises(TypeError):
+            context.width = 100
+
+        parse_timespan.cache_clear()
+        for _ in range(3):
+            chat_validate_default_args(chat_parse_args([], "timespan=PT6H"))
+        self.assertEqual(parse_timespan.cache_info().misses, 1)
+
+        with self.assertRaises(DefaultArgsError):
+            chat_validate_default_args(chat_parse_args([], "width=wide"))
+        with self.assertRaises(DefaultArgsError):
+            chat_validate_default_args(chat_parse_args([], "timespan=yesterday"))
+
+
+class TestNautobotArgs(TestCase):
+    """Test the resolution of the query variables of a panel."""
+
+    def setUp(self):
+        """Create the sites the variables select from."""
+        Site.objects.create(name="Amsterdam 01", slug="ams01", description="Edge")
+        Site.objects.create(name="Frankfurt 01", slug="fra01", description="Core")
+        dashboard = Dashboard.objects.create(
+            dashboard_slug="test-dashboard", dashboard_uid="7Wkldj8Q", friendly_name="Test Dashboard"
+        )
+        self.panel = Panel.objects.create(
+            dashboard=dashboard, command_name="traffic", friendly_name="Traffic", panel_id=1, active=True
+        )
+
+    def test_required_and_projected_fields(self):
+        """Verify the fields read by the templates are projected on the concrete fields of the model."""
+        site = PanelVariable(name="site", query="Site", modelattr="slug", value="{{ site.name }}")
+        label = PanelVariable(name="label", value="{{ site.slug }}-{{ site.description }}")
+        self.assertEqual(required_fields(site, [site, label]), {"name", "slug", "description"})
+        self.assertEqual(
+            projected_fields(Site, {"name", "slug", "not_a_field", "status_id"}), ["name", "slug", "status"]
+        )
+        self.assertEqual(projected_fields(Site, None), [])
+
+        self.assertIsNone(required_fields(site, [site, PanelVariable(name="raw", value="{{ site }}")]))
+        self.assertIsNone(required_fields(PanelVariable(name="site", modelattr="slug", value=""), []))
+
+    def test_resolved_variables_are_skipped(self):
+        """Verify the object a variable resolved earlier is not taken for a template."""
+        region = PanelVariable(name="region", value={"name": "Europe"})
+        site = PanelVariable(name="site", query="Site", modelattr="slug", value="{{ site.name }}")
+        self.assertEqual(required_fields(site, [region, site]), {"name", "slug"})
+
+    def test_bounded_and_projected_query(self):
+        """Verify a single bounded query loads the fields needed, and the filter of the variable is left as is."""
+        site = PanelVariable(
+            name="site", query="Site", modelattr="slug", value="{{ site.name }}", filter={"slug__endswith": "01"}
+        )
+        owner = PanelVariable(name="owner", value="")
+        with CaptureQueriesContext(connection) as queries:
+            chat_validate_nautobot_args(
+                MagicMock(), self.panel, [site, owner], {"site": "ams01", "owner": "noc"}, "grafana get-traffic"
+            )
+        self.assertEqual(site.value, "Amsterdam 01")
+        self.assertEqual(owner.value, "noc")
+        self.assertEqual(site.filter, {"slug__endswith": "01"})
+        [query] = [query["sql"] for query in queries.captured_queries if "dcim_site" in query["sql"]]
+        self.assertIn("LIMIT 2", query)
+        self.assertNotIn("description", query)
+
+
+class TestMultiValueArgs(TestCase):
+    """Test the expansion of comma separated and glob arguments into one render per combination."""
+
+    def setUp(self):
+        """Create the sites the variables select from."""
+        for slug in ("ams01", "ams02", "fra01", "lon01"):
+            Site.objects.create(name=slug.upper(), slug=slug)
+        self.site = PanelVariable(name="site", query="Site", modelattr="slug")
+        self.peer = PanelVariable(name="peer", query="Site", modelattr="slug", filter={"slug__startswith": "fra"})
+
+    def slugs(self, patterns):
+        """Return the slugs of the sites matching the patterns."""
+        return sorted(Site.objects.filter(multi_value_filter("slug", patterns)).values_list("slug", flat=True))
+
+    def test_multi_value_filter(self):
+        """Verify exact values, prefixes and other globs are matched by a single filter."""
+        self.assertEqual(self.slugs(["ams01", "lon01"]), ["ams01", "lon01"])
+        self.assertEqual(self.slugs(["ams*"]), ["ams01", "ams02"])
+        self.assertEqual(self.slugs(["?ra0?", "lon01"]), ["fra01", "lon01"])
+        self.assertEqual(self.slugs(["*01"]), ["ams01", "fra01", "lon01"])
+
+    def test_one_combination_per_resolved_object(self):
+        """Verify the cartesian product of the objects selected for each variable, within the variable's filter."""
+        combinations = chat_expand_multi_value_args([self.site, self.peer], {"site": "ams*", "peer": "*"})
+        self.assertEqual(
+            [(combination["site"].slug, combination["peer"].slug) for combination in combinations],
+            [("ams01", "fra01"), ("ams02", "fra01")],
+        )
+        self.assertEqual(chat_expand_multi_value_args([self.site], {"site": "ams01"}), [])
+
+    def test_combination_limit(self):
+        """Verify requests needing more renders than allowed, or matching nothing, are refused."""
+        with patch.object(handler.config, "fanout_max_renders", 3):
+            with self.assertRaises(MultiValueError):
+                chat_expand_multi_value_args([self.site, self.peer], {"site": "*", "peer": "fra*"})
+            self.assertEqual(len(chat_expand_multi_value_args([self.site], {"site": "ams*,fra01"})), 3)
+        with self.assertRaises(MultiValueError):
+            chat_expand_multi_value_args([self.site], {"site": "par*"})
+
+
+class TestGetDashboard(TestCase):
+    """Test the rendering of a whole dashboard into a single image."""
+
+    def setUp(self):
+        """Create a dashboard of two active panels side by side in a row, and an inactive one."""
+        dashboard = Dashboard.objects.create(
+            dashboard_slug="test-dashboard", dashboard_uid="7Wkldj8Q", friendly_name="Test Dashboard"
+        )
+        Dashboard.objects.create(dashboard_slug="empty-dashboard", dashboard_uid="Xu7iw2Pq")
+        for panel_id, active in ((1, True), (2, True), (3, False)):
+            Panel.objects.create(
+                dashboard=dashboard,
+                command_name=f"panel-{panel_id}",
+                friendly_name=f"Panel {panel_id}",
+                panel_id=panel_id,
+                active=active,
+            )
+        self.document = {
+            "dashboard": {
+                "panels": [
+                    {"id": 10, "type": "row", "gridPos": {"x": 0, "y": 0, "w": 24, "h": 1}, "panels": []},
+                    {"id": 1, "gridPos": {"x": 0, "y": 1, "w": 12, "h": 8}},
+                    {"id": 3, "gridPos": {"x": 0, "y": 9, "w": 24, "h": 8}},
+                    {"id": 20, "type": "row", "panels": [{"id": 2, "gridPos": {"x": 12, "y": 1, "w": 12, "h": 8}}]},
+                ]
+            }
+        }
+        self.requests = []
+        self.dispatcher = MagicMock()
+        patches = (
+            patch.object(handler.config, "dashboard_snapshot_width", 240),
+            patch.object(handler, "get_dashboard", return_value=self.document),
+        )
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def render(self, images):
+        """Render the dashboard, Grafana answering with `images` in the order of the panels requested."""
+
+        async def get_png_many(requests, concurrency):
+            self.requests.extend(
+                (panel.command_name, kwargs["width"], kwargs["height"], concurrency) for panel, _, kwargs in requests
+            )
+            return images
+
+        with patch.object(async_handler, "get_png_many", get_png_many), patch(
+            "nautobot_plugin_chatops_grafana.worker.send_png"
+        ) as send_png:
+            result = chat_get_dashboard(self.dispatcher, "test-dashboard")
+        return result, send_png
+
+    def test_panels_are_rendered_at_the_size_of_their_tile(self):
+        """Verify each active panel is rendered at its tile size and the renders are stitched like the dashboard."""
+        red = io.BytesIO()
+        Image.new("RGB", (120, 296), (255, 0, 0)).save(red, format="PNG")
+        result, send_png = self.render([red.getvalue(), None])
+        self.assertTrue(result)
+        concurrency = handler.config.render_concurrency
+        self.assertEqual(
+            sorted(self.requests), [("panel-1", 120, 296, concurrency), ("panel-2", 120, 296, concurrency)]
+        )
+        self.dispatcher.send_markdown.assert_called_with("Unable to render the panels: panel-2", ephemeral=True)
+        snapshot = send_png.call_args[0][1]
+        with Image.open(io.BytesIO(snapshot)) as image:
+            self.assertEqual(image.size, (240, 296))
+        self.assertEqual(send_png.call_args[1]["name"], "get-dashboard-test-dashboard")
+
+    def test_failed_renders_are_reported(self):
+        """Verify nothing is uploaded when no panel could be rendered."""
+        result, send_png = self.render([None, None])
+        self.assertFalse(result)
+        self.dispatcher.send_error.assert_called_once_with("An error occurred while accessing Grafana")
+        send_png.assert_not_called()
+
+    def test_dashboard_menu_and_unknown_dashboard(self):
+        """Verify only dashboards with active panels are offered, and unknown dashboards are reported."""
+        self.assertFalse(chat_get_dashboard(self.dispatcher))
+        choices = self.dispatcher.prompt_from_menu.call_args[0][2]
+        self.assertEqual(choices, [("Test Dashboard", "test-dashboard")])
+        self.assertFalse(chat_get_dashboard(self.dispatcher, "empty-dashboard"))
+        self.dispatcher.send_error.assert_called_once_with(
+            "Dashboard empty-dashboard Not Found or it has no active panels!"
+        )
+
+
+class TestChatJobQueue(TestCase):
+    """Test where the `/grafana` chat commands are run."""
+
+    def setUp(self):
+        """Point `worker_queue` at a dedicated queue."""
+        patcher = patch.object(handler.config, "worker_queue", "grafana")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.kwargs = {"params": ["traffic"], "dispatcher_class": MagicMock, "context": {"user_id": "U0000000"}}
+
+    def test_chat_commands_ignore_the_worker_queue(self):
+        """Verify nautobot-chatops hands the chat commands to a Celery worker rather than to `worker_queue`."""
+        with patch("nautobot_chatops.utils.celery_worker_task") as celery_task, patch(
+            "nautobot_plugin_chatops_grafana.worker.get_queue"
+        ) as get_queue:
+            enqueue_task(command="grafana", subcommand="get-traffic", function=grafana, **self.kwargs)
+        celery_task.delay.assert_called_once()
+        get_queue.assert_not_called()
+
+    def test_jobs_are_forwarded_to_the_worker_queue(self):
+        """Verify a job started outside of `worker_queue` is enqueued on it instead of rendering."""
+        with patch("nautobot_plugin_chatops_grafana.worker.get_current_job", return_value=MagicMock(origin="default")):
+            with patch("nautobot_plugin_chatops_grafana.worker.get_queue") as get_queue, patch(
+                "nautobot_plugin_chatops_grafana.worker.handle_subcommands"
+            ) as handle:
+                self.assertIsNone(grafana("get-traffic", **self.kwargs))
+        get_queue.assert_called_once_with("grafana")
+        get_queue.return_value.enqueue_call.assert_called_once_with(grafana, args=("get-traffic",), kwargs=self.kwargs)
+        handle.assert_not_called()
+
+    def test_jobs_of_the_worker_queue_are_run(self):
+        """Verify the forwarded job, and every job when `worker_queue` is `default`, renders in place."""
+        for origin, worker_queue in (("grafana", "grafana"), (None, "default")):
+            current_job = MagicMock(origin=origin) if origin else None
+            with patch.object(handler.config, "worker_queue", worker_queue), patch(
+                "nautobot_plugin_chatops_grafana.worker.get_current_job", return_value=current_job
+            ), patch("nautobot_plugin_chatops_grafana.worker.get_queue") as get_queue, patch(
+                "nautobot_plugin_chatops_grafana.worker.handle_subcommands", return_value="ok"
+            ) as handle:
+                self.assertEqual(grafana("get-traffic", **self.kwargs), "ok")
+            get_queue.assert_not_called()
+            handle.assert_called_once_with("grafana", "get-traffic", **self.kwargs)
@@ -0,0 +1,207 @@
+"""RQ worker running many `grafana` jobs concurrently on a bounded thread pool inside one warm process."""
+import contextvars
+import ctypes
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from django.db import close_old_connections
+from rq.timeouts import BaseDeathPenalty, JobTimeoutException
+from rq.worker import SimpleWorker, StopRequested, WorkerStatus
+
+from nautobot_plugin_chatops_grafana.exceptions import WorkerShutdownError
+
+
+def raise_in_thread(thread_id: int, exception):
+    """Raise `exception` asynchronously in a thread, None clears an exception not delivered yet."""
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(
+        ctypes.c_ulong(thread_id), None if exception is None else ctypes.py_object(exception)
+    )
+
+
+class ThreadDeathPenalty(BaseDeathPenalty):
+    """Job timeout for jobs running on a pool thread, where the SIGALRM of the forking worker can not be used.
+
+    The timeout exception is raised asynchronously in the thread running the job, it is delivered once the
+    thread runs Python code again, so a blocking request is interrupted by its own timeout first.
+    """
+
+    def __init__(self, timeout, exception=JobTimeoutException, **kwargs):
+        """Initialize the penalty of the job running on the current thread."""
+        super().__init__(timeout, exception, **kwargs)
+        self._thread_id = threading.get_ident()
+        self._lock = threading.Lock()
+        self._timer = None
+        self._fired = False
+
+    def _raise(self):
+        with self._lock:
+            if self._timer is None:
+                return
+            self._fired = True
+            raise_in_thread(self._thread_id, self._exception)
+
+    def setup_death_penalty(self):
+        """Start the timer, a timeout of -1 means the job never times out."""
+        if self._timeout <= 0:
+            return
+        self._timer = threading.Timer(self._timeout, self._raise)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def cancel_death_penalty(self):
+        """Stop the timer, discarding the timeout exception when it fired but was not delivered yet."""
+        with self._lock:
+            if self._timer is None:
+                return
+            self._timer.cancel()
+            self._timer = None
+            if self._fired:
+                raise_in_thread(self._thread_id, None)
+
+
+class ThreadPoolWorker(SimpleWorker):
+    """Worker running up to `max_threads` jobs at once on a thread pool instead of forking a work horse per job.
+
+    Jobs of this plugin spend nearly all their time waiting on the Grafana renderer, so a single warm
+    process can serve many of them. A thread is reserved before a job is dequeued, the worker never holds
+    more jobs than it can run. Every job runs in a fresh `contextvars.Context` and releases its database
+    connection when it is done, so nothing of one request is seen by the next one on the same thread.
+
+    A warm shutdown stops taking jobs and waits for the running ones, bounded by their job timeout. A cold
+    shutdown raises WorkerShutdownError in the running jobs, which fail once their thread runs Python code
+    again, and exits without waiting for them.
+
+    The worker record in Redis has a single current job: it names the job started last among the running ones,
+    and the worker is busy while any job runs. The current job working time is the one of that job.
+
+    `report_stats` is called every `stats_interval` seconds while jobs are taken, and once more at shutdown,
+    to log the counters this long lived process accumulates.
+    """
+
+    death_penalty_class = ThreadDeathPenalty
+
+    def __init__(
+        self,
+        *args,
+        max_threads: int = 16,
+        report_stats: Callable[[], None] = None,
+        stats_interval: float = 300,
+        **kwargs,
+    ):
+        """Initialize the worker.
+
+        Args:
+            *args: Arguments of rq.Worker, starting with the queues to listen on.
+            max_threads (int): Number of jobs run at once.
+            report_stats (Callable): Called to log the statistics of the process.
+            stats_interval (float): Seconds between two reports, 0 only reports at shutdown.
+            **kwargs: Keyword arguments of rq.Worker.
+        """
+        super().__init__(*args, **kwargs)
+        self.report_stats = report_stats
+        self.stats_interval = stats_interval
+        self._stats_reported = time.monotonic()
+        self.max_threads = max(max_threads, 1)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_threads, thread_name_prefix="grafana-job")
+        self._slots = threading.BoundedSemaphore(self.max_threads)
+        self._waiting = False
+        self._force_stop = False
+        # Id of the job running on each pool thread, in the order they started, and their futures.
+        self._running = {}
+        self._futures = set()
+        self._jobs_lock = threading.Lock()
+
+    def dequeue_job_and_maintain_ttl(self, timeout):
+        """Wait for a free thread, then for a job, keeping the worker alive while every thread is busy."""
+        if self.report_stats and self.stats_interval and time.monotonic() - self._stats_reported >= self.stats_interval:
+            self._stats_reported = time.monotonic()
+            self.report_stats()
+        self._waiting = True
+        try:
+            while not self._slots.acquire(timeout=self.job_monitoring_interval):
+                self.heartbeat()
+            try:
+                result = super().dequeue_job_and_maintain_ttl(timeout)
+            except BaseException:
+                self._slots.release()
+                raise
+            if result is None:
+                self._slots.release()
+            return result
+        finally:
+            self._waiting = False
+
+    def execute_job(self, job, queue):
+        """Run the job on the pool, with the thread reserved when it was dequeued."""
+        future = self.executor.submit(self.perform_isolated_job, job, queue)
+        with self._jobs_lock:
+            self._futures.add(future)
+        future.add_done_callback(self._job_done)
+
+    def _job_done(self, future):
+        with self._jobs_lock:
+            self._futures.discard(future)
+        self._slots.release()
+
+    def perform_isolated_job(self, job, queue):
+        """Perform the job in its own context, with the database connection of the thread closed around it."""
+        close_old_connections()
+        try:
+            return contextvars.Context().run(self.perform_job, job, queue)
+        finally:
+            close_old_connections()
+
+    def set_current_job_id(self, job_id, pipeline=None):
+        """Track the job of the calling pool thread, the worker record names the job started last."""
+        with self._jobs_lock:
+            if job_id is None:
+                self._running.pop(threading.get_ident(), None)
+            else:
+                self._running[threading.get_ident()] = job_id
+            running = list(self._running.values())
+        super().set_current_job_id(running[-1] if running else None, pipeline=pipeline)
+        if not running:
+            super().set_state(WorkerStatus.IDLE, pipeline=pipeline)
+
+    def set_state(self, state, pipeline=None):
+        """Keep the worker busy while any job runs, it is set idle whenever it waits for a job."""
+        if state == WorkerStatus.IDLE and self._running:
+            state = WorkerStatus.BUSY
+        super().set_state(state, pipeline=pipeline)
+
+    def request_stop(self, signum, frame):
+        """Stop taking jobs, the jobs running on the pool finish before the worker exits (warm shutdown)."""
+        signal.signal(signal.SIGINT, self.request_force_stop)
+        signal.signal(signal.SIGTERM, self.request_force_stop)
+        self._stop_requested = True
+        self.set_shutdown_requested_date()
+        self.log.info("Worker %s: warm shut down requested, press Ctrl+C again for a cold shutdown.", self.key)
+        if self._waiting:
+            # Nothing was dequeued yet that would be lost, stop waiting for work right away.
+            raise StopRequested()
+
+    def request_force_stop(self, signum, frame):
+        """Abort the running jobs and exit (cold shutdown)."""
+        self.log.warning("Worker %s: cold shut down, aborting the running jobs", self.key)
+        self._force_stop = True
+        with self._jobs_lock:
+            for thread_id in self._running:
+                raise_in_thread(thread_id, WorkerShutdownError)
+        raise SystemExit()
+
+    def register_death(self):
+        """Unregister the worker, once the running jobs finished unless it is a cold shutdown."""
+        if self._force_stop:
+            with self._jobs_lock:
+                for future in self._futures:
+                    future.cancel()
+            self.executor.shutdown(wait=False)
+        else:
+            self.log.info("Worker %s: waiting for the running jobs to finish", self.key)
+            self.executor.shutdown(wait=True)
+        if self.report_stats:
+            self.report_stats()
+        super().register_death()
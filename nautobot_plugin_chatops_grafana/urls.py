@@ -8,6 +8,7 @@ from nautobot_plugin_chatops_grafana.views import (
     DashboardsDelete,
     DashboardsEdit,
     DashboardsSync,
+    DashboardsSyncAll,
     DashboardsBulkImportView,
     DashboardsBulkDeleteView,
     DashboardBulkEditView,
@@ -40,6 +41,7 @@ urlpatterns = [
     ),
     path("dashboards/add/", DashboardsCreate.as_view(), name="dashboard_add"),
     path("dashboards/sync/", DashboardsSync.as_view(), name="dashboard_sync"),
+    path("dashboards/sync-all/", DashboardsSyncAll.as_view(), name="dashboard_sync_all"),
     path("dashboards/<uuid:pk>/edit/", DashboardsEdit.as_view(), name="dashboard_edit"),
     path("dashboards/edit/", DashboardBulkEditView.as_view(), name="dashboard_bulk_edit"),
     path("dashboards/<uuid:pk>/delete/", DashboardsDelete.as_view(), name="dashboard_delete"),
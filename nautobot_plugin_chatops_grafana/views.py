@@ -16,9 +16,15 @@ from nautobot.core.views.generic import (
     BulkEditView,
 )
 from nautobot.utilities.forms import ConfirmationForm
-from nautobot_plugin_chatops_grafana.diffsync.sync import run_dashboard_sync, run_panels_sync, run_variables_sync
+from nautobot_plugin_chatops_grafana.diffsync.sync import (
+    run_dashboard_sync,
+    run_panels_sync,
+    run_variables_sync,
+    sync_organization,
+)
 from nautobot_plugin_chatops_grafana.tables import PanelViewTable, DashboardViewTable, PanelVariableViewTable
 from nautobot_plugin_chatops_grafana.models import Panel, Dashboard, PanelVariable
+from nautobot_plugin_chatops_grafana.exceptions import SyncAbortedError
 from nautobot_plugin_chatops_grafana.grafana import handler
 from nautobot_plugin_chatops_grafana.filters import DashboardFilter, PanelFilter, VariableFilter
 from nautobot_plugin_chatops_grafana.forms import (
@@ -100,7 +106,19 @@ class DashboardsSync(PermissionRequiredMixin, ObjectDeleteView):
             messages.error(request, "Form validation failed.")
 
         else:
-            sync_data = run_dashboard_sync(request.POST.get("delete") == "true")
+            overwrite = request.POST.get("delete") == "true"
+            if request.POST.get("incremental") == "true":
+                # Fetching the version of every dashboard and syncing the changed ones is too slow for a request.
+                sync_job = sync_organization.delay(overwrite=overwrite, incremental=True)
+                messages.success(
+                    request, f"Incremental synchronization of Grafana Dashboards queued as job {sync_job.id}."
+                )
+                return redirect(reverse("plugins:nautobot_plugin_chatops_grafana:dashboards"))
+            try:
+                sync_data = run_dashboard_sync(overwrite)
+            except SyncAbortedError as exc:
+                messages.error(request, str(exc))
+                return redirect(reverse("plugins:nautobot_plugin_chatops_grafana:dashboards"))
             if not sync_data:
                 messages.info(request, "No diffs found for the Grafana Dashboards!")
             else:
@@ -109,6 +127,41 @@ class DashboardsSync(PermissionRequiredMixin, ObjectDeleteView):
         return redirect(reverse("plugins:nautobot_plugin_chatops_grafana:dashboards"))
 
 
+class DashboardsSyncAll(PermissionRequiredMixin, ObjectDeleteView):
+    """View for queueing the synchronization of every Grafana Dashboard with its Panels and Variables."""
+
+    permission_required = "nautobot_plugin_chatops_grafana.dashboard_sync"
+    default_return_url = "plugins:nautobot_plugin_chatops_grafana:dashboards"
+
+    def get(self, request, **kwargs):
+        """Get request for the Dashboard Sync All view."""
+        return render(
+            request,
+            "nautobot_plugin_chatops_grafana/sync_all_confirmation.html",
+            {
+                "form": ConfirmationForm(initial=request.GET),
+                "grafana_url": handler.config.grafana_url,
+                "return_url": reverse("plugins:nautobot_plugin_chatops_grafana:dashboards"),
+            },
+        )
+
+    def post(self, request, **kwargs):
+        """Post request for the Dashboard Sync All view."""
+        form = ConfirmationForm(request.POST)
+
+        if not form.is_valid():
+            messages.error(request, "Form validation failed.")
+
+        else:
+            sync_job = sync_organization.delay(
+                overwrite=request.POST.get("delete") == "true",
+                incremental=request.POST.get("incremental") == "true",
+            )
+            messages.success(request, f"Synchronization of all Grafana Dashboards queued as job {sync_job.id}.")
+
+        return redirect(reverse("plugins:nautobot_plugin_chatops_grafana:dashboards"))
+
+
 class DashboardsDelete(PermissionRequiredMixin, ObjectDeleteView):
     """View for deleting one or more Dashboard records."""
 
@@ -212,7 +265,8 @@ class PanelsSync(PermissionRequiredMixin, ObjectEditView):
 
         dashboard = Dashboard.objects.get(pk=dashboard_pk)
 
-        sync_data = run_panels_sync(dashboard, request.POST.get("delete") == "true")
+        # A manual sync must see the changes just made in Grafana, not a document cached by an earlier run.
+        sync_data = run_panels_sync(dashboard, request.POST.get("delete") == "true", refresh=True)
         if not sync_data:
             messages.info(request, "No diffs found for the Grafana Dashboards!")
         else:
@@ -368,7 +422,8 @@ class VariablesSync(PermissionRequiredMixin, ObjectEditView):
 
         dashboard = Dashboard.objects.get(pk=dashboard_pk)
 
-        sync_data = run_variables_sync(dashboard, request.POST.get("delete") == "true")
+        # A manual sync must see the changes just made in Grafana, not a document cached by an earlier run.
+        sync_data = run_variables_sync(dashboard, request.POST.get("delete") == "true", refresh=True)
         if not sync_data:
             messages.info(request, "No diffs found for the Grafana Dashboard Variables!")
         else:
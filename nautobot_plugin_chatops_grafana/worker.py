@@ -1,28 +1,52 @@
 """Worker function for /net commands in Slack."""
-import tempfile
 import argparse
-import os
-from datetime import datetime
-from typing import NoReturn, List, Union, Dict
-from isodate import ISO8601Error, parse_duration
-from jinja2 import Template
-from django_rq import job
+import copy
+import functools
+import itertools
+import re
+from contextvars import ContextVar
+from typing import NoReturn, List, Optional, Set, Type, Union, Dict, Tuple
+from isodate import ISO8601Error
+from django_rq import get_queue, job
+from rq import get_current_job
 from django.core.exceptions import FieldError, ObjectDoesNotExist, MultipleObjectsReturned
+from django.db.models import Model, Prefetch, Q
 from pydantic.error_wrappers import ValidationError  # pylint: disable=no-name-in-module
 from nautobot.utilities.querysets import RestrictedQuerySet
 from nautobot_chatops.dispatchers import Dispatcher
-from nautobot_chatops.workers import handle_subcommands, add_subcommand
-from nautobot_plugin_chatops_grafana.models import Panel, PanelVariable
-from nautobot_plugin_chatops_grafana.helpers import VALID_MODELS
+from nautobot_chatops.workers import handle_subcommands, add_subcommand, get_commands_registry
+from nautobot_plugin_chatops_grafana.models import Dashboard, Panel, PanelVariable
+from nautobot_plugin_chatops_grafana.helpers import get_model_info, warn_unindexed
+from nautobot_plugin_chatops_grafana.delivery import send_image_bytes
+from nautobot_plugin_chatops_grafana.images import gallery, layout_grid, postprocess, stitch
 from nautobot_plugin_chatops_grafana.grafana import (
     SLASH_COMMAND,
     LOGGER,
     GRAFANA_LOGO_PATH,
     GRAFANA_LOGO_ALT,
-    REQUEST_TIMEOUT_SEC,
+    RenderContext,
     handler,
 )
-from nautobot_plugin_chatops_grafana.exceptions import DefaultArgsError, PanelError, MultipleOptionsError
+from nautobot_plugin_chatops_grafana.grafana_async import async_handler, run_async
+from nautobot_plugin_chatops_grafana.templating import render_value, template_attributes
+from nautobot_plugin_chatops_grafana.menus import MenuPage, menu_paginator
+from nautobot_plugin_chatops_grafana.registry import PanelSpec, load_panel_specs, subcommand_registry
+from nautobot_plugin_chatops_grafana.exceptions import (
+    DefaultArgsError,
+    PanelError,
+    MultipleOptionsError,
+    MultiValueError,
+)
+
+
+DASHBOARD_SUBCOMMAND = "get-dashboard"
+MULTI_VALUE_SEPARATOR = ","
+GLOB_CHARACTERS = ("*", "?")
+GLOB_REGEX = {"*": ".*", "?": "."}
+# Default arguments accepted by every panel command as `name=value`.
+DEFAULT_ARGS = tuple(handler.default_params)
+# Subcommand of the chat request served by the current thread or task, set by the `grafana` job.
+CURRENT_SUBCOMMAND: ContextVar[str] = ContextVar("grafana_subcommand", default="")
 
 
 def grafana_logo(dispatcher):
@@ -30,16 +54,54 @@ def grafana_logo(dispatcher):
     return dispatcher.image_element(dispatcher.static_url(GRAFANA_LOGO_PATH), alt_text=GRAFANA_LOGO_ALT)
 
 
-@job("default")
+@job(handler.config.worker_queue)
 def grafana(subcommand, **kwargs):
-    """Pull Panels from Grafana."""
-    initialize_subcommands()
-    handler.current_subcommand = subcommand
-    return handle_subcommands(SLASH_COMMAND, subcommand, **kwargs)
+    """Pull Panels from Grafana.
+
+    nautobot-chatops ignores the queue of this job: chat commands run on a Celery worker with Nautobot 1.1 and
+    later, or are enqueued on the `default` RQ queue. The job forwards itself to `worker_queue` when it is set to
+    another queue, so the workers of that queue render the panels.
+    """
+    if forward_to_worker_queue(grafana, subcommand, **kwargs):
+        return None
+    subcommand_registry.ensure(initialize_subcommands)
+    token = CURRENT_SUBCOMMAND.set(subcommand)
+    try:
+        return handle_subcommands(SLASH_COMMAND, subcommand, **kwargs)
+    finally:
+        CURRENT_SUBCOMMAND.reset(token)
+
+
+def forward_to_worker_queue(func, *args, **kwargs) -> bool:
+    """Enqueue the call on `worker_queue` unless it is the `default` queue or the current RQ job was taken from it.
+
+    Args:
+        func (callable): Job function to enqueue.
+        args: Positional arguments of the job.
+        kwargs: Keyword arguments of the job.
+
+    Returns:
+        bool: True if the call was forwarded and must not run in the current job.
+    """
+    queue_name = handler.config.worker_queue
+    current_job = get_current_job()
+    origin = current_job.origin if current_job is not None else None
+    if queue_name == "default" or origin == queue_name:
+        return False
+    forwarded = get_queue(queue_name).enqueue_call(func, args=args, kwargs=kwargs)
+    LOGGER.debug("Forwarded %s from %s to %s as job %s", func.__name__, origin or "Celery", queue_name, forwarded.id)
+    return True
 
 
-def initialize_subcommands():
-    """Based on the panels configuration yaml provided build chat subcommands."""
+def initialize_subcommands(specs: Dict[str, Tuple[PanelSpec, ...]] = None) -> List[str]:
+    """Based on the panels configuration build chat subcommands, removing those of deleted or inactive panels.
+
+    Args:
+        specs (dict): Compiled active panels keyed by command name, loaded from the database when not given.
+
+    Returns:
+        List[str]: Names of the registered subcommands.
+    """
     default_params = [
         f"width={handler.width}",
         f"height={handler.height}",
@@ -47,23 +109,48 @@ def initialize_subcommands():
         f"timespan={handler.timespan}",
         f"timezone={handler.timezone}",
     ]
-    for panel in Panel.objects.filter(active=True):
-        panel_variables = []
-        # Build parameters list from dynamic variables in panels
-        for variable in PanelVariable.objects.filter(panel=panel).order_by("positional_order", "name"):
-            if variable.includeincmd:
-                panel_variables.append(variable.name)
+    if specs is None:
+        specs = load_panel_specs(active=True)
+    registered = []
+    for command_specs in specs.values():
+        # Several panels sharing a command name are reported when the command is used.
+        spec = command_specs[-1]
+        if spec.command_name == DASHBOARD_SUBCOMMAND.replace("get-", ""):
+            LOGGER.warning(
+                "The panel command `%s` is shadowed by the dashboard snapshot command.", DASHBOARD_SUBCOMMAND
+            )
         # The subcommand name with be get-{command_name}
+        subcommand_name = f"get-{spec.command_name}"
         add_subcommand(
             command_name=SLASH_COMMAND,
             command_func=grafana,
-            subcommand_name=f"get-{panel.command_name}",
+            subcommand_name=subcommand_name,
             subcommand_spec={
                 "worker": chat_get_panel,
-                "params": panel_variables + default_params,
-                "doc": panel.friendly_name,
+                # Build parameters list from dynamic variables in panels
+                "params": [variable.name for variable in spec.command_variables] + default_params,
+                "doc": spec.panel.friendly_name,
             },
         )
+        registered.append(subcommand_name)
+
+    add_subcommand(
+        command_name=SLASH_COMMAND,
+        command_func=grafana,
+        subcommand_name=DASHBOARD_SUBCOMMAND,
+        subcommand_spec={
+            "worker": chat_get_dashboard,
+            "params": ["dashboard"] + default_params,
+            "doc": "Render every active panel of a dashboard as a single image",
+        },
+    )
+    registered.append(DASHBOARD_SUBCOMMAND)
+
+    # Subcommands of panels deleted or deactivated since the last build are no longer offered.
+    subcommands = get_commands_registry().get(SLASH_COMMAND, {}).get("subcommands", {})
+    for stale in subcommand_registry.subcommands.difference(registered):
+        subcommands.pop(stale, None)
+    return registered
 
 
 def chat_get_panel(dispatcher: Dispatcher, *args) -> bool:  # pylint: disable=too-many-return-statements
@@ -75,31 +162,49 @@ def chat_get_panel(dispatcher: Dispatcher, *args) -> bool:  # pylint: disable=to
     Returns:
         bool: ChatOps response pass or fail.
     """
-    # Find the panel config matching the current subcommand
+    # Find the compiled panel matching the current subcommand
+    subcommand = CURRENT_SUBCOMMAND.get()
     try:
-        panel = Panel.objects.get(command_name=handler.current_subcommand.replace("get-", ""))
+        spec = subcommand_registry.get_spec(subcommand.replace("get-", ""))
     except ObjectDoesNotExist:
-        dispatcher.send_error(f"Command {handler.current_subcommand} Not Found!")
+        dispatcher.send_error(f"Command {subcommand} Not Found!")
         return False
     except MultipleObjectsReturned:
-        dispatcher.send_error(f"Command {handler.current_subcommand} Multiple Panels Defined!")
+        dispatcher.send_error(f"Command {subcommand} Multiple Panels Defined!")
         return False
 
-    panel_vars = PanelVariable.objects.filter(panel=panel).order_by("positional_order", "name")
+    panel = spec.panel
+    panel_vars = spec.panel_vars()
 
     parsed_args = chat_parse_args(panel_vars, *args)
     if not parsed_args:
         return False
 
+    renders = []
     try:
-        # Validate nautobot Args and get any missing parameters
-        chat_validate_nautobot_args(
-            dispatcher=dispatcher,
-            panel=panel,
-            panel_vars=panel_vars,
-            parsed_args=parsed_args,
-            action_id=f"grafana {handler.current_subcommand} {' '.join(args)}",
-        )
+        # Expand comma separated or glob values of query variables, each combination is rendered separately.
+        combinations = chat_expand_multi_value_args(panel_vars=panel_vars, parsed_args=parsed_args)
+        for combination in combinations or [{}]:
+            combination_vars = [copy.copy(variable) for variable in panel_vars]
+            # Validate nautobot Args and get any missing parameters
+            chat_validate_nautobot_args(
+                dispatcher=dispatcher,
+                panel=panel,
+                panel_vars=combination_vars,
+                parsed_args=parsed_args,
+                action_id=f"grafana {subcommand} {' '.join(args)}",
+                resolved=combination,
+            )
+            label = ", ".join(
+                f"{variable.name}={getattr(combination[variable.name], variable.modelattr)}"
+                for variable in panel_vars
+                if variable.name in combination
+            )
+            renders.append((combination_vars, label))
+    except MultiValueError as exc:
+        dispatcher.send_error(f"Sorry, {dispatcher.user_mention()} {exc}")
+        return False
+
     except PanelError as exc:
         dispatcher.send_error(f"Sorry, {dispatcher.user_mention()} there was an error with the panel definition, {exc}")
         return False
@@ -109,53 +214,299 @@ def chat_get_panel(dispatcher: Dispatcher, *args) -> bool:  # pylint: disable=to
 
     try:
         # Validate the default arguments to make sure the conform to their defined pydantic type.
-        chat_validate_default_args(parsed_args=parsed_args)
+        context = chat_validate_default_args(parsed_args=parsed_args, subcommand=subcommand)
     except DefaultArgsError as exc:
         dispatcher.send_error(exc)
         return False
 
-    return chat_return_panel(dispatcher=dispatcher, panel=panel, panel_vars=panel_vars, parsed_args=parsed_args)
+    if not combinations:
+        return chat_return_panel(
+            dispatcher=dispatcher, panel=panel, panel_vars=renders[0][0], parsed_args=parsed_args, context=context
+        )
+    return chat_return_panels(
+        dispatcher=dispatcher, panel=panel, renders=renders, parsed_args=parsed_args, context=context
+    )
 
 
-def chat_parse_args(panel_vars: List[PanelVariable], *args) -> Union[dict, bool]:
-    """Parse the arguments from the user via chat using argparser.
+def chat_expand_multi_value_args(panel_vars: List[PanelVariable], parsed_args: dict) -> List[Dict[str, Model]]:
+    """Resolve comma separated or glob values given to query variables into Nautobot objects.
+
+    Every variable given several values is resolved with a single query, then one combination is
+    built per element of the cartesian product of the resolved objects.
 
     Args:
         panel_vars (List[nautobot_plugin_chatops_grafana.models.PanelVariable]): List of PanelVariable objects.
+        parsed_args (dict): Dictionary of parsed arguments from argparse.
+
+    Raises:
+        MultiValueError: A value matches no object, or there are more combinations than `fanout_max_renders`.
+        PanelError: An issue fetching objects based on panel variables.
 
     Returns:
-        parsed_args: dict of the arguments from the user's raw input
+        List[Dict[str, Model]]: Objects keyed by variable name for each combination, empty without multi-values.
+
+    Examples:
+        >>> chat_expand_multi_value_args([PanelVariable(name="site", query="Site")], {"site": "ams01"})
+        []
     """
-    # Append on the flag command to conform to argparse parsing methods.
-    fixed_args = []
-    for arg in args:
-        if arg.startswith(tuple(handler.default_params.keys())):
-            fixed_args.append(f"--{arg}")
+    limit = handler.config.fanout_max_renders
+    resolved = {}
+    for variable in panel_vars:
+        value = parsed_args.get(variable.name)
+        if not variable.query or not is_multi_value(value):
+            continue
+
+        patterns = [pattern.strip() for pattern in value.split(MULTI_VALUE_SEPARATOR) if pattern.strip()]
+        objects = get_nautobot_objects(variable=variable)
+        try:
+            matches = list(
+                objects.filter(**variable.filter)
+                .filter(multi_value_filter(variable.modelattr, patterns))
+                .order_by(variable.modelattr)[: limit + 1]
+            )
+        except FieldError:
+            LOGGER.error("Unable to filter %s by %s", variable.query, variable.modelattr)
+            raise PanelError(f"I was unable to filter {variable.query} by {variable.modelattr}") from None
+
+        if not matches:
+            raise MultiValueError(f"no {variable.query} matches `{value}`.")
+        resolved[variable.name] = matches
+
+    if not resolved:
+        return []
+
+    combinations = [dict(zip(resolved.keys(), objects)) for objects in itertools.product(*resolved.values())]
+    if len(combinations) > limit:
+        raise MultiValueError(f"that request needs more than {limit} renders, please narrow it down.")
+    return combinations
+
+
+def is_multi_value(value: str) -> bool:
+    """Whether a chat argument holds several comma separated values or a glob pattern.
+
+    Examples:
+        >>> [is_multi_value(value) for value in ("ams01", "ams01,ams02", "ams*", None)]
+        [False, True, True, False]
+    """
+    return isinstance(value, str) and any(char in value for char in (MULTI_VALUE_SEPARATOR,) + GLOB_CHARACTERS)
+
+
+def multi_value_filter(modelattr: str, patterns: List[str]) -> Q:
+    """Build a single filter matching any of the exact values or glob patterns on `modelattr`.
+
+    Prefix patterns such as `ams*` use an indexable `startswith` lookup, other globs a regex.
+
+    Examples:
+        >>> multi_value_filter("name", ["ams01", "fra*"])
+        <Q: (OR: ('name__in', ['ams01']), ('name__startswith', 'fra'))>
+    """
+    exact = [pattern for pattern in patterns if not any(char in pattern for char in GLOB_CHARACTERS)]
+    query = Q(**{f"{modelattr}__in": exact}) if exact else Q()
+    for pattern in patterns:
+        if pattern in exact:
+            continue
+        prefix = pattern.rstrip("*")
+        if not any(char in prefix for char in GLOB_CHARACTERS):
+            query |= Q(**{f"{modelattr}__startswith": prefix})
         else:
-            fixed_args.append(arg)
+            regex = "".join(GLOB_REGEX.get(char, re.escape(char)) for char in pattern)
+            query |= Q(**{f"{modelattr}__regex": f"^{regex}$"})
+    return query
 
-    # Collect the arguments sent by the user parse them matching the panel config
-    parser = argparse.ArgumentParser(description="Handles command arguments")
-    predefined_args = {}
+
+def chat_get_dashboard(dispatcher: Dispatcher, dashboard_slug: str = None, *args) -> bool:
+    """Render every active panel of a dashboard concurrently and return them stitched into a single image.
+
+    Args:
+        dispatcher (nautobot_chatops.dispatchers.Dispatcher): Abstracted dispatcher class for chat-ops.
+        dashboard_slug (str): Slug of the dashboard to render.
+
+    Returns:
+        bool: ChatOps response pass or fail.
+    """
+    dashboards = Dashboard.objects.filter(panel__active=True).distinct()
+    if not dashboard_slug:
+        choices = [
+            (dashboard.friendly_name or dashboard.dashboard_slug, dashboard.dashboard_slug) for dashboard in dashboards
+        ]
+        dispatcher.prompt_from_menu(f"{SLASH_COMMAND} {DASHBOARD_SUBCOMMAND}", "Select a dashboard", choices)
+        return False
+
+    try:
+        dashboard = dashboards.get(dashboard_slug=dashboard_slug)
+    except ObjectDoesNotExist:
+        dispatcher.send_error(f"Dashboard {dashboard_slug} Not Found or it has no active panels!")
+        return False
+
+    parsed_args = chat_parse_args([], *args)
+    if not parsed_args:
+        return False
+
+    try:
+        context = chat_validate_default_args(parsed_args=parsed_args, subcommand=DASHBOARD_SUBCOMMAND)
+    except DefaultArgsError as exc:
+        dispatcher.send_error(exc)
+        return False
+
+    panels = list(
+        Panel.objects.filter(dashboard=dashboard, active=True)
+        .select_related("dashboard")
+        .prefetch_related(
+            Prefetch("panelvariable_set", queryset=PanelVariable.objects.order_by("positional_order", "name"))
+        )
+    )
+
+    if grafana_unavailable(dispatcher):
+        return False
+
+    dispatcher.send_markdown(
+        f"Standby {dispatcher.user_mention()}, I'm rendering {len(panels)} panels of {dashboard.dashboard_slug}.\n"
+        f"Please be patient as this can take up to {handler.max_render_seconds} seconds.",
+        ephemeral=True,
+    )
+    dispatcher.send_busy_indicator()
+
+    # Lay the panels out like they are on the Grafana dashboard and render each one at the size of its tile.
+    grid_positions = get_grid_positions(handler.get_dashboard(dashboard.dashboard_uid))
+    tiles = layout_grid(
+        {panel.panel_id: grid_positions.get(panel.panel_id) for panel in panels},
+        handler.config.dashboard_snapshot_width,
+    )
+    requests = [
+        (
+            panel,
+            default_panel_vars(panel.panelvariable_set.all()),
+            {"context": context, "width": tiles[panel.panel_id].width, "height": tiles[panel.panel_id].height},
+        )
+        for panel in panels
+    ]
+    images = run_async(async_handler.get_png_many(requests, concurrency=handler.config.render_concurrency))
+    if not any(images):
+        dispatcher.send_error("An error occurred while accessing Grafana")
+        return False
+
+    dispatcher.send_blocks(
+        dispatcher.command_response_header(
+            command=SLASH_COMMAND,
+            subcommand=DASHBOARD_SUBCOMMAND,
+            args=[("dashboard", dashboard.dashboard_slug)]
+            + chat_header_args(panel_vars=[], parsed_args=parsed_args)[:4],
+            description=f"<{handler.dashboard_url(dashboard=dashboard, context=context)}|{dashboard.dashboard_slug}> dashboard",
+            image_element=grafana_logo(dispatcher),
+        )
+    )
+
+    failed = [panel.command_name for panel, raw_png in zip(panels, images) if not raw_png]
+    if failed:
+        dispatcher.send_markdown(f"Unable to render the panels: {', '.join(failed)}", ephemeral=True)
+
+    snapshot = stitch(images, [tiles[panel.panel_id] for panel in panels], theme=context.theme)
+    send_png(dispatcher, snapshot, name=f"{DASHBOARD_SUBCOMMAND}-{dashboard.dashboard_slug}", context=context)
+    return True
+
+
+def get_grid_positions(document: dict) -> Dict[int, dict]:
+    """Map the panel ids of a Grafana dashboard document to their `gridPos`, including panels nested in rows.
+
+    Args:
+        document (dict): Dashboard document as returned by GrafanaHandler.get_dashboard.
+
+    Returns:
+        Dict[int, dict]: `gridPos` keyed by panel id.
+    """
+    positions = {}
+    panels = list(document.get("dashboard", {}).get("panels", []))
+    while panels:
+        panel = panels.pop()
+        panels.extend(panel.get("panels", []))
+        if "id" in panel and panel.get("gridPos"):
+            positions[int(panel["id"])] = panel["gridPos"]
+    return positions
+
+
+def default_panel_vars(panel_vars: List[PanelVariable]) -> List[PanelVariable]:
+    """Copies of the panel variables carrying the value sent to Grafana when the user gives no argument.
+
+    Args:
+        panel_vars (List[nautobot_plugin_chatops_grafana.models.PanelVariable]): List of PanelVariable objects.
+
+    Returns:
+        List[PanelVariable]: Unsaved copies of the variables with their default value rendered.
+    """
+    defaults = {variable.name: variable.response for variable in panel_vars}
+    variables = []
     for variable in panel_vars:
-        if variable.includeincmd:
-            parser.add_argument(f"{variable.name}", default=variable.response, nargs="?")
+        variable = copy.copy(variable)
+        # Query variables need a Nautobot object to render their template, fall back to their default response.
+        if variable.query or not variable.value:
+            variable.value = variable.response
+        else:
+            variable.value = render_value(variable.value, defaults)
+        variables.append(variable)
+    return variables
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_arg_parser(
+    variables: Tuple[Tuple[str, bool, str], ...]
+) -> Tuple[argparse.ArgumentParser, Tuple[Tuple[str, str], ...]]:
+    """Build the argument parser of a panel, cached per variable definitions.
+
+    The parser is keyed on the definitions themselves, so a change to the variables of a panel
+    builds a new parser. The default arguments have no default in the parser, the current defaults
+    of the handler are given when parsing.
+
+    Args:
+        variables (tuple): Name, `includeincmd` and default response of each variable, in positional order.
+
+    Returns:
+        tuple: The parser and the default response of the variables hidden from the command.
+    """
+    parser = argparse.ArgumentParser(description="Handles command arguments")
+    predefined_args = []
+    for name, includeincmd, response in variables:
+        if includeincmd:
+            parser.add_argument(f"{name}", default=response, nargs="?")
         else:
             # The variable from the config wasn't included in the users response (hidden) so
             # add the default response if provided in the config
-            predefined_args[variable.name] = variable.response
-
-    parser.add_argument("--width", default=handler.width, nargs="?")
-    parser.add_argument("--height", default=handler.height, nargs="?")
-    parser.add_argument("--theme", default=handler.theme, nargs="?")
-    parser.add_argument("--timespan", default=handler.timespan, nargs="?")
-    parser.add_argument("--timezone", default=handler.timezone, nargs="?")
-    args_namespace = parser.parse_args(fixed_args)
-    parsed_args = {**vars(args_namespace), **predefined_args}
+            predefined_args.append((name, response))
+
+    for default_arg in DEFAULT_ARGS:
+        parser.add_argument(f"--{default_arg}", nargs="?")
+    return parser, tuple(predefined_args)
+
+
+def chat_parse_args(panel_vars: List[PanelVariable], *args) -> Union[dict, bool]:
+    """Parse the arguments from the user via chat using argparser.
+
+    Args:
+        panel_vars (List[nautobot_plugin_chatops_grafana.models.PanelVariable]): List of PanelVariable objects.
+
+    Returns:
+        parsed_args: dict of the arguments from the user's raw input
+    """
+    # Append on the flag command to conform to argparse parsing methods.
+    fixed_args = [f"--{arg}" if arg.startswith(DEFAULT_ARGS) else arg for arg in args]
+
+    # Collect the arguments sent by the user parse them matching the panel config
+    parser, predefined_args = compile_arg_parser(
+        tuple((variable.name, variable.includeincmd, variable.response) for variable in panel_vars)
+    )
+    # argparse only sets the default of options missing from the namespace, start from the current defaults.
+    defaults = argparse.Namespace(**{default_arg: getattr(handler, default_arg) for default_arg in DEFAULT_ARGS})
+    args_namespace = parser.parse_args(fixed_args, namespace=defaults)
+    parsed_args = {**vars(args_namespace), **dict(predefined_args)}
     return parsed_args
 
 
-def chat_return_panel(dispatcher: Dispatcher, panel: Panel, panel_vars: List[PanelVariable], parsed_args: dict) -> bool:
+def chat_return_panel(
+    dispatcher: Dispatcher,
+    panel: Panel,
+    panel_vars: List[PanelVariable],
+    parsed_args: dict,
+    context: RenderContext,
+) -> bool:
     """After everything passes the tests decorate the response and return the panel to the user.
 
     Args:
@@ -163,18 +514,22 @@ def chat_return_panel(dispatcher: Dispatcher, panel: Panel, panel_vars: List[Pan
         panel (nautobot_plugin_chatops_grafana.models.Panel): A Panel object.
         panel_vars (list(nautobot_plugin_chatops_grafana.models.PanelVariable)): A list of PanelVariable objects.
         parsed_args (dict): Dictionary of parsed arguments from argparse.
+        context (nautobot_plugin_chatops_grafana.grafana.RenderContext): Parameters of the request.
 
     Returns:
         bool: ChatOps response pass or fail.
     """
+    if grafana_unavailable(dispatcher):
+        return False
+
     dispatcher.send_markdown(
         f"Standby {dispatcher.user_mention()}, I'm getting that result.\n"
-        f"Please be patient as this can take up to {REQUEST_TIMEOUT_SEC} seconds.",
+        f"Please be patient as this can take up to {handler.max_render_seconds} seconds.",
         ephemeral=True,
     )
     dispatcher.send_busy_indicator()
 
-    raw_png = handler.get_png(panel, panel_vars)
+    raw_png = handler.get_png(panel, panel_vars, context=context)
     if not raw_png:
         dispatcher.send_error("An error occurred while accessing Grafana")
         return False
@@ -182,34 +537,151 @@ def chat_return_panel(dispatcher: Dispatcher, panel: Panel, panel_vars: List[Pan
     dispatcher.send_blocks(
         dispatcher.command_response_header(
             command=SLASH_COMMAND,
-            subcommand=handler.current_subcommand,
+            subcommand=context.subcommand,
             args=chat_header_args(panel_vars=panel_vars, parsed_args=parsed_args)[:5],
-            description=f"<{handler.panel_url(panel=panel)}|{panel.dashboard.dashboard_slug}:{panel.command_name}> panel",
+            description=(
+                f"<{handler.panel_url(panel=panel, context=context)}|"
+                f"{panel.dashboard.dashboard_slug}:{panel.command_name}> panel"
+            ),
             image_element=grafana_logo(dispatcher),
         )
     )
 
-    with tempfile.TemporaryDirectory() as tempdir:
-        # Note: Microsoft Teams will silently fail if we have ":" in our filename.
-        now = datetime.now()
-        time_str = now.strftime("%Y-%m-%d-%H-%M-%S")
-
-        # If a timespan is specified, set the filename of the image to be the correct timespan displayed in the
-        # Grafana image.
-        if parsed_args.get("timespan"):
-            timedelta = parse_duration(parsed_args.get("timespan")).totimedelta(start=now)
-            from_ts = (now - timedelta).strftime("%Y-%m-%d-%H-%M-%S")
-            time_str = f"{from_ts}-to-{time_str}"
-
-        img_path = os.path.join(tempdir, f"{handler.current_subcommand}_{time_str}.png")
-        with open(img_path, "wb") as img_file:
-            img_file.write(raw_png)
-        dispatcher.send_image(img_path)
+    send_png(dispatcher, raw_png, name=context.subcommand, context=context)
     return True
 
 
+def chat_return_panels(
+    dispatcher: Dispatcher,
+    panel: Panel,
+    renders: List[Tuple[List[PanelVariable], str]],
+    parsed_args: dict,
+    context: RenderContext,
+) -> bool:
+    """Render every combination of variables concurrently and return them as a single gallery image.
+
+    Args:
+        dispatcher (nautobot_chatops.dispatchers.Dispatcher): Abstracted dispatcher class for chat-ops.
+        panel (nautobot_plugin_chatops_grafana.models.Panel): A Panel object.
+        renders (list(tuple)): Validated PanelVariable objects and caption of each render.
+        parsed_args (dict): Dictionary of parsed arguments from argparse.
+        context (nautobot_plugin_chatops_grafana.grafana.RenderContext): Parameters of the request.
+
+    Returns:
+        bool: ChatOps response pass or fail.
+    """
+    if grafana_unavailable(dispatcher):
+        return False
+
+    dispatcher.send_markdown(
+        f"Standby {dispatcher.user_mention()}, I'm getting those {len(renders)} results.\n"
+        f"Please be patient as this can take up to {handler.max_render_seconds} seconds.",
+        ephemeral=True,
+    )
+    dispatcher.send_busy_indicator()
+
+    images = run_async(
+        async_handler.get_png_many(
+            [(panel, panel_vars, {"context": context}) for panel_vars, _ in renders],
+            concurrency=handler.config.render_concurrency,
+        )
+    )
+    if not any(images):
+        dispatcher.send_error("An error occurred while accessing Grafana")
+        return False
+
+    dispatcher.send_blocks(
+        dispatcher.command_response_header(
+            command=SLASH_COMMAND,
+            subcommand=context.subcommand,
+            args=chat_header_args(panel_vars=renders[0][0], parsed_args=parsed_args)[:5],
+            description=(
+                f"<{handler.panel_url(panel=panel, context=context)}|"
+                f"{panel.dashboard.dashboard_slug}:{panel.command_name}> panel"
+            ),
+            image_element=grafana_logo(dispatcher),
+        )
+    )
+
+    failed = [label for (_, label), raw_png in zip(renders, images) if not raw_png]
+    if failed:
+        dispatcher.send_markdown(f"Unable to render: {'; '.join(failed)}", ephemeral=True)
+
+    labels = [label for _, label in renders]
+    combined = gallery(images, labels=labels, columns=handler.config.fanout_columns, theme=context.theme)
+    send_png(dispatcher, combined, name=context.subcommand, context=context)
+    return True
+
+
+def grafana_unavailable(dispatcher: Dispatcher) -> bool:
+    """Tell the user right away when the circuit breaker is open instead of waiting on Grafana.
+
+    Args:
+        dispatcher (nautobot_chatops.dispatchers.Dispatcher): Abstracted dispatcher class for chat-ops.
+
+    Returns:
+        bool: True if Grafana is known to be unhealthy and the user was told so.
+    """
+    if handler.circuit_breaker.state() != "open":
+        return False
+    dispatcher.send_error("Grafana is currently unavailable, please try again in a little while.")
+    return True
+
+
+def send_png(dispatcher: Dispatcher, raw_png: bytes, name: str, context: RenderContext) -> NoReturn:
+    """Upload a rendered image to the chat client.
+
+    Args:
+        dispatcher (nautobot_chatops.dispatchers.Dispatcher): Abstracted dispatcher class for chat-ops.
+        raw_png (bytes): The rendered image.
+        name (str): Prefix of the uploaded filename, usually the subcommand.
+        context (nautobot_plugin_chatops_grafana.grafana.RenderContext): Parameters of the request, its
+            timespan is added to the filename.
+
+    Returns:
+        NoReturn
+    """
+    # Note: Microsoft Teams will silently fail if we have ":" in our filename.
+    now = context.now.astimezone()
+    time_str = now.strftime("%Y-%m-%d-%H-%M-%S")
+
+    # If a timespan is specified, set the filename of the image to be the correct timespan displayed in the
+    # Grafana image.
+    if context.timespan:
+        from_ts = (now - context.timespan).strftime("%Y-%m-%d-%H-%M-%S")
+        time_str = f"{from_ts}-to-{time_str}"
+
+    config = handler.config
+    platform = getattr(dispatcher, "platform_slug", None)
+    mode = config.image_postprocess_platforms.get(platform, config.image_postprocess)
+    image = postprocess(raw_png, mode=mode, quality=config.image_quality, colors=config.image_palette_colors)
+    if mode != "none":
+        LOGGER.info(
+            "Post-processed %s image with %s: %s -> %s bytes, %s bytes saved",
+            platform,
+            mode,
+            image.original_bytes,
+            len(image.data),
+            image.bytes_saved,
+        )
+
+    # The image is handed to the chat client from memory, or from a memory backed spool for clients needing a path.
+    send_image_bytes(
+        dispatcher,
+        image.data,
+        filename=f"{name}_{time_str}.{image.extension}",
+        max_bytes=handler.config.image_spool_max_bytes,
+        directory=handler.config.image_spool_dir,
+    )
+
+
 def chat_validate_nautobot_args(
-    dispatcher: Dispatcher, panel: Panel, panel_vars: List[PanelVariable], parsed_args: dict, action_id: str
+    dispatcher: Dispatcher,
+    panel: Panel,
+    panel_vars: List[PanelVariable],
+    parsed_args: dict,
+    action_id: str,
+    resolved: Dict[str, Model] = None,
 ) -> NoReturn:
     """Parse through args and validate them against the definition with the panel.
 
@@ -219,6 +691,7 @@ def chat_validate_nautobot_args(
         panel_vars (list(nautobot_plugin_chatops_grafana.models.PanelVariable)): A list of PanelVariable objects.
         parsed_args (dict): Dictionary of parsed arguments from argparse.
         action_id (str): full grafana chatops command.
+        resolved (dict): Nautobot objects already resolved for some variables, keyed by variable name.
 
     Raises:
         PanelError: An issue fetching objects based on panel variables.
@@ -234,43 +707,57 @@ def chat_validate_nautobot_args(
             LOGGER.debug("Validated variable %s with input %s", variable.name, parsed_args[variable.name])
             validated_variables[variable.name] = parsed_args[variable.name]
 
+        elif resolved and variable.name in resolved:
+            # The object was already resolved from a multi-value argument.
+            validated_variables[variable.name] = resolved[variable.name].__dict__
+
         else:
             LOGGER.debug("Validating variable %s with input %s", variable.name, parsed_args[variable.name])
             # A nautobot Query is defined so first lets get all of those objects
             objects = get_nautobot_objects(variable=variable)
+            # Only load the fields needed for the menu and by the value templates.
+            only = projected_fields(objects.model, required_fields(variable, panel_vars))
+            if only:
+                objects = objects.only(*only)
 
             # Copy the filter object from the variable in case a filter has been defined.
-            _filter = variable.filter
+            _filter = dict(variable.filter)
+            value = parsed_args.get(variable.name)
+
+            if menu_paginator.is_token(value):
+                # The user asked for the next page of a menu, an expired token starts over from the first page.
+                state = menu_paginator.load(value)
+                if state is None:
+                    dispatcher.send_warning(f"The menu of `{variable.name}` expired, showing its first page again.")
+                    state = {}
+                page = chat_menu_page(objects, variable, [state.get("lookup", _filter)], after=state.get("after"))
+                chat_prompt_menu(dispatcher, panel, variable, page, action_id, parsed_args)
 
             # If the user specified a filter in the chat command:
             # i.e. /grafana get-<name> 'site', and 'site' exist as the variable name,
             # we will add it to the filter.
-            if parsed_args.get(variable.name):
-                _filter[variable.modelattr] = parsed_args[variable.name]
+            if value:
+                _filter[variable.modelattr] = value
 
             try:
-                filtered_objects = objects.filter(**_filter)
+                # A single bounded query tells apart a unique match from several or no match.
+                filtered_objects = list(objects.filter(**_filter)[:2])
             except FieldError:
                 LOGGER.error("Unable to filter %s by %s", variable.query, _filter)
                 raise PanelError(f"I was unable to filter {variable.query} by {_filter}") from None
 
             # filtered_objects should be a single record by this point. If not, we cannot process further,
             # we need to prompt the user for the options to filter further.
-            if filtered_objects.count() != 1 or not parsed_args[variable.name]:
-                if filtered_objects.count() > 1:
-                    choices = [
-                        (f"{filtered_object.name}", getattr(filtered_object, variable.modelattr))
-                        for filtered_object in filtered_objects
-                    ]
+            if len(filtered_objects) != 1 or not value:
+                if len(filtered_objects) > 1:
+                    lookups = [_filter]
+                elif value and projected_fields(objects.model, {variable.modelattr}):
+                    # Narrow the menu to the objects starting with what the user typed, or offer them all.
+                    lookups = [{**variable.filter, f"{variable.modelattr}__startswith": value}, variable.filter]
                 else:
-                    choices = [(f"{obj.name}", getattr(obj, variable.modelattr)) for obj in objects]
-                helper_text = (
-                    f"{panel.friendly_name} Requires {variable.friendly_name}"
-                    if variable.friendly_name
-                    else panel.friendly_name
-                )
-                parsed_args[variable.name] = dispatcher.prompt_from_menu(action_id, helper_text, choices)
-                raise MultipleOptionsError
+                    lookups = [variable.filter]
+                page = chat_menu_page(objects, variable, lookups)
+                chat_prompt_menu(dispatcher, panel, variable, page, action_id, parsed_args)
 
             # Add the validated device to the dict so templates can use it later
             LOGGER.debug("Validated variable %s with input %s", variable.name, parsed_args[variable.name])
@@ -285,7 +772,62 @@ def chat_validate_nautobot_args(
             # If there is a variable value, it could be in jinja2 format, so we can take
             # that format and pass in the validated variables to get the correct rendered template.
             # If it's not Jinja2, then it should just return the value.
-            variable.value = Template(variable.value).render(validated_variables)
+            variable.value = render_value(variable.value, validated_variables)
+
+
+def chat_menu_page(
+    objects: RestrictedQuerySet, variable: PanelVariable, lookups: List[dict], after: Tuple = None
+) -> MenuPage:
+    """Return the first non-empty menu page of the objects matching one of `lookups`, tried in order.
+
+    Args:
+        objects (RestrictedQuerySet): Objects of the variable's model.
+        variable (nautobot_plugin_chatops_grafana.models.PanelVariable): The query variable being resolved.
+        lookups (list): Filters to try in order.
+        after (tuple): Position of the last object of the previous page.
+
+    Raises:
+        PanelError: No object matches any of the filters.
+
+    Returns:
+        MenuPage: The choices to offer to the user.
+    """
+    for lookup in lookups:
+        try:
+            page = menu_paginator.page(objects, variable.modelattr, lookup, after=after)
+        except FieldError:
+            LOGGER.error("Unable to filter %s by %s", variable.query, lookup)
+            raise PanelError(f"I was unable to filter {variable.query} by {lookup}") from None
+        if page.choices:
+            return page
+    raise PanelError(f"{variable.query} returned 0 items in the dcim.model.")
+
+
+def chat_prompt_menu(
+    dispatcher: Dispatcher,
+    panel: Panel,
+    variable: PanelVariable,
+    page: MenuPage,
+    action_id: str,
+    parsed_args: dict,
+) -> NoReturn:
+    """Prompt the user to pick the object of a variable from a menu page.
+
+    The picked value is appended to `action_id`, so the partial value or continuation token given for
+    the variable is removed from it first.
+
+    Raises:
+        MultipleOptionsError: Always, the command runs again once the user picked an object or the next page.
+    """
+    words = action_id.split(" ")
+    value = parsed_args.get(variable.name)
+    if value and value in words[2:]:
+        del words[words.index(value, 2)]
+    helper_text = (
+        f"{panel.friendly_name} Requires {variable.friendly_name}" if variable.friendly_name else panel.friendly_name
+    )
+    parsed_args[variable.name] = dispatcher.prompt_from_menu(" ".join(words), helper_text, page.choices)
+    raise MultipleOptionsError
 
 
 def get_nautobot_objects(variable: PanelVariable) -> RestrictedQuerySet:
@@ -300,44 +842,81 @@ def get_nautobot_objects(variable: PanelVariable) -> RestrictedQuerySet:
     Returns:
         RestrictedQuerySet: Objects returned from the Nautobot ORM.
     """
-    objects = None
     # Example, if a 'query' defined in panels.yml is set to 'Site', we would pull all sites
     # using 'Site.objects.all()'
-    for models in VALID_MODELS:
-        if hasattr(models, variable.query):
-            objects = getattr(models, variable.query).objects.all()
-            break
-
-    if not objects:
+    info = get_model_info(variable.query)
+    if info is None:
         LOGGER.error("Unable to find class %s in nautobot models.", variable.query)
         raise PanelError(f"I was unable to find class {variable.query} in nautobot models.") from None
 
     if not variable.modelattr:
         raise PanelError("When specifying a query, a modelattr is also required")
-    if objects.count() < 1:
-        raise PanelError(f"{variable.query} returned {objects.count()} items in the dcim.model.")
 
-    return objects
+    warn_unindexed(variable.query, variable.modelattr)
+    return info.model.objects.all()
+
 
+def required_fields(variable: PanelVariable, panel_vars: List[PanelVariable]) -> Optional[Set[str]]:
+    """Fields of the object selected for `variable` that the chat menu and the value templates use.
 
-def chat_validate_default_args(parsed_args: dict) -> NoReturn:
+    Args:
+        variable (nautobot_plugin_chatops_grafana.models.PanelVariable): The query variable being resolved.
+        panel_vars (list(nautobot_plugin_chatops_grafana.models.PanelVariable)): Variables whose value may use it.
+
+    Returns:
+        Set[str]: Field names, None when a template uses the whole object.
+    """
+    if variable.value == "":
+        # The whole object becomes the value of the variable.
+        return None
+    fields = {"name", variable.modelattr}
+    for panel_var in panel_vars:
+        if not isinstance(panel_var.value, str):
+            # The value of a variable resolved earlier is already the object it selected, not a template.
+            continue
+        attributes = template_attributes(panel_var.value, variable.name)
+        if attributes is None:
+            return None
+        fields.update(attributes)
+    return fields
+
+
+def projected_fields(model: Type[Model], fields: Optional[Set[str]]) -> List[str]:
+    """Restrict `fields` to the concrete fields of `model` that can be given to `QuerySet.only`.
+
+    Returns:
+        List[str]: Sorted field names, empty to load every field.
+    """
+    if fields is None:
+        return []
+    concrete = {}
+    for field in model._meta.concrete_fields:  # pylint: disable=protected-access
+        concrete[field.name] = field.name
+        concrete[field.attname] = field.name
+    return sorted({concrete[field] for field in fields if field in concrete})
+
+
+def chat_validate_default_args(parsed_args: dict, subcommand: str = "") -> RenderContext:
     """chat_validate_default_args will run pydantic validation checks against the default arguments.
 
     Args:
         parsed_args (dict): Combination of default and panel specified arguments, parsed into a dict.
+        subcommand (str): Chat subcommand being served.
 
     Raises:
         DefaultArgsError: An error validating the default arguments against their defined pydantic types.
 
     Returns:
-        NoReturn
+        RenderContext: The parameters of the request, the shared handler is left untouched.
     """
-    # Validate and set the default arguments
-    for default_arg in handler.default_params:
-        try:
-            setattr(handler, default_arg, parsed_args[default_arg])
-        except (ValidationError, ISO8601Error) as exc:
-            raise DefaultArgsError(parsed_args[default_arg], exc) from None
+    try:
+        return handler.render_context(
+            subcommand, **{default_arg: parsed_args[default_arg] for default_arg in DEFAULT_ARGS}
+        )
+    except ValidationError as exc:
+        raise DefaultArgsError(parsed_args.get(exc.errors()[0]["loc"][0]), exc) from None
+    except ISO8601Error as exc:
+        raise DefaultArgsError(parsed_args["timespan"], exc) from None
 
 
 def chat_header_args(panel_vars: List[PanelVariable], parsed_args: Dict) -> List: